@@ -1,14 +1,93 @@
-from .client import DATABASE_NAME, TEST_DATABASE_NAME, MongoClient
-from .collections import CollectionStatistics, CollectionVacancies
-from .models import InteractionStats, Statistics, VacancyItem
+"""Vacancy models and storages.
+
+Names are imported from the submodules on first access, so that pymongo, Scrapy and pyarrow are loaded only if used.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .client import (
+        CONTENT_HASH_FIELD,
+        DATABASE_NAME,
+        TEST_DATABASE_NAME,
+        MongoClient,
+        UpsertSummary,
+        close_clients,
+        get_client,
+    )
+    from .collections import (
+        CollectionDailyTechnologyCounts,
+        CollectionStatistics,
+        CollectionTokenCounts,
+        CollectionVacancies,
+        sum_daily_counts,
+    )
+    from .models import (
+        DailyTechnologyCounts,
+        InteractionStats,
+        ScrapedVacancy,
+        Statistics,
+        VacancyItem,
+        VacancyTokenCounts,
+        validate_vacancies,
+    )
+    from .parquet import ParquetVacancies
+
+_SUBMODULES = {
+    "CONTENT_HASH_FIELD": ".client",
+    "DATABASE_NAME": ".client",
+    "TEST_DATABASE_NAME": ".client",
+    "MongoClient": ".client",
+    "UpsertSummary": ".client",
+    "close_clients": ".client",
+    "get_client": ".client",
+    "CollectionDailyTechnologyCounts": ".collections",
+    "CollectionStatistics": ".collections",
+    "CollectionTokenCounts": ".collections",
+    "CollectionVacancies": ".collections",
+    "sum_daily_counts": ".collections",
+    "DailyTechnologyCounts": ".models",
+    "InteractionStats": ".models",
+    "ScrapedVacancy": ".models",
+    "Statistics": ".models",
+    "VacancyItem": ".models",
+    "VacancyTokenCounts": ".models",
+    "validate_vacancies": ".models",
+    "ParquetVacancies": ".parquet",
+}
 
 __all__ = [
+    "CONTENT_HASH_FIELD",
     "DATABASE_NAME",
     "TEST_DATABASE_NAME",
+    "CollectionDailyTechnologyCounts",
     "CollectionStatistics",
+    "CollectionTokenCounts",
     "CollectionVacancies",
+    "DailyTechnologyCounts",
     "InteractionStats",
     "MongoClient",
+    "ParquetVacancies",
+    "ScrapedVacancy",
     "Statistics",
+    "UpsertSummary",
     "VacancyItem",
+    "VacancyTokenCounts",
+    "close_clients",
+    "get_client",
+    "sum_daily_counts",
+    "validate_vacancies",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_SUBMODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(globals().keys() | _SUBMODULES.keys())
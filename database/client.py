@@ -1,32 +1,108 @@
-from collections.abc import Sequence
-from typing import Any, ClassVar, Self
+import atexit
+import json
+import os
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import cache
+from hashlib import sha256
+from itertools import batched
+from threading import Lock
+from typing import TYPE_CHECKING, Any, ClassVar, Self
 
 from pydantic import BaseModel
 from pymongo import MongoClient as DefaultMongoClient
-from pymongo import ReplaceOne
+from pymongo import ReplaceOne, UpdateOne
 from pymongo.collection import BulkWriteResult, Collection
-from scrapy.utils.project import get_project_settings
+
+if TYPE_CHECKING:
+    from scrapy.settings import Settings
 
 DATABASE_NAME = "techtrendstat"
 TEST_DATABASE_NAME = "test"
+# Field holding the hash of the rest of the document, written by `MongoClient.bulk_upsert_changes`.
+CONTENT_HASH_FIELD = "content_hash"
+
+# Shared clients by the process they were created in and their connection parameters, see `get_client`.
+_clients: dict[tuple[int, tuple[tuple[str, str], ...]], DefaultMongoClient] = {}
+_clients_lock = Lock()
+# Client ID, database, collection and fields of the indexes already created by this process.
+_ensured_indexes: set[tuple[int, str, str, tuple[tuple[str, int], ...]]] = set()
+
+
+@dataclass(slots=True)
+class UpsertSummary:
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+@cache
+def get_settings() -> "Settings":
+    """The project settings, resolved on the first use rather than on import, which would load Scrapy."""
+    from scrapy.utils.project import get_project_settings  # noqa: PLC0415
+
+    return get_project_settings()
+
+
+def get_client(**kwargs: Any) -> DefaultMongoClient:
+    """Return the client connected with `kwargs`, creating it on the first call. Clients aren't fork-safe,
+    so each process gets its own.
+    """
+    key = (os.getpid(), tuple(sorted((name, repr(value)) for name, value in kwargs.items())))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = DefaultMongoClient(**kwargs)
+        return client
 
 
-class MongoClient(DefaultMongoClient):
+@atexit.register
+def close_clients() -> None:
+    """Close the clients created by this process. They're created anew if collections are opened again."""
+    with _clients_lock:
+        for key, client in list(_clients.items()):
+            # Clients inherited from the parent process belong to it.
+            if key[0] == os.getpid():
+                client.close()
+            del _clients[key]
+        _ensured_indexes.clear()
+
+
+def _comparable(value: Any) -> Any:
+    """Bring datetimes to the way BSON stores them: naive UTC with a millisecond precision."""
+    if isinstance(value, datetime):
+        if value.tzinfo:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+
+class MongoClient:
+    """A collection of the shared client connected to the configured MongoDB deployment.
+
+    Clients are pooled per connection parameters and process (see `get_client`), so opening a collection is cheap,
+    and its `indexes` are created once per process. Attributes that aren't defined here are looked up on the client.
+    """
+
     collection: Collection
     collection_name: str
     indexes: ClassVar[list[tuple[str, int]]]
+    # Fields stored as BSON dates, which might have been stored as strings by older versions.
+    datetime_fields: ClassVar[tuple[str, ...]] = ()
 
-    settings = get_project_settings()
+    @property
+    def settings(self) -> "Settings":
+        return get_settings()
 
     def __init__(self, **kwargs: Any) -> None:
         if self.settings["IS_TEST"]:
-            super().__init__(
-                host=self.settings["MONGODB_HOST"],
-                port=self.settings["MONGODB_PORT"],
-                username=self.settings["MONGODB_USERNAME"],
-                password=self.settings["MONGODB_PASSWORD"],
-                **kwargs,
-            )
+            kwargs = {
+                "host": self.settings["MONGODB_HOST"],
+                "port": self.settings["MONGODB_PORT"],
+                "username": self.settings["MONGODB_USERNAME"],
+                "password": self.settings["MONGODB_PASSWORD"],
+            } | kwargs
         else:
             if (
                 not self.settings["MONGODB_USERNAME"]
@@ -39,14 +115,37 @@ class MongoClient(DefaultMongoClient):
                 "host": f"mongodb+srv://{self.settings['MONGODB_USERNAME']}:{self.settings['MONGODB_PASSWORD']}"
                 f"@{self.settings['MONGODB_CLUSTER_HOST']}.mongodb.net/"
             }
-            super().__init__(**kwargs)
+        self.client = get_client(**kwargs)
 
-    def __enter__(self) -> Self:
-        super().__enter__()
-        self.collection = self.get_database(self.database_name)[self.collection_name]
-        self.collection.create_index(self.indexes, unique=True)
+    def __getattr__(self, name: str) -> Any:
+        # Called only for missing attributes, `client` is missing if `__init__` failed.
+        if name.startswith("_") or name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def open(self) -> Self:
+        """Get the collection and create its indexes, unless this process has already created them."""
+        self.collection = self.client.get_database(self.database_name)[self.collection_name]
+        index_key = (id(self.client), self.database_name, self.collection_name, tuple(self.indexes))
+        if index_key not in _ensured_indexes:
+            self.collection.create_index(self.indexes, unique=True)
+            _ensured_indexes.add(index_key)
         return self
 
+    def close(self) -> None:
+        """The shared client stays open for the next collection, it's closed at exit by `close_clients`."""
+
+    def __enter__(self) -> Self:
+        return self.open()
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def drop_database(self, name: str) -> None:
+        """Drop the database, and let its indexes be created again."""
+        self.client.drop_database(name)
+        _ensured_indexes.difference_update([key for key in _ensured_indexes if key[:2] == (id(self.client), name)])
+
     @property
     def database_name(self) -> str:
         """The `TEST_DATABASE_NAME` value is used if `IS_TEST` environment variable it True."""
@@ -56,6 +155,26 @@ class MongoClient(DefaultMongoClient):
     def database_name(self, value: str) -> None:
         self._database_name = value
 
+    @staticmethod
+    def to_document(item: BaseModel) -> dict[str, Any]:
+        """Dump the `item` in a JSON compatible mode, but keep datetimes native to store them as BSON dates."""
+        document = item.model_dump(mode="json", exclude_none=True)
+        document.update({field: value for field, value in item if isinstance(value, datetime)})
+        return document
+
+    def migrate_datetime_fields(self) -> dict[str, int]:
+        """Convert `datetime_fields` stored as strings into BSON dates.
+        Return the number of modified documents per field.
+        """
+        modified_count = {}
+        for field in self.datetime_fields:
+            result = self.collection.update_many(
+                {field: {"$type": "string"}},
+                [{"$set": {field: {"$dateFromString": {"dateString": f"${field}"}}}}],
+            )
+            modified_count[field] = result.modified_count
+        return modified_count
+
     def bulk_upsert(
         self,
         filter_fields: tuple[str, ...],
@@ -67,7 +186,85 @@ class MongoClient(DefaultMongoClient):
         update_one_kwargs = {"upsert": True} | update_one_kwargs if update_one_kwargs else {"upsert": True}
         items_to_upsert = []
         for item in items:
-            dumped_model = item.model_dump(mode="json", exclude_none=True)
+            dumped_model = self.to_document(item)
             filter_ = {field: dumped_model[field] for field in filter_fields}
             items_to_upsert.append(ReplaceOne(filter_, dumped_model, **update_one_kwargs))
         return self.collection.bulk_write(items_to_upsert, **bulk_write_kwargs or {})
+
+    @staticmethod
+    def content_hash(document: dict[str, Any]) -> str:
+        """Hash of the document with its keys sorted, so that it doesn't depend on the order of the fields."""
+        return sha256(json.dumps(document, sort_keys=True, default=str).encode()).hexdigest()
+
+    def bulk_upsert_changes(
+        self, filter_fields: tuple[str, ...], *, items: Sequence[BaseModel], chunk_size: int = 1000
+    ) -> UpsertSummary:
+        """Upsert only new and changed items, in unordered bulk writes of `chunk_size` operations.
+
+        A hash of each document is stored in the `CONTENT_HASH_FIELD` field. Items whose hash matches the stored one
+        are skipped. Fields of changed items that differ from the stored ones are `$set` (or `$unset`),
+        and documents stored without a hash are compared field by field the same way.
+        Of the items sharing filter field values within a chunk, the last one is upserted and the others are
+        counted as skipped, so that the summary adds up to the number of `items`.
+        """
+        summary = UpsertSummary()
+        for items_chunk in batched(items, chunk_size, strict=False):
+            documents = {}
+            for item in items_chunk:
+                document = self.to_document(item)
+                document[CONTENT_HASH_FIELD] = self.content_hash(document)
+                key = tuple(_comparable(document[field]) for field in filter_fields)
+                if key in documents:
+                    summary.skipped += 1
+                documents[key] = document
+
+            stored_hashes = self._find_stored(filter_fields, documents.keys(), {CONTENT_HASH_FIELD: 1})
+            changed_keys = [
+                key
+                for key, document in documents.items()
+                if key in stored_hashes and stored_hashes[key].get(CONTENT_HASH_FIELD) != document[CONTENT_HASH_FIELD]
+            ]
+            summary.skipped += len(documents.keys() & stored_hashes.keys()) - len(changed_keys)
+            stored_documents = self._find_stored(filter_fields, changed_keys, None)
+
+            operations = []
+            for key, document in documents.items():
+                filter_ = {field: document[field] for field in filter_fields}
+                if key not in stored_hashes:
+                    operations.append(UpdateOne(filter_, {"$set": document}, upsert=True))
+                elif stored_document := stored_documents.get(key):
+                    update: dict[str, dict[str, Any]] = {
+                        "$set": {
+                            field: value
+                            for field, value in document.items()
+                            if _comparable(stored_document.get(field)) != _comparable(value)
+                        }
+                    }
+                    if removed := stored_document.keys() - document.keys() - {"_id"}:
+                        update["$unset"] = dict.fromkeys(removed, "")
+                    operations.append(UpdateOne(filter_, update))
+
+            if operations:
+                result = self.collection.bulk_write(operations, ordered=False)
+                summary.inserted += result.upserted_count
+                summary.updated += len(operations) - result.upserted_count
+        return summary
+
+    def _find_stored(
+        self, filter_fields: tuple[str, ...], keys: Iterable[tuple[Any, ...]], projection: dict[str, int] | None
+    ) -> dict[tuple[Any, ...], dict[str, Any]]:
+        """Find the stored documents by `keys` of their filter field values, and return them by these keys."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        if len(filter_fields) == 1:
+            query = {filter_fields[0]: {"$in": [key[0] for key in keys]}}
+        else:
+            query = {"$or": [dict(zip(filter_fields, key, strict=True)) for key in keys]}
+        if projection is not None:
+            projection = dict.fromkeys(filter_fields, 1) | projection
+        with self.collection.find(query, projection) as stored_documents:
+            return {
+                tuple(_comparable(stored_document.get(field)) for field in filter_fields): stored_document
+                for stored_document in stored_documents
+            }
@@ -1,9 +1,13 @@
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from datetime import datetime
 from typing import Any, ClassVar
 
 from pymongo import ASCENDING, DESCENDING
 
 from .client import MongoClient
+from .models import DailyTechnologyCounts, VacancyTokenCounts
+
+DESCRIPTION_PROJECTION = {"_id": 0, "description": 1}
 
 
 class CollectionVacancies(MongoClient):
@@ -13,25 +17,115 @@ class CollectionVacancies(MongoClient):
         ("publication_date", DESCENDING),
         ("years_of_experience", ASCENDING),
     ]
+    datetime_fields = ("publication_date",)
+
+    def fetch_categories(self) -> list[str]:
+        return self.collection.distinct("category")
+
+    def iter_vacancies(
+        self,
+        category: str | Sequence[str],
+        start_from_publication_date: datetime,
+        end_date_of_publication: datetime,
+        *,
+        projection: Mapping[str, Any] | None = DESCRIPTION_PROJECTION,
+        batch_size: int = 100,
+    ) -> Iterator[dict[str, Any]]:
+        """Lazily yield vacancies fetched from the cursor in batches of `batch_size` documents.
+        Pass a sequence of categories to fetch all of them within a single query.
+        Only descriptions are fetched by default, pass `projection=None` to fetch whole documents.
+        """
+        with self.collection.find(
+            {
+                "category": category if isinstance(category, str) else {"$in": list(category)},
+                "publication_date": {"$gte": start_from_publication_date, "$lte": end_date_of_publication},
+            },
+            projection,
+            batch_size=batch_size,
+        ) as vacancies:
+            yield from vacancies
+
+    def iter_interaction_stats(self, categories: Sequence[str], *, batch_size: int = 1000) -> Iterator[dict[str, Any]]:
+        """Lazily yield the URL, views and applications of every vacancy stored for `categories`."""
+        with self.collection.find(
+            {"category": {"$in": list(categories)}},
+            {"_id": 0, "url": 1, "views": 1, "applications": 1},
+            batch_size=batch_size,
+        ) as vacancies:
+            yield from vacancies
 
     def fetch_vacancies(
         self, category: str, start_from_publication_date: datetime, end_date_of_publication: datetime
     ) -> list[dict[str, Any]]:
-        with self.collection.aggregate(
+        return list(
+            self.iter_vacancies(category, start_from_publication_date, end_date_of_publication, projection=None)
+        )
+
+
+class CollectionStatistics(MongoClient):
+    collection_name = "statistics"
+    indexes: ClassVar[list[tuple[str, int]]] = [("category", ASCENDING), ("upsert_datetime", DESCENDING)]
+    datetime_fields = ("from_datetime", "to_datetime", "upsert_datetime")
+
+
+class CollectionTokenCounts(MongoClient):
+    collection_name = "token_counts"
+    indexes: ClassVar[list[tuple[str, int]]] = [("url", ASCENDING)]
+
+    def fetch_token_counts(self, urls: Sequence[str]) -> dict[str, VacancyTokenCounts]:
+        with self.collection.find({"url": {"$in": list(urls)}}, {"_id": 0}) as token_counts:
+            return {document["url"]: VacancyTokenCounts(**document) for document in token_counts}
+
+
+class CollectionDailyTechnologyCounts(MongoClient):
+    """Technology counts of each category per publication day, summed up to answer any range of days."""
+
+    collection_name = "daily_technology_counts"
+    indexes: ClassVar[list[tuple[str, int]]] = [("category", ASCENDING), ("day", ASCENDING)]
+
+    def fetch_categories(self) -> list[str]:
+        return self.collection.distinct("category")
+
+    def fetch_technology_frequency(
+        self, category: str, from_day: datetime, to_day: datetime, *, limit: int = 50
+    ) -> dict[str, int]:
+        """Sum up the counts of the days from `from_day` to `to_day` inclusive within the database
+        and return the `limit` most frequent technologies, the way they were written most recently.
+        """
+        technologies = self.collection.aggregate(
             [
-                {"$addFields": {"pubDate": {"$dateFromString": {"dateString": "$publication_date"}}}},
+                {"$match": {"category": category, "day": {"$gte": from_day, "$lte": to_day}}},
+                {"$sort": {"day": ASCENDING}},
+                {"$unwind": "$counts"},
                 {
-                    "$match": {
-                        "category": category,
-                        "pubDate": {"$gte": start_from_publication_date, "$lte": end_date_of_publication},
+                    "$group": {
+                        "_id": {"$arrayElemAt": ["$counts", 0]},
+                        "count": {"$sum": {"$arrayElemAt": ["$counts", 1]}},
+                        "surface": {"$last": {"$arrayElemAt": ["$counts", 2]}},
                     }
                 },
-                {"$project": {"pubDate": 0}},
+                {"$sort": {"count": DESCENDING, "_id": ASCENDING}},
+                {"$limit": limit},
             ]
-        ) as vacancies:
-            return list(vacancies)
+        )
+        with technologies:
+            return {technology["surface"]: technology["count"] for technology in technologies}
 
+    def iter_daily_counts(self, category: str, from_day: datetime, to_day: datetime) -> Iterator[DailyTechnologyCounts]:
+        query = {"category": category, "day": {"$gte": from_day, "$lte": to_day}}
+        with self.collection.find(query, {"_id": 0}) as daily_counts:
+            for document in daily_counts:
+                yield DailyTechnologyCounts(**document)
 
-class CollectionStatistics(MongoClient):
-    collection_name = "statistics"
-    indexes: ClassVar[list[tuple[str, int]]] = [("category", ASCENDING), ("upsert_datetime", DESCENDING)]
+
+def sum_daily_counts(daily_counts: Iterable[DailyTechnologyCounts], *, limit: int = 50) -> dict[str, int]:
+    """Sum up the `daily_counts` in memory, the same way `fetch_technology_frequency` does within the database."""
+    totals: dict[str, int] = {}
+    surfaces: dict[str, tuple[datetime, str]] = {}
+    for day_counts in daily_counts:
+        for technology, count, surface in day_counts.counts:
+            totals[technology] = totals.get(technology, 0) + count
+            if technology not in surfaces or surfaces[technology][0] <= day_counts.day:
+                surfaces[technology] = (day_counts.day, surface)
+    most_common = sorted(totals.items(), key=lambda technology_count: (-technology_count[1], technology_count[0]))
+    return {surfaces[technology][1]: count for technology, count in most_common[:limit]}
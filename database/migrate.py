@@ -0,0 +1,37 @@
+"""One-off migration of datetimes stored as strings into BSON dates.
+
+Run it once for the existing collections:
+    python -m database.migrate
+"""
+
+import argparse
+
+from .client import MongoClient
+from .collections import CollectionStatistics, CollectionVacancies
+
+COLLECTIONS: dict[str, type[MongoClient]] = {
+    CollectionVacancies.collection_name: CollectionVacancies,
+    CollectionStatistics.collection_name: CollectionStatistics,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert datetimes stored as strings into BSON dates.")
+    parser.add_argument(
+        "--collections",
+        type=str,
+        nargs="*",
+        choices=COLLECTIONS.keys(),
+        default=list(COLLECTIONS),
+        help="Collections to migrate (space-separated list).",
+    )
+    args = parser.parse_args()
+
+    for collection_name in args.collections:
+        with COLLECTIONS[collection_name]() as collection:
+            modified_count = collection.migrate_datetime_fields()
+        print(f"{collection_name}: {modified_count}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import datetime
 
-from pydantic import BaseModel, Field, HttpUrl, NonNegativeFloat, NonNegativeInt
+from pydantic import BaseModel, Field, HttpUrl, NonNegativeFloat, NonNegativeInt, TypeAdapter, ValidationError
+from pydantic_core import ErrorDetails
 
 
 class InteractionStats(BaseModel):
@@ -21,9 +25,69 @@ class VacancyItem(InteractionStats):
     url: HttpUrl
 
 
+@dataclass(slots=True)
+class ScrapedVacancy:
+    """The fields of a `VacancyItem` as scraped, unvalidated. Spiders yield it, since it's several times cheaper
+    to create and to keep in memory, and pipelines validate the buffered items in batches with `validate_vacancies`.
+    """
+
+    views: int
+    applications: int
+    source: str
+    category: str
+    company_name: str | None
+    address: str | None
+    title: str
+    description: str
+    years_of_experience: float
+    publication_date: datetime
+    url: str
+
+
+_vacancy_items_adapter = TypeAdapter(list[VacancyItem])
+
+
+def validate_vacancies(
+    items: Sequence[ScrapedVacancy | VacancyItem],
+) -> tuple[list[VacancyItem], list[tuple[ScrapedVacancy | VacancyItem, list[ErrorDetails]]]]:
+    """Validate the `items` within a single call to pydantic-core, and return the valid ones along with the invalid
+    ones and their errors. Items which are already a `VacancyItem` are kept as they are.
+    """
+    try:
+        return _vacancy_items_adapter.validate_python(items, from_attributes=True), []
+    except ValidationError as error:
+        errors: defaultdict[int, list[ErrorDetails]] = defaultdict(list)
+        for details in error.errors(include_url=False):
+            index, *loc = details["loc"]
+            errors[int(index)].append(details | {"loc": tuple(loc)})
+    valid_items = [item for index, item in enumerate(items) if index not in errors]
+    return (
+        _vacancy_items_adapter.validate_python(valid_items, from_attributes=True),
+        [(items[index], item_errors) for index, item_errors in sorted(errors.items())],
+    )
+
+
 class Statistics(BaseModel):
     category: str = Field(min_length=1)
     from_datetime: datetime
     to_datetime: datetime
     technology_frequency: dict[str, int]
     upsert_datetime: datetime
+
+
+class VacancyTokenCounts(BaseModel):
+    url: str = Field(min_length=1)
+    # Hash of the vacancy description and of the configuration used to count its technologies.
+    digest: str = Field(min_length=1)
+    # Lowercased technology, its count and the way it's written in the vacancy.
+    counts: list[tuple[str, NonNegativeInt, str]]
+
+
+class DailyTechnologyCounts(BaseModel):
+    category: str = Field(min_length=1)
+    # Midnight of the publication day in Kyiv, without a timezone.
+    day: datetime
+    # Number of vacancies published within the day.
+    vacancies: NonNegativeInt
+    # Lowercased technology, its count and the way it's written in the vacancies.
+    counts: list[tuple[str, NonNegativeInt, str]]
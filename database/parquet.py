@@ -0,0 +1,195 @@
+"""Local Parquet dataset of vacancies, the columnar alternative to MongoDB and CSV files."""
+
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Self
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .models import VacancyItem
+
+# Fields stored in the directory names rather than within the files.
+PARTITION_SCHEMA = pa.schema([("category", pa.string()), ("month", pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+FILE_SCHEMA = pa.schema(
+    [
+        ("views", pa.int64()),
+        ("applications", pa.int64()),
+        ("source", pa.string()),
+        ("company_name", pa.string()),
+        ("address", pa.string()),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("years_of_experience", pa.float64()),
+        ("publication_date", pa.timestamp("us", tz="UTC")),
+        ("url", pa.string()),
+    ]
+)
+DATASET_SCHEMA = pa.unify_schemas([FILE_SCHEMA, PARTITION_SCHEMA])
+DEFAULT_ROW_GROUP_SIZE = 10_000
+# Rows are numbered by the position of their file shifted by this many bits plus their index within the file.
+ROW_NUMBER_BITS = 32
+
+
+def _utc(value: datetime) -> datetime:
+    return value.astimezone(UTC) if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def _iter_months(start: datetime, end: datetime) -> Iterator[str]:
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield f"{year:04}-{month:02}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class ParquetVacancies:
+    """Vacancies stored in a Parquet dataset at `path`, partitioned by category and UTC month of publication
+    in the Hive layout: `category=Python/month=2025-06/part-<run>.parquet`.
+
+    Each writer adds a file per partition it writes to, made of zstd compressed row groups of `row_group_size` rows.
+    Files are readable once the writer is closed. Readers prune partitions by category, read the URLs
+    and publication dates of the rows to find the latest version of each vacancy, and read the rest
+    of the requested columns only from the row groups holding the vacancies published within the range.
+    Vacancies written by several runs are read from the latest one.
+    """
+
+    def __init__(self, path: Path, *, row_group_size: int = DEFAULT_ROW_GROUP_SIZE, compression: str = "zstd") -> None:
+        self.path = path
+        self.row_group_size = row_group_size
+        self.compression = compression
+        # File names sort in the order the runs started, which is the order vacancies are deduplicated by.
+        self.run_name = f"part-{datetime.now(UTC):%Y%m%dT%H%M%S%f}"
+        self.paths: list[Path] = []
+        self._writers: dict[tuple[str, str], pq.ParquetWriter] = {}
+        self._buffers: dict[tuple[str, str], list[dict[str, Any]]] = {}
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def write(self, items: Iterable[VacancyItem]) -> None:
+        """Buffer the items by partition and write a row group of each partition which has enough rows."""
+        for item in items:
+            row = item.model_dump(exclude={"category"})
+            row["url"] = str(item.url)
+            row["publication_date"] = _utc(item.publication_date)
+            key = (item.category, f"{row['publication_date']:%Y-%m}")
+            rows = self._buffers.setdefault(key, [])
+            rows.append(row)
+            if len(rows) >= self.row_group_size:
+                self._write_row_group(key)
+
+    def _write_row_group(self, key: tuple[str, str]) -> None:
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+        writer = self._writers.get(key)
+        if writer is None:
+            category, month = key
+            path = self.path / f"category={quote(category, safe='')}" / f"month={month}" / f"{self.run_name}.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = self._writers[key] = pq.ParquetWriter(path, FILE_SCHEMA, compression=self.compression)
+            self.paths.append(path)
+        writer.write_table(pa.Table.from_pylist(rows, schema=FILE_SCHEMA), row_group_size=self.row_group_size)
+
+    def close(self) -> None:
+        """Write the buffered rows and the footers of the files."""
+        for key in list(self._buffers):
+            self._write_row_group(key)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def fetch_categories(self) -> list[str]:
+        """Return the categories having vacancies, read from the partition directory names."""
+        if not self.path.is_dir():
+            return []
+        return sorted(unquote(path.name.removeprefix("category=")) for path in self.path.glob("category=*"))
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.path, schema=DATASET_SCHEMA, format="parquet", partitioning=PARTITIONING)
+
+    def iter_vacancies(
+        self,
+        category: str | Sequence[str] | None,
+        start_from_publication_date: datetime,
+        end_date_of_publication: datetime,
+        *,
+        columns: Sequence[str] = ("url", "description"),
+    ) -> Iterator[dict[str, Any]]:
+        """Lazily yield the `columns` of the vacancies of the `category` (a sequence of them, or all if None)
+        published within the range, in the order they were written.
+
+        The latest version of each vacancy is resolved first from the URLs and publication dates of all the rows
+        of the categories, so that an earlier version within the range is hidden by a later one moved out of it.
+        Only the row groups holding the latest versions within the range are read beyond that.
+        """
+        if not self.path.is_dir():
+            return
+        dataset = self.dataset()
+        expression = None
+        if category is not None:
+            expression = ds.field("category").isin([category] if isinstance(category, str) else list(category))
+        # Runs sort in the order they started. Within a run, a vacancy moved to a later month of publication
+        # is written to the later month, so the last row of a URL is its latest version.
+        fragments = sorted(
+            dataset.get_fragments(filter=expression),
+            key=lambda fragment: (Path(fragment.path).name, Path(fragment.path).parent.name),
+        )
+        if not fragments:
+            return
+        latest_rows = self._read_latest_rows(
+            dataset, fragments, _utc(start_from_publication_date), _utc(end_date_of_publication)
+        )
+        row_numbers = latest_rows["row"].to_numpy()
+        read_columns = [column for column in columns if column not in latest_rows.column_names]
+
+        for position, fragment in enumerate(fragments):
+            first_row = position << ROW_NUMBER_BITS
+            if not np.any((row_numbers >= first_row) & (row_numbers < (position + 1) << ROW_NUMBER_BITS)):
+                continue
+            for row_group in fragment.split_by_row_group():
+                end_row = first_row + row_group.row_groups[0].num_rows
+                first, last = np.searchsorted(row_numbers, (first_row, end_row))
+                if first < last:
+                    rows = latest_rows.slice(first, last - first)
+                    if read_columns:
+                        # The URLs and publication dates are already read, the rest is taken from the row group.
+                        table = row_group.scanner(schema=dataset.schema, columns=read_columns).take(
+                            pc.subtract(rows["row"], first_row)
+                        )
+                        for column in read_columns:
+                            rows = rows.append_column(column, table[column])
+                    yield from rows.select(columns).to_pylist()
+                first_row = end_row
+
+    @staticmethod
+    def _read_latest_rows(
+        dataset: ds.Dataset, fragments: Sequence[ds.Fragment], start: datetime, end: datetime
+    ) -> pa.Table:
+        """Return the URL and publication date of the latest row of each URL published within the range,
+        along with the number of the row made of the position of its fragment and its index within the fragment.
+        """
+        tables = []
+        for position, fragment in enumerate(fragments):
+            table = fragment.to_table(schema=dataset.schema, columns=["url", "publication_date"])
+            first_row = position << ROW_NUMBER_BITS
+            tables.append(
+                table.append_column("row", pa.array(range(first_row, first_row + table.num_rows), type=pa.int64()))
+            )
+        rows = pa.concat_tables(tables)
+        latest_row_numbers = rows.group_by("url", use_threads=False).aggregate([("row", "max")])["row_max"]
+        timestamp_type = FILE_SCHEMA.field("publication_date").type
+        return rows.filter(
+            pc.field("row").isin(latest_row_numbers)
+            & (pc.field("publication_date") >= pa.scalar(start, type=timestamp_type))
+            & (pc.field("publication_date") <= pa.scalar(end, type=timestamp_type))
+        )
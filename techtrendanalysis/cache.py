@@ -0,0 +1,137 @@
+"""Persistent per-vacancy technology counts, so that only new or changed vacancies are processed by spaCy."""
+
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from datetime import timedelta
+from itertools import batched
+from pathlib import Path
+from time import time
+from typing import Any
+
+from database import VacancyTokenCounts
+
+# Lowercased technology mapped to its count and the way it's written in the vacancy.
+TokenCounts = dict[str, tuple[int, str]]
+# SQLite limits the number of host parameters within a single query.
+SQLITE_MAX_VARIABLES = 500
+
+
+class TokenCountCache(ABC):
+    """Technology counts of vacancies keyed by the vacancy URL along with the digest they were counted for."""
+
+    @abstractmethod
+    def get_many(self, urls: Sequence[str]) -> dict[str, tuple[str, TokenCounts]]:
+        """Return the digest and technology counts of each cached URL."""
+
+    @abstractmethod
+    def set_many(self, entries: Sequence[tuple[str, str, TokenCounts]]) -> None:
+        """Store `(url, digest, counts)` entries replacing the previously cached ones."""
+
+
+class SQLiteTokenCountCache(TokenCountCache):
+    """Cache stored in a local SQLite file. The connection is opened lazily in each process using the cache.
+    Entries keep the time they were last looked up or stored at, so that unused ones are pruned with `prune`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return self.__dict__ | {"_connection": None}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self._connection:
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS token_counts ("
+                "url TEXT PRIMARY KEY, digest TEXT NOT NULL, counts TEXT, accessed_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(token_counts)")}
+            if "accessed_at" not in columns:
+                # Entries of caches created before are pruned first.
+                self._connection.execute("ALTER TABLE token_counts ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS token_counts_accessed_at ON token_counts (accessed_at)"
+            )
+        return self._connection
+
+    def get_many(self, urls: Sequence[str]) -> dict[str, tuple[str, TokenCounts]]:
+        cached = {}
+        for urls_batch in batched(urls, SQLITE_MAX_VARIABLES, strict=False):
+            placeholders = ", ".join("?" * len(urls_batch))
+            rows = self.connection.execute(
+                f"SELECT url, digest, counts FROM token_counts WHERE url IN ({placeholders})",  # noqa: S608
+                urls_batch,
+            )
+            for url, digest, counts in rows:
+                cached[url] = (digest, {noun: (count, surface) for noun, count, surface in json.loads(counts)})
+        now = time()
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE token_counts SET accessed_at = ? WHERE url = ?", ((now, url) for url in cached)
+            )
+        return cached
+
+    def set_many(self, entries: Sequence[tuple[str, str, TokenCounts]]) -> None:
+        now = time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO token_counts (url, digest, counts, accessed_at) VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        url,
+                        digest,
+                        json.dumps([(noun, count, surface) for noun, (count, surface) in counts.items()]),
+                        now,
+                    )
+                    for url, digest, counts in entries
+                ),
+            )
+
+    def prune(self, max_age: timedelta) -> int:
+        """Delete the entries which weren't looked up for `max_age`, such as the ones of vacancies published
+        before the analyzed range, and shrink the file. Return the number of deleted entries.
+        """
+        with self.connection:
+            deleted = self.connection.execute(
+                "DELETE FROM token_counts WHERE accessed_at < ?", (time() - max_age.total_seconds(),)
+            ).rowcount
+        if deleted:
+            self.connection.execute("VACUUM")
+        return deleted
+
+
+class MongoTokenCountCache(TokenCountCache):
+    """Cache stored in the `token_counts` MongoDB collection."""
+
+    def get_many(self, urls: Sequence[str]) -> dict[str, tuple[str, TokenCounts]]:
+        from database import CollectionTokenCounts  # noqa: PLC0415
+
+        with CollectionTokenCounts() as collection_token_counts:
+            return {
+                url: (token_counts.digest, {noun: (count, surface) for noun, count, surface in token_counts.counts})
+                for url, token_counts in collection_token_counts.fetch_token_counts(urls).items()
+            }
+
+    def set_many(self, entries: Sequence[tuple[str, str, TokenCounts]]) -> None:
+        if not entries:
+            return
+        from database import CollectionTokenCounts  # noqa: PLC0415
+
+        with CollectionTokenCounts() as collection_token_counts:
+            collection_token_counts.bulk_upsert(
+                ("url",),
+                items=[
+                    VacancyTokenCounts(
+                        url=url,
+                        digest=digest,
+                        counts=[(noun, count, surface) for noun, (count, surface) in counts.items()],
+                    )
+                    for url, digest, counts in entries
+                ],
+            )
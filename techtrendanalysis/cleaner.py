@@ -0,0 +1,41 @@
+"""Vacancy text cleaner compiling its patterns once per set of filters."""
+
+import re
+from collections.abc import Iterable, Iterator
+from functools import cache
+
+# HTML tags and extra symbols replaced with a space.
+DEFAULT_FILTERS = frozenset({"<br>", "<b>", "</b>", "• ", "- ", "\n"})
+PUNCTUATION = b"!\"#$%&'()*+,.:;<=>?@[\\]^_`{|}~"
+# Punctuation is ASCII, so it's safely replaced within UTF-8 bytes, which is much faster than a regex.
+PUNCTUATION_TABLE = bytes.maketrans(PUNCTUATION, b" " * len(PUNCTUATION))
+# Cyrillic Unicode range: \u0400-\u04FF
+CYRILLIC_PATTERN = re.compile(r"[\u0400-\u04FF]+")
+
+
+class TextCleaner:
+    """Remove Cyrillic, filters, punctuation and extra spaces from a text.
+
+    Filters are matched literally, ignoring the case, within a single pass of a pattern compiled once.
+    Punctuation is replaced using a translation table and spaces are collapsed without regular expressions.
+    """
+
+    def __init__(self, extra_filters: Iterable[str] = ()) -> None:
+        filters = sorted(DEFAULT_FILTERS.union(extra_filters) - {""}, key=len, reverse=True)
+        self.filters_pattern = re.compile("|".join(re.escape(text_filter) for text_filter in filters), re.IGNORECASE)
+
+    def clean(self, text: str) -> str:
+        text = self.filters_pattern.sub(" ", CYRILLIC_PATTERN.sub("", text))
+        text = text.encode(errors="surrogatepass").translate(PUNCTUATION_TABLE).decode(errors="surrogatepass")
+        return " ".join(text.split())
+
+    def clean_many(self, texts: Iterable[str]) -> Iterator[str]:
+        """Lazily clean a stream of texts one by one."""
+        for text in texts:
+            yield self.clean(text)
+
+
+@cache
+def get_text_cleaner(extra_filters: frozenset[str] = frozenset()) -> TextCleaner:
+    """Return a cleaner shared by all users of the same `extra_filters`."""
+    return TextCleaner(extra_filters)
@@ -0,0 +1,211 @@
+"""Per-stage wall time, CPU time, counts and peak RSS of a run, reported as JSON and as a Prometheus textfile."""
+
+import os
+import resource
+import sys
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from json import dumps
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import perf_counter, process_time
+from typing import Any
+
+# A metric name, its help text and its samples, which are label sets along with values.
+Metric = tuple[str, str, list[tuple[Mapping[str, str], float]]]
+
+
+def peak_rss(who: int = resource.RUSAGE_SELF) -> int:
+    """The peak resident set size of the process (or of its terminated children) so far, in bytes."""
+    max_rss = resource.getrusage(who).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _cpu_time() -> float:
+    """CPU time of the process along with its terminated children, such as the workers of a process pool."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def write_atomically(path: Path, text: str) -> None:
+    """Readers, such as the textfile collector of the node exporter, never see a partially written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile("w", dir=path.parent, delete=False) as file:
+        file.write(text)
+    # The temporary file is readable by its owner only, unlike files created with `open`. The umask isn't applied,
+    # since reading it means changing it for every thread of the process.
+    Path(file.name).chmod(0o644)
+    Path(file.name).replace(path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def format_prometheus_metrics(metrics: Iterable[Metric]) -> str:
+    """Format gauges in the Prometheus text exposition format."""
+    lines = []
+    for name, help_text, samples in metrics:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for labels, value in samples:
+            label_pairs = ",".join(f'{label}="{_escape(label_value)}"' for label, label_value in labels.items())
+            lines.append(f"{name}{{{label_pairs}}} {value!r}" if label_pairs else f"{name} {value!r}")
+    return "\n".join(lines) + "\n"
+
+
+@dataclass(slots=True)
+class StageMetrics:
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    calls: int = 0
+    # The peak RSS of the process by the end of the stage.
+    peak_rss: int = 0
+    counts: Counter[str] = field(default_factory=Counter)
+
+    def merge(self, other: "StageMetrics") -> None:
+        self.wall_time += other.wall_time
+        self.cpu_time += other.cpu_time
+        self.calls += other.calls
+        self.peak_rss = max(self.peak_rss, other.peak_rss)
+        self.counts.update(other.counts)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "calls": self.calls,
+            "peak_rss": self.peak_rss,
+            "counts": dict(self.counts),
+        }
+
+
+class Instrumentation:
+    """Wall and CPU time spent in each named stage of a run, what the stage processed and the peak RSS.
+
+    Stages nest: time spent in a stage started within another one is accounted to the inner stage only.
+    Lazy stages, like reading vacancies that are cleaned as they are read, are timed with `iter_stage`
+    on each item, so the time of a streaming pipeline is split between its stages.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageMetrics] = {}
+        self.started_at = datetime.now(UTC)
+        self._started = (perf_counter(), _cpu_time())
+        # Wall and CPU time of the stages nested in each of the running stages.
+        self._nested: list[list[float]] = []
+
+    def _start(self) -> tuple[float, float]:
+        self._nested.append([0.0, 0.0])
+        return perf_counter(), process_time()
+
+    def _stop(self, name: str, started: tuple[float, float]) -> StageMetrics:
+        wall_time, cpu_time = perf_counter() - started[0], process_time() - started[1]
+        nested_wall_time, nested_cpu_time = self._nested.pop()
+        if self._nested:
+            self._nested[-1][0] += wall_time
+            self._nested[-1][1] += cpu_time
+        metrics = self.stages.setdefault(name, StageMetrics())
+        metrics.wall_time += wall_time - nested_wall_time
+        metrics.cpu_time += cpu_time - nested_cpu_time
+        return metrics
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """Time the block as the `name` stage. The yielded metrics are there to add counts to."""
+        started = self._start()
+        try:
+            yield self.stages.setdefault(name, StageMetrics())
+        finally:
+            metrics = self._stop(name, started)
+            metrics.calls += 1
+            metrics.peak_rss = max(metrics.peak_rss, peak_rss())
+
+    def iter_stage[T](self, name: str, iterable: Iterable[T], *, unit: str = "items") -> Iterator[T]:
+        """Lazily yield the items of the `iterable`, timing the production of each of them as the `name` stage
+        and counting them in `unit`.
+        """
+        metrics = self.stages.setdefault(name, StageMetrics())
+        iterator = iter(iterable)
+        try:
+            while True:
+                started = self._start()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self._stop(name, started)
+                metrics.counts[unit] += 1
+                yield item
+        finally:
+            metrics.calls += 1
+            metrics.peak_rss = max(metrics.peak_rss, peak_rss())
+
+    def merge(self, other: "Instrumentation") -> None:
+        """Add the stages of a run in another process, such as a process pool worker."""
+        for name, metrics in other.stages.items():
+            self.stages.setdefault(name, StageMetrics()).merge(metrics)
+
+    def report(self, **labels: str) -> dict[str, Any]:
+        """The stages along with the totals of the run so far, including its terminated child processes."""
+        return {
+            **labels,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now(UTC).isoformat(),
+            "wall_time": perf_counter() - self._started[0],
+            "cpu_time": _cpu_time() - self._started[1],
+            "peak_rss": max(peak_rss(), peak_rss(resource.RUSAGE_CHILDREN)),
+            "stages": {name: metrics.to_dict() for name, metrics in self.stages.items()},
+        }
+
+    def prometheus_metrics(self, prefix: str, **labels: str) -> list[Metric]:
+        report = self.report()
+        stages = [({**labels, "stage": name}, metrics) for name, metrics in self.stages.items()]
+        return [
+            (f"{prefix}_wall_seconds", "Wall time of the last run.", [(labels, report["wall_time"])]),
+            (f"{prefix}_cpu_seconds", "CPU time of the last run.", [(labels, report["cpu_time"])]),
+            (f"{prefix}_peak_rss_bytes", "Peak resident set size of the last run.", [(labels, report["peak_rss"])]),
+            (
+                f"{prefix}_last_run_timestamp_seconds",
+                "When the last run finished.",
+                [(labels, datetime.fromisoformat(report["finished_at"]).timestamp())],
+            ),
+            (
+                f"{prefix}_stage_wall_seconds",
+                "Wall time spent in the stage, excluding nested stages.",
+                [(stage_labels, metrics.wall_time) for stage_labels, metrics in stages],
+            ),
+            (
+                f"{prefix}_stage_cpu_seconds",
+                "CPU time spent in the stage, excluding nested stages.",
+                [(stage_labels, metrics.cpu_time) for stage_labels, metrics in stages],
+            ),
+            (
+                f"{prefix}_stage_peak_rss_bytes",
+                "Peak resident set size by the end of the stage.",
+                [(stage_labels, metrics.peak_rss) for stage_labels, metrics in stages],
+            ),
+            (
+                f"{prefix}_stage_processed",
+                "Number of things the stage processed, by unit.",
+                [
+                    ({**stage_labels, "unit": unit}, count)
+                    for stage_labels, metrics in stages
+                    for unit, count in sorted(metrics.counts.items())
+                ],
+            ),
+        ]
+
+    def write_reports(
+        self, json_path: Path | None = None, textfile_path: Path | None = None, *, prefix: str, **labels: str
+    ) -> None:
+        """Write the report as JSON to `json_path` and as a Prometheus textfile to `textfile_path`,
+        with metric names starting with `prefix`.
+        """
+        if json_path:
+            write_atomically(json_path, dumps(self.report(**labels), indent=2))
+        if textfile_path:
+            write_atomically(textfile_path, format_prometheus_metrics(self.prometheus_metrics(prefix, **labels)))
@@ -0,0 +1,157 @@
+"""Dictionary-driven technology matcher finding single- and multi-word technologies along with their aliases.
+
+Aliases are cleaned and tokenized the way vacancy descriptions are, so `C#`, `C++` and `C` become the same token and
+only the first of them is kept. That's why `C#/.NET` is listed as a single technology.
+"""
+
+import logging
+import os
+import pickle
+from collections.abc import Iterator, Mapping, Sequence
+from functools import cache
+from hashlib import sha256
+from json import loads
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING, Self
+
+from techtrendanalysis.cleaner import DEFAULT_FILTERS, PUNCTUATION, get_text_cleaner
+from techtrendanalysis.nlp import load_nlp
+
+if TYPE_CHECKING:
+    import numpy as np
+    from spacy.strings import StringStore
+
+logger = logging.getLogger(__name__)
+
+# Canonical technology names mapped to their aliases.
+TECHNOLOGIES_PATH = Path(__file__).parent / "technologies.json"
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "techtrendanalysis"
+# Bump it whenever the pickled matcher changes, so that matchers cached by older versions are rebuilt.
+FORMAT_VERSION = 1
+ROOT_STATE = 0
+# How a single-word alias must be written in the text: in any case, starting with an uppercase letter or uppercased.
+ANY_CASE, CAPITALIZED, UPPERCASE = 0, 1, 2
+
+
+def _case_rule(alias: str) -> int:
+    """Common words like `go`, `rest` or `solid` count only if written the way the technology is."""
+    if len(alias) > 1 and alias.isupper():
+        return UPPERCASE
+    if alias[:1].isupper():
+        return CAPITALIZED
+    return ANY_CASE
+
+
+class TechnologyMatcher:
+    """A trie of the lowercased token hashes of all the aliases, matching the leftmost-longest aliases without
+    overlaps: `Amazon Neptune` is counted once, not along with `Neptune`. Only tokens starting an alias are looked up
+    with NumPy, and the trie is walked from each of them for at most the length of the longest alias,
+    so a token stream is matched within a single pass regardless of the number of technologies.
+    """
+
+    def __init__(
+        self,
+        technologies: Sequence[str],
+        transitions: Mapping[tuple[int, int], int],
+        terminals: Mapping[int, tuple[int, int]],
+        digest: str,
+    ) -> None:
+        """`transitions` map a state and a token hash to the next state, `terminals` map the states
+        completing an alias to the technology index and the case rule of single-word aliases.
+        """
+        import numpy as np  # noqa: PLC0415
+
+        self.technologies = list(technologies)
+        self.transitions = dict(transitions)
+        self.terminals = dict(terminals)
+        self.digest = digest
+        self.first_tokens = np.array(
+            sorted({token for state, token in self.transitions if state == ROOT_STATE}), dtype=np.uint64
+        )
+
+    @classmethod
+    def build(cls, dictionary: Mapping[str, Sequence[str]], digest: str) -> Self:
+        """Build the trie of the technologies of the `dictionary` and of their aliases."""
+        tokenizer, cleaner = load_nlp(tokenizer_only=True).tokenizer, get_text_cleaner()
+        technologies = list(dictionary)
+        transitions: dict[tuple[int, int], int] = {}
+        terminals: dict[int, tuple[int, int]] = {}
+        for technology_index, technology in enumerate(technologies):
+            for alias in (technology, *dictionary[technology]):
+                tokens = tokenizer(cleaner.clean(alias))
+                if not len(tokens):
+                    logger.warning("Alias %r of %r is empty once cleaned", alias, technology)
+                    continue
+                state = ROOT_STATE
+                for token in tokens:
+                    state = transitions.setdefault((state, token.lower), len(transitions) + 1)
+                if state in terminals:
+                    if terminals[state][0] != technology_index:
+                        logger.warning(
+                            "Alias %r of %r is matched as %r", alias, technology, technologies[terminals[state][0]]
+                        )
+                    continue
+                terminals[state] = (technology_index, _case_rule(tokens[0].text) if len(tokens) == 1 else ANY_CASE)
+        return cls(technologies, transitions, terminals, digest)
+
+    @classmethod
+    def load(cls, path: Path = TECHNOLOGIES_PATH, *, cache_dir: Path | None = None) -> Self:
+        """Load the matcher of the technologies in the `path` JSON file from `cache_dir` (`CACHE_DIR` by default),
+        or build it and cache it there, if the file, the tokenizer or the cleaner have changed since.
+        """
+        import spacy  # noqa: PLC0415
+
+        cache_dir = cache_dir or CACHE_DIR
+
+        content = path.read_bytes()
+        digest = sha256(
+            b"\0".join(
+                [content, spacy.__version__.encode(), PUNCTUATION, *sorted(text.encode() for text in DEFAULT_FILTERS)]
+            )
+        ).hexdigest()
+        cache_path = cache_dir / f"technology-matcher-v{FORMAT_VERSION}-{digest}.pickle"
+        if cache_path.exists():
+            return pickle.loads(cache_path.read_bytes())  # noqa: S301
+
+        matcher = cls.build(loads(content), digest)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Concurrent processes might build the matcher at once, so it's written to a temporary file first.
+        with NamedTemporaryFile(dir=cache_dir, delete=False) as cache_file:
+            pickle.dump(matcher, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        Path(cache_file.name).replace(cache_path)
+        logger.debug("Cached the matcher of %d technologies in %s", len(matcher.technologies), cache_path)
+        return matcher
+
+    def find(self, lowers: "np.ndarray", orths: "np.ndarray", strings: "StringStore") -> Iterator[tuple[int, int]]:
+        """Lazily yield the technology index and the first token index of each match within a token stream,
+        given as arrays of `LOWER` and `ORTH` token attributes of the same vocabulary `strings`.
+        """
+        import numpy as np  # noqa: PLC0415
+
+        end = 0
+        for start in np.flatnonzero(np.isin(lowers, self.first_tokens)).tolist():
+            if start < end:
+                continue
+            match, state, position = None, ROOT_STATE, start
+            while position < len(lowers) and (state := self.transitions.get((state, int(lowers[position])), 0)):
+                position += 1
+                if state in self.terminals:
+                    match = (self.terminals[state], position)
+            if match is None:
+                continue
+            (technology_index, case_rule), match_end = match
+            if case_rule != ANY_CASE and not self._matches_case(strings[int(orths[start])], case_rule):
+                continue
+            end = match_end
+            yield technology_index, start
+
+    @staticmethod
+    def _matches_case(text: str, case_rule: int) -> bool:
+        return text.isupper() if case_rule == UPPERCASE else text[:1].isupper()
+
+
+@cache
+def get_technology_matcher(path: Path = TECHNOLOGIES_PATH) -> TechnologyMatcher:
+    """Return a matcher shared by all users of the same technologies file."""
+    return TechnologyMatcher.load(path)
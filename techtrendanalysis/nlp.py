@@ -0,0 +1,45 @@
+"""Process-wide registry of spaCy pipelines, so that each model is loaded only once."""
+
+from functools import cache, partial
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.vocab import Vocab
+
+DEFAULT_MODEL = "en_core_web_md"
+# The wrangler reads only `token.text`, which is produced by the tokenizer alone.
+UNUSED_COMPONENTS = ("tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner")
+
+
+@cache
+def load_nlp(model_name: str = DEFAULT_MODEL, *, tokenizer_only: bool = False) -> "Language":
+    """Load the `model_name` pipeline without the components unused by the wrangler.
+    If `tokenizer_only` is True, a blank pipeline of the model's language is returned instead,
+    which doesn't require the model to be installed. spaCy itself is imported on the first call.
+    """
+    import spacy  # noqa: PLC0415
+
+    if tokenizer_only:
+        return spacy.blank(model_name.split("_", maxsplit=1)[0])
+    return spacy.load(model_name, exclude=UNUSED_COMPONENTS)
+
+
+def is_proper_noun(text: str, stopwords: frozenset[str]) -> bool:
+    """Whether the word starts with an uppercase English letter and isn't one of the `stopwords`."""
+    return "A" <= text[:1] <= "Z" and text.lower() not in stopwords
+
+
+def get_proper_noun_flag(vocab: "Vocab", stopwords: frozenset[str]) -> int:
+    """Return the lexeme flag marking the proper nouns of the `vocab`, adding it on the first call.
+    The flag is computed once per lexeme of the `vocab`, instead of once per token. Its getter is kept
+    by the `vocab` itself, which stays picklable for the workers of `nlp.pipe` and process pools.
+    """
+    for flag_id, getter in vocab.lex_attr_getters.items():
+        if (
+            isinstance(getter, partial)
+            and getter.func is is_proper_noun
+            and getter.keywords == {"stopwords": stopwords}
+        ):
+            return flag_id
+    return vocab.add_flag(partial(is_proper_noun, stopwords=stopwords))
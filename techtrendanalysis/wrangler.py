@@ -1,29 +1,67 @@
 import argparse
 import csv
+import gzip
 import logging
-import re
-from collections import Counter
-from datetime import datetime, timedelta
-from json import loads
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime, time, timedelta
+from functools import cached_property, partial
+from hashlib import sha256
+from itertools import batched
+from json import dumps, loads
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from zoneinfo import ZoneInfo
 
-import spacy
-from pymongo.results import BulkWriteResult
+from database import DailyTechnologyCounts, Statistics
+from techtrendanalysis.cache import MongoTokenCountCache, SQLiteTokenCountCache, TokenCountCache, TokenCounts
+from techtrendanalysis.cleaner import get_text_cleaner
+from techtrendanalysis.instrumentation import Instrumentation
+from techtrendanalysis.matcher import TECHNOLOGIES_PATH, get_technology_matcher
+from techtrendanalysis.nlp import DEFAULT_MODEL, get_proper_noun_flag, load_nlp
 
-from database import CollectionStatistics, CollectionVacancies, Statistics
+# spaCy, NumPy and pymongo are imported where they're used, so that the CLI starts fast and CSV files are analyzed
+# without connecting to MongoDB.
+if TYPE_CHECKING:
+    from pymongo.results import BulkWriteResult
+    from spacy.language import Language
+    from spacy.tokens import Doc
 
 STOPWORDS_DIR = Path("techtrendanalysis/stopwords")
+# Number of descriptions buffered by `nlp.pipe` before they are processed.
+DEFAULT_BATCH_SIZE = 64
+# Number of vacancies looked up in the token count cache at once.
+CACHE_LOOKUP_SIZE = 1000
+# Statistics are unique per category and publication date range.
+STATISTICS_FILTER_FIELDS = ("category", "from_datetime", "to_datetime")
+# Daily technology counts are unique per category and publication day.
+DAILY_COUNTS_FILTER_FIELDS = ("category", "day")
+
+
+def to_day(value: datetime) -> datetime:
+    """Midnight of the day the `value` falls on in Kyiv, without a timezone. Naive values are taken as UTC."""
+    kyiv_datetime = (value if value.tzinfo else value.replace(tzinfo=UTC)).astimezone(ZoneInfo("Europe/Kyiv"))
+    return datetime.combine(kyiv_datetime.date(), time())
+
+
+def to_whole_days(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+    """Extend the `start` and `end` of a range to the whole first and last days in Kyiv."""
+    kyiv = ZoneInfo("Europe/Kyiv")
+    return (
+        to_day(start).replace(tzinfo=kyiv),
+        (to_day(end) + timedelta(days=1)).replace(tzinfo=kyiv) - timedelta(microseconds=1),
+    )
 
 
 class Logging:
     def __init__(self, name: str = __name__) -> None:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
-        self.logger.addHandler(handler)
+        if not self.logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+            self.logger.addHandler(handler)
 
 
 class Wrangler(Logging):
@@ -35,14 +73,30 @@ class Wrangler(Logging):
         start_from_publication_date: datetime | None = None,
         end_date_of_publication: datetime | None = None,
         extra_text_filters: set[str] | None = None,
+        *,
+        tokenizer_only: bool = False,
+        token_count_cache: TokenCountCache | None = None,
+        technology_dictionary: Path | None = None,
+        instrumentation: Instrumentation | None = None,
     ) -> None:
         """If the `text` is not passed, it will be retrieved from the
-        vacancies in MongoDB.
+        vacancies in MongoDB. Set `tokenizer_only` to count technologies
+        with a blank English tokenizer instead of the trained spaCy model.
+        If `token_count_cache` is passed, technologies of each vacancy are
+        counted once and reused until its description or the configuration changes.
+        If `technology_dictionary` is passed, only the technologies listed in it
+        are counted instead of every capitalized word.
+        Stages are timed by the `instrumentation`, which might be shared by several wranglers.
         """
         super().__init__(__class__.__name__)
         self._text: str
         self._category = category
         self._extra_filters = extra_text_filters or set()
+        self._cleaner = get_text_cleaner(frozenset(self._extra_filters))
+        self._tokenizer_only = tokenizer_only
+        self._token_count_cache = token_count_cache
+        self._technology_dictionary = technology_dictionary
+        self.instrumentation = instrumentation or Instrumentation()
         now = datetime.now(ZoneInfo("Europe/Kyiv"))
         self.start_from_publication_date = start_from_publication_date or now - timedelta(days=30)
         self.end_date_of_publication = end_date_of_publication or now
@@ -55,108 +109,658 @@ class Wrangler(Logging):
         common_words = (STOPWORDS_DIR / "common-words.json").read_text()
         stopwords = (STOPWORDS_DIR / "stopwords.json").read_text()
         ukr_stopwords = (STOPWORDS_DIR / "ukrainian-stopwords.json").read_text()
-        self._stopwords = set(loads(ukr_stopwords) + loads(common_words) + loads(stopwords))
+        self._stopwords = frozenset(loads(ukr_stopwords) + loads(common_words) + loads(stopwords))
         tech_completions = (Path(__file__).parent / "tech_completions.json").read_text()
         self.tech_completions: dict[str, str] = loads(tech_completions)
+        # Cached counts are invalidated as soon as anything affecting them changes.
+        self._config: list[Any] = [
+            sorted(self._stopwords),
+            sorted(self.tech_completions.items()),
+            sorted(self._extra_filters),
+            self._tokenizer_only,
+        ]
+        if technology_dictionary:
+            self._config.append(sha256(technology_dictionary.read_bytes()).hexdigest())
+
+    @cached_property
+    def _config_digest(self) -> str:
+        """Digest of the configuration along with the spaCy model and version the counts were made with,
+        so that counts cached before an upgrade of either are made again.
+        """
+        import spacy  # noqa: PLC0415
+
+        nlp = self._load_nlp()
+        config = [*self._config, DEFAULT_MODEL, nlp.meta["name"], nlp.meta["version"], spacy.__version__]
+        return sha256(dumps(config).encode()).hexdigest()
 
     def _clean_text(self) -> None:
         self.logger.debug("Cleaning text ...")
-        # Cyrillic Unicode range: \u0400-\u04FF
-        self._text = re.sub(r"[\u0400-\u04FF]+", "", self._text)
-        # Get rid of HTML tags and extra symbols.
-        to_filter = {"<br>", "<b>", "</b>", "• ", "- ", "\n"}.union(self._extra_filters)
-        pattern = re.compile(rf"{'|'.join(to_filter)}", flags=re.IGNORECASE)
-        self._text = re.sub(pattern, " ", self._text)
-        # Remove any punctuation.
-        punctuation_pattern = re.compile(f"[{re.escape('!"#$%&\'()*+,.:;<=>?@[\\]^_`{|}~')}]")
-        self._text = punctuation_pattern.sub(" ", self._text)
-        # Remove any extra spaces.
-        self._text = re.sub(r"\s+", " ", self._text).strip()
+        with self.instrumentation.stage("clean") as metrics:
+            self._text = self._cleaner.clean(self._text)
+            metrics.counts["characters"] += len(self._text)
         self.logger.debug("Text cleaned")
 
-    def extract_text_from_vacancies(self, path_to_csv: Path | None = None) -> None:
-        """Extract vacancy descriptions from a MongoDB collection if no `path_to_csv` argument provided."""
+    def iter_vacancies(self, path_to_csv: Path | None = None) -> Iterator[tuple[str, str]]:
+        """Lazily yield vacancy URLs and descriptions from a MongoDB collection
+        if no `path_to_csv` argument provided. The CSV file might be gzip compressed,
+        a directory is read as a Parquet dataset written by `ParquetPipeline`.
+        """
+        for url, _, description in self.iter_dated_vacancies(path_to_csv):
+            yield url, description
+
+    def iter_dated_vacancies(
+        self, path_to_csv: Path | None = None, *, whole_days: bool = False
+    ) -> Iterator[tuple[str, datetime, str]]:
+        """Lazily yield vacancy URLs, publication dates and descriptions the way `iter_vacancies` does.
+        If `whole_days` is True, the publication date range is extended to the whole first and last days.
+        """
+        yield from self.instrumentation.iter_stage(
+            "extract", self._iter_dated_vacancies(path_to_csv, whole_days=whole_days), unit="vacancies"
+        )
+
+    def _iter_dated_vacancies(
+        self, path_to_csv: Path | None, *, whole_days: bool
+    ) -> Iterator[tuple[str, datetime, str]]:
+        start_from_publication_date, end_date_of_publication = (
+            self.start_from_publication_date,
+            self.end_date_of_publication,
+        )
+        if whole_days:
+            start_from_publication_date, end_date_of_publication = to_whole_days(
+                start_from_publication_date, end_date_of_publication
+            )
+
         if not path_to_csv:
+            from database import CollectionVacancies  # noqa: PLC0415
+
             with CollectionVacancies() as collection_vacancies:
-                vacancies = collection_vacancies.fetch_vacancies(
-                    self._category, self.start_from_publication_date, self.end_date_of_publication
-                )
-                self._text = " ".join([vacancy["description"] for vacancy in vacancies])
+                for vacancy in collection_vacancies.iter_vacancies(
+                    self._category,
+                    start_from_publication_date,
+                    end_date_of_publication,
+                    projection={"_id": 0, "url": 1, "publication_date": 1, "description": 1},
+                ):
+                    yield vacancy["url"], vacancy["publication_date"], vacancy["description"]
+        elif path_to_csv.is_dir():
+            from database import ParquetVacancies  # noqa: PLC0415
+
+            for vacancy in ParquetVacancies(path_to_csv).iter_vacancies(
+                self._category,
+                start_from_publication_date,
+                end_date_of_publication,
+                columns=("url", "publication_date", "description"),
+            ):
+                yield vacancy["url"], vacancy["publication_date"], vacancy["description"]
         else:
-            with path_to_csv.open() as csv_file:
-                reader = csv.DictReader(csv_file)
-                self._text = ""
-                for row in reader:
+            with (
+                gzip.open(path_to_csv, "rt", newline="")
+                if path_to_csv.suffix == ".gz"
+                else path_to_csv.open(newline="") as csv_file
+            ):
+                for row in csv.DictReader(csv_file):
+                    if self._category != row["category"]:
+                        continue
                     publication_date = datetime.fromisoformat(row["publication_date"])
-                    if (
-                        publication_date >= self.start_from_publication_date
-                        and publication_date <= self.end_date_of_publication
-                        and self._category == row["category"]
-                    ):
-                        self._text += row["description"]
+                    if start_from_publication_date <= publication_date <= end_date_of_publication:
+                        yield row["url"], publication_date, row["description"]
+
+    def iter_descriptions(self, path_to_csv: Path | None = None) -> Iterator[str]:
+        """Lazily yield vacancy descriptions from a MongoDB collection if no `path_to_csv` argument provided."""
+        for _, description in self.iter_vacancies(path_to_csv):
+            yield description
+
+    def extract_text_from_vacancies(self, path_to_csv: Path | None = None) -> None:
+        """Extract vacancy descriptions from a MongoDB collection if no `path_to_csv` argument provided."""
+        self._text = " ".join(self.iter_descriptions(path_to_csv))
         self.logger.debug("Text extracted")
 
-    def calculate_frequency_distribution(self, limit_results: int = 50) -> Statistics:
-        self._clean_text()
+    def _load_nlp(self) -> "Language":
+        with self.instrumentation.stage("load"):
+            return load_nlp(tokenizer_only=self._tokenizer_only)
 
-        self.logger.debug("Calculating frequency distribution ...")
-        nlp = spacy.load("en_core_web_md")  # Load the spaCy model.
-        doc = nlp(self._text)  # Process the text with spaCy.
+    def _count_proper_nouns(
+        self, docs: Sequence["Doc"], proper_nouns: Counter[str], lower_to_upper: dict[str, str]
+    ) -> None:
+        """Count words starting with an uppercase English letter, which aren't stopwords.
+        Tokens are filtered by a precomputed lexeme flag and counted by their hashes with NumPy,
+        so Python code runs once per distinct word of the `docs` rather than once per token.
+        """
+        if not docs:
+            return
+        import numpy as np  # noqa: PLC0415
+        from spacy.attrs import LOWER, ORTH  # noqa: PLC0415
 
-        # Unicode ranges for English letters.
-        eng_uppercase, eng_lowercase = range(65, 90), range(97, 122)
+        vocab = docs[0].vocab
+        flag = get_proper_noun_flag(vocab, self._stopwords)
+        tokens = np.concatenate([doc.to_array([flag, LOWER, ORTH]) for doc in docs])
+        proper_noun_tokens = tokens[tokens[:, 0] == 1]
+        lowers, first_indices, counts = np.unique(proper_noun_tokens[:, 1], return_index=True, return_counts=True)
+        # The first occurrence in the reversed tokens is the last spelling of a word.
+        _, reversed_last_indices = np.unique(proper_noun_tokens[::-1, 1], return_index=True)
+        orths = proper_noun_tokens[len(proper_noun_tokens) - 1 - reversed_last_indices, 2]
 
-        proper_nouns, lower_to_upper = [], {}
-        for token in doc:
-            token_text = token.text
-            token_text_lower = token_text.lower()
-            if (
-                token_text_lower not in self._stopwords
-                and token_text[0].upper() == token_text[0]
-                and (ord(token_text[0]) in eng_uppercase or ord(token_text[0]) in eng_lowercase)
-            ):
-                proper_nouns.append(token_text_lower)
-                lower_to_upper[token_text_lower] = self.tech_completions.get(token_text_lower, token_text)
+        # Keep the order of the first occurrences, as `Counter.most_common` sorts equal counts by insertion order.
+        order = np.argsort(first_indices, kind="stable")
+        lowers, orths, counts = lowers[order].tolist(), orths[order].tolist(), counts[order].tolist()
+        for lower, orth, count in zip(lowers, orths, counts, strict=True):
+            token_text_lower = vocab.strings[lower]
+            proper_nouns[token_text_lower] += count
+            lower_to_upper[token_text_lower] = self.tech_completions.get(token_text_lower, vocab.strings[orth])
+
+    def _count_technologies(
+        self, docs: Sequence["Doc"], technologies: Counter[str], lower_to_upper: dict[str, str]
+    ) -> None:
+        """Count the technologies of the dictionary mentioned in the `docs`."""
+        if not self._technology_dictionary:
+            raise ValueError(f"{self._technology_dictionary=}")
+        from spacy.attrs import LOWER, ORTH  # noqa: PLC0415
+
+        matcher = get_technology_matcher(self._technology_dictionary)
+        for doc in docs:
+            tokens = doc.to_array([LOWER, ORTH])
+            for technology_index, _ in matcher.find(tokens[:, 0], tokens[:, 1], doc.vocab.strings):
+                technology = matcher.technologies[technology_index]
+                technologies[technology.lower()] += 1
+                lower_to_upper[technology.lower()] = technology
+
+    def _count(self, docs: Sequence["Doc"], proper_nouns: Counter[str], lower_to_upper: dict[str, str]) -> None:
+        with self.instrumentation.stage("count") as metrics:
+            if self._technology_dictionary:
+                self._count_technologies(docs, proper_nouns, lower_to_upper)
+            else:
+                self._count_proper_nouns(docs, proper_nouns, lower_to_upper)
+            metrics.counts["tokens"] += sum(len(doc) for doc in docs)
+
+    def _count_descriptions(
+        self,
+        descriptions: Iterable[str],
+        proper_nouns: Counter[str],
+        lower_to_upper: dict[str, str],
+        *,
+        batch_size: int,
+        n_process: int,
+    ) -> None:
+        self.logger.debug("Calculating frequency distribution (batch_size=%s, n_process=%s) ...", batch_size, n_process)
+        texts = self.instrumentation.iter_stage("clean", self._cleaner.clean_many(descriptions), unit="descriptions")
+        docs = self._load_nlp().pipe(texts, batch_size=batch_size, n_process=n_process)
+        for docs_batch in batched(self.instrumentation.iter_stage("nlp", docs, unit="docs"), batch_size, strict=False):
+            self._count(docs_batch, proper_nouns, lower_to_upper)
+
+    def _iter_vacancy_counts(
+        self, vacancies: Iterable[tuple[str, str]], *, batch_size: int, n_process: int
+    ) -> Iterator[tuple[str, TokenCounts]]:
+        """Lazily yield the URL and technology counts of each vacancy. If the wrangler has a token count cache,
+        only new or changed vacancies are counted, the rest of the counts are taken from the cache.
+        """
+        nlp, counted_vacancies = self._load_nlp(), 0
+        for vacancies_batch in batched(vacancies, CACHE_LOOKUP_SIZE, strict=False):
+            digests = {
+                url: sha256(f"{self._config_digest}{description}".encode()).hexdigest()
+                for url, description in vacancies_batch
+            }
+            cached = {}
+            if self._token_count_cache:
+                with self.instrumentation.stage("cache") as metrics:
+                    cached = self._token_count_cache.get_many(list(digests))
+                    metrics.counts["hits"] += len(cached)
+            changed = {
+                url: description
+                for url, description in vacancies_batch
+                if url not in cached or cached[url][0] != digests[url]
+            }
+            texts = self.instrumentation.iter_stage(
+                "clean", self._cleaner.clean_many(changed.values()), unit="descriptions"
+            )
+            docs = self.instrumentation.iter_stage(
+                "nlp", nlp.pipe(texts, batch_size=batch_size, n_process=n_process), unit="docs"
+            )
+            counted: dict[str, TokenCounts] = {}
+            for url, doc in zip(changed, docs, strict=True):
+                vacancy_proper_nouns: Counter[str] = Counter()
+                vacancy_lower_to_upper: dict[str, str] = {}
+                self._count([doc], vacancy_proper_nouns, vacancy_lower_to_upper)
+                counted[url] = {
+                    noun: (count, vacancy_lower_to_upper[noun]) for noun, count in vacancy_proper_nouns.items()
+                }
+            if self._token_count_cache:
+                with self.instrumentation.stage("cache"):
+                    self._token_count_cache.set_many([(url, digests[url], counts) for url, counts in counted.items()])
+            counted_vacancies += len(counted)
+
+            for url, _ in vacancies_batch:
+                yield url, counted[url] if url in counted else cached[url][1]
+        self.logger.debug("Counted %s vacancies, the rest were taken from the cache", counted_vacancies)
+
+    def _count_vacancies_with_cache(
+        self,
+        vacancies: Iterable[tuple[str, str]],
+        proper_nouns: Counter[str],
+        lower_to_upper: dict[str, str],
+        *,
+        batch_size: int,
+        n_process: int,
+    ) -> None:
+        """Count technologies of new or changed vacancies only and merge them with the cached counts."""
+        if not self._token_count_cache:
+            raise ValueError(f"{self._token_count_cache=}")
+
+        self.logger.debug("Calculating frequency distribution with the token count cache ...")
+        for _, counts in self._iter_vacancy_counts(vacancies, batch_size=batch_size, n_process=n_process):
+            for noun, (count, surface) in counts.items():
+                proper_nouns[noun] += count
+                lower_to_upper[noun] = surface
+
+    def calculate_frequency_distribution(
+        self,
+        limit_results: int = 50,
+        *,
+        descriptions: Iterable[str] | None = None,
+        vacancies: Iterable[tuple[str, str]] | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        n_process: int = 1,
+    ) -> Statistics:
+        """Count technologies in the extracted text.
+
+        If `descriptions` are passed, each of them is cleaned and streamed through `nlp.pipe`
+        in batches of `batch_size` (using `n_process` workers) and counted incrementally,
+        so memory usage doesn't grow with the number of vacancies.
+        `vacancies` are pairs of URL and description processed the same way,
+        but looked up in the token count cache first if the wrangler has one.
+        """
+        proper_nouns: Counter[str] = Counter()
+        lower_to_upper: dict[str, str] = {}
+
+        if vacancies is not None and self._token_count_cache:
+            self._count_vacancies_with_cache(
+                vacancies, proper_nouns, lower_to_upper, batch_size=batch_size, n_process=n_process
+            )
+        elif vacancies is not None:
+            self._count_descriptions(
+                (description for _, description in vacancies),
+                proper_nouns,
+                lower_to_upper,
+                batch_size=batch_size,
+                n_process=n_process,
+            )
+        elif descriptions is not None:
+            self._count_descriptions(
+                descriptions, proper_nouns, lower_to_upper, batch_size=batch_size, n_process=n_process
+            )
+        else:
+            self._clean_text()
+            self.logger.debug("Calculating frequency distribution ...")
+            nlp = self._load_nlp()
+            with self.instrumentation.stage("nlp") as metrics:
+                doc = nlp(self._text)
+                metrics.counts["docs"] += 1
+            self._count([doc], proper_nouns, lower_to_upper)
 
-        proper_nouns_count = Counter(proper_nouns)
         self.logger.debug("Calculation complete")
+        return self._create_statistics(proper_nouns, lower_to_upper, limit_results)
+
+    def _create_statistics(
+        self, proper_nouns: Counter[str], lower_to_upper: dict[str, str], limit_results: int
+    ) -> Statistics:
         return Statistics(
             category=self._category,
             from_datetime=self.start_from_publication_date,
             to_datetime=self.end_date_of_publication,
             technology_frequency={
                 lower_to_upper[noun_frequency[0]]: noun_frequency[1]
-                for noun_frequency in proper_nouns_count.most_common(limit_results)
+                for noun_frequency in proper_nouns.most_common(limit_results)
             },
             upsert_datetime=datetime.now(ZoneInfo("Europe/Kyiv")),
         )
 
-    def save_statistics(self, statistics: Statistics, *, to_mongodb_collection: bool = True) -> BulkWriteResult | Any:
+    def calculate_daily_counts(
+        self,
+        vacancies: Iterable[tuple[str, datetime, str]],
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        n_process: int = 1,
+    ) -> list[DailyTechnologyCounts]:
+        """Count technologies of the vacancies yielded by `iter_dated_vacancies` per publication day.
+        Pass whole days only (`whole_days=True`), as the counts of a day replace the stored ones.
+        """
+        _, daily_counts = self.calculate_statistics_and_daily_counts(
+            vacancies, batch_size=batch_size, n_process=n_process
+        )
+        return daily_counts
+
+    def calculate_statistics_and_daily_counts(
+        self,
+        vacancies: Iterable[tuple[str, datetime, str]],
+        limit_results: int = 50,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        n_process: int = 1,
+    ) -> tuple[Statistics, list[DailyTechnologyCounts]]:
+        """Count technologies of the vacancies yielded by `iter_dated_vacancies(whole_days=True)` in a single pass,
+        both per publication day and in total for the vacancies within the publication date range.
+        """
+        publication_dates: dict[str, datetime] = {}
+
+        def iter_vacancies() -> Iterator[tuple[str, str]]:
+            for url, publication_date, description in vacancies:
+                # MongoDB returns naive UTC datetimes.
+                publication_dates[url] = (
+                    publication_date if publication_date.tzinfo else publication_date.replace(tzinfo=UTC)
+                )
+                yield url, description
+
+        self.logger.debug("Calculating frequency distribution and daily counts ...")
+        proper_nouns: Counter[str] = Counter()
+        lower_to_upper: dict[str, str] = {}
+        daily_proper_nouns: defaultdict[datetime, Counter[str]] = defaultdict(Counter)
+        daily_lower_to_upper: defaultdict[datetime, dict[str, str]] = defaultdict(dict)
+        vacancies_count: Counter[datetime] = Counter()
+        for url, counts in self._iter_vacancy_counts(iter_vacancies(), batch_size=batch_size, n_process=n_process):
+            publication_date = publication_dates.pop(url)
+            within_range = self.start_from_publication_date <= publication_date <= self.end_date_of_publication
+            day = to_day(publication_date)
+            vacancies_count[day] += 1
+            for noun, (count, surface) in counts.items():
+                daily_proper_nouns[day][noun] += count
+                daily_lower_to_upper[day][noun] = surface
+                if within_range:
+                    proper_nouns[noun] += count
+                    lower_to_upper[noun] = surface
+        self.logger.debug("Calculation complete")
+        daily_counts = [
+            DailyTechnologyCounts(
+                category=self._category,
+                day=day,
+                vacancies=vacancies_count[day],
+                counts=[
+                    (noun, count, daily_lower_to_upper[day][noun])
+                    for noun, count in daily_proper_nouns[day].most_common()
+                ],
+            )
+            for day in sorted(vacancies_count)
+        ]
+        return self._create_statistics(proper_nouns, lower_to_upper, limit_results), daily_counts
+
+    def save_statistics(self, statistics: Statistics, *, to_mongodb_collection: bool = True) -> "BulkWriteResult | Any":
         """Save statistics to the MongoDB collection file.
         If `to_mongodb_collection` is False, then the statistics will be saved to a CSV file.
         """
         log_message = f"Saving statistics {to_mongodb_collection=}: {statistics=}"
         self.logger.debug(log_message)
-        if to_mongodb_collection:
-            with CollectionStatistics() as collection_statistics:
-                return collection_statistics.bulk_upsert(("from_datetime", "to_datetime"), items=[statistics])
+        from database import CollectionStatistics  # noqa: PLC0415
 
-        file = Path(f"{CollectionStatistics.collection_name}.csv")
-        with file.open("a") as fp:
-            fieldnames = Statistics.model_fields.keys()
-            writer = csv.DictWriter(fp, fieldnames=fieldnames)
-            writer.writeheader()
-            return writer.writerow(statistics.model_dump())
+        with self.instrumentation.stage("save") as metrics:
+            metrics.counts["statistics"] += 1
+            if to_mongodb_collection:
+                with CollectionStatistics() as collection_statistics:
+                    return collection_statistics.bulk_upsert(STATISTICS_FILTER_FIELDS, items=[statistics])
 
+            file = Path(f"{CollectionStatistics.collection_name}.csv")
+            with file.open("a") as fp:
+                fieldnames = Statistics.model_fields.keys()
+                writer = csv.DictWriter(fp, fieldnames=fieldnames)
+                writer.writeheader()
+                return writer.writerow(statistics.model_dump())
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Wrangle tech trend statistics.")
-    parser.add_argument(
-        "--category",
-        type=str,
-        required=True,
-        help="Vacancy category to analyze (e.g., Python, JavaScript, etc.)",
+
+def _calculate_category_statistics(
+    wrangler: Wrangler,
+    vacancies: list[tuple[str, datetime, str]],
+    *,
+    limit_results: int,
+    batch_size: int,
+    daily_counts: bool,
+) -> tuple[Statistics, list[DailyTechnologyCounts], Instrumentation]:
+    if daily_counts:
+        statistics, category_daily_counts = wrangler.calculate_statistics_and_daily_counts(
+            vacancies, limit_results, batch_size=batch_size
+        )
+    else:
+        statistics = wrangler.calculate_frequency_distribution(
+            limit_results,
+            vacancies=((url, description) for url, _, description in vacancies),
+            batch_size=batch_size,
+        )
+        category_daily_counts = []
+    # Stages run in a worker process, so they are sent back along with the statistics.
+    return statistics, category_daily_counts, wrangler.instrumentation
+
+
+def calculate_statistics_by_category(
+    categories: Sequence[str] | None = None,
+    start_from_publication_date: datetime | None = None,
+    end_date_of_publication: datetime | None = None,
+    extra_text_filters: set[str] | None = None,
+    *,
+    tokenizer_only: bool = False,
+    token_count_cache: TokenCountCache | None = None,
+    technology_dictionary: Path | None = None,
+    parquet_dataset: Path | None = None,
+    limit_results: int = 50,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int | None = None,
+    instrumentation: Instrumentation | None = None,
+) -> list[Statistics]:
+    """Fetch the vacancies of all `categories` (all the stored ones if None) within a single query,
+    from the `parquet_dataset` directory if provided, and calculate the statistics of each category
+    in a pool of `max_workers` processes. Stages of the workers are added to the `instrumentation`.
+    """
+    statistics, _ = _calculate_by_category(
+        categories,
+        start_from_publication_date,
+        end_date_of_publication,
+        extra_text_filters,
+        tokenizer_only=tokenizer_only,
+        token_count_cache=token_count_cache,
+        technology_dictionary=technology_dictionary,
+        parquet_dataset=parquet_dataset,
+        limit_results=limit_results,
+        batch_size=batch_size,
+        max_workers=max_workers,
+        instrumentation=instrumentation,
+        daily_counts=False,
+    )
+    return statistics
+
+
+def calculate_statistics_and_daily_counts_by_category(
+    categories: Sequence[str] | None = None,
+    start_from_publication_date: datetime | None = None,
+    end_date_of_publication: datetime | None = None,
+    extra_text_filters: set[str] | None = None,
+    *,
+    tokenizer_only: bool = False,
+    token_count_cache: TokenCountCache | None = None,
+    technology_dictionary: Path | None = None,
+    parquet_dataset: Path | None = None,
+    limit_results: int = 50,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int | None = None,
+    instrumentation: Instrumentation | None = None,
+) -> tuple[list[Statistics], list[DailyTechnologyCounts]]:
+    """Calculate the statistics of each category the way `calculate_statistics_by_category` does,
+    along with the technology counts per publication day within the whole days of the publication date range.
+    Each vacancy is analyzed once for both.
+    """
+    return _calculate_by_category(
+        categories,
+        start_from_publication_date,
+        end_date_of_publication,
+        extra_text_filters,
+        tokenizer_only=tokenizer_only,
+        token_count_cache=token_count_cache,
+        technology_dictionary=technology_dictionary,
+        parquet_dataset=parquet_dataset,
+        limit_results=limit_results,
+        batch_size=batch_size,
+        max_workers=max_workers,
+        instrumentation=instrumentation,
+        daily_counts=True,
+    )
+
+
+def _calculate_by_category(
+    categories: Sequence[str] | None,
+    start_from_publication_date: datetime | None,
+    end_date_of_publication: datetime | None,
+    extra_text_filters: set[str] | None,
+    *,
+    tokenizer_only: bool,
+    token_count_cache: TokenCountCache | None,
+    technology_dictionary: Path | None,
+    parquet_dataset: Path | None,
+    limit_results: int,
+    batch_size: int,
+    max_workers: int | None,
+    instrumentation: Instrumentation | None,
+    daily_counts: bool,
+) -> tuple[list[Statistics], list[DailyTechnologyCounts]]:
+    now = datetime.now(ZoneInfo("Europe/Kyiv"))
+    start_from_publication_date = start_from_publication_date or now - timedelta(days=30)
+    end_date_of_publication = end_date_of_publication or now
+    instrumentation = instrumentation or Instrumentation()
+    # Daily counts replace the stored ones, so they are counted for whole days only.
+    from_datetime, to_datetime = (
+        to_whole_days(start_from_publication_date, end_date_of_publication)
+        if daily_counts
+        else (start_from_publication_date, end_date_of_publication)
+    )
+
+    vacancies_by_category: defaultdict[str, list[tuple[str, datetime, str]]] = defaultdict(list)
+    if parquet_dataset:
+        from database import ParquetVacancies  # noqa: PLC0415
+
+        vacancies = ParquetVacancies(parquet_dataset).iter_vacancies(
+            categories,
+            from_datetime,
+            to_datetime,
+            columns=("category", "url", "publication_date", "description"),
+        )
+        for vacancy in instrumentation.iter_stage("extract", vacancies, unit="vacancies"):
+            vacancies_by_category[vacancy["category"]].append(
+                (vacancy["url"], vacancy["publication_date"], vacancy["description"])
+            )
+    else:
+        from database import CollectionVacancies  # noqa: PLC0415
+
+        with CollectionVacancies() as collection_vacancies:
+            vacancies = collection_vacancies.iter_vacancies(
+                categories if categories is not None else collection_vacancies.fetch_categories(),
+                from_datetime,
+                to_datetime,
+                projection={"_id": 0, "category": 1, "url": 1, "publication_date": 1, "description": 1},
+            )
+            for vacancy in instrumentation.iter_stage("extract", vacancies, unit="vacancies"):
+                vacancies_by_category[vacancy["category"]].append(
+                    (vacancy["url"], vacancy["publication_date"], vacancy["description"])
+                )
+
+    wranglers = [
+        Wrangler(
+            category,
+            start_from_publication_date,
+            end_date_of_publication,
+            extra_text_filters,
+            tokenizer_only=tokenizer_only,
+            token_count_cache=token_count_cache,
+            technology_dictionary=technology_dictionary,
+        )
+        for category in vacancies_by_category
+    ]
+    if technology_dictionary:
+        # Built and cached on the disk once, before the workers load it.
+        get_technology_matcher(technology_dictionary)
+    # Each worker loads the model once on start-up and reuses it for all the categories it handles.
+    statistics, all_daily_counts = [], []
+    with ProcessPoolExecutor(max_workers, initializer=partial(load_nlp, tokenizer_only=tokenizer_only)) as executor:
+        for category_statistics, category_daily_counts, worker_instrumentation in executor.map(
+            partial(
+                _calculate_category_statistics,
+                limit_results=limit_results,
+                batch_size=batch_size,
+                daily_counts=daily_counts,
+            ),
+            wranglers,
+            vacancies_by_category.values(),
+        ):
+            statistics.append(category_statistics)
+            all_daily_counts += category_daily_counts
+            instrumentation.merge(worker_instrumentation)
+    return statistics, all_daily_counts
+
+
+def save_statistics(
+    statistics: Sequence[Statistics], *, instrumentation: Instrumentation | None = None
+) -> "BulkWriteResult":
+    """Save the statistics of several categories to the MongoDB collection within a single bulk upsert."""
+    from database import CollectionStatistics  # noqa: PLC0415
+
+    with (
+        (instrumentation or Instrumentation()).stage("save") as metrics,
+        CollectionStatistics() as collection_statistics,
+    ):
+        metrics.counts["statistics"] += len(statistics)
+        return collection_statistics.bulk_upsert(STATISTICS_FILTER_FIELDS, items=statistics)
+
+
+def save_daily_counts(
+    daily_counts: Sequence[DailyTechnologyCounts], *, instrumentation: Instrumentation | None = None
+) -> None:
+    """Upsert the changed daily technology counts."""
+    from database import CollectionDailyTechnologyCounts  # noqa: PLC0415
+
+    with (
+        (instrumentation or Instrumentation()).stage("save") as metrics,
+        CollectionDailyTechnologyCounts() as collection_daily_counts,
+    ):
+        metrics.counts["daily_counts"] += len(daily_counts)
+        collection_daily_counts.bulk_upsert_changes(DAILY_COUNTS_FILTER_FIELDS, items=daily_counts)
+
+
+def fetch_statistics_from_daily_counts(
+    categories: Sequence[str] | None = None,
+    start_from_publication_date: datetime | None = None,
+    end_date_of_publication: datetime | None = None,
+    *,
+    limit_results: int = 50,
+    instrumentation: Instrumentation | None = None,
+) -> list[Statistics]:
+    """Sum up the stored daily counts of the days within the range instead of analyzing the vacancies.
+    Statistics of all the categories having daily counts are returned if `categories` is None.
+    """
+    from database import CollectionDailyTechnologyCounts  # noqa: PLC0415
+
+    now = datetime.now(ZoneInfo("Europe/Kyiv"))
+    # Only whole days are summed up, so the statistics are stored with the bounds of these days.
+    from_datetime, to_datetime = to_whole_days(
+        start_from_publication_date or now - timedelta(days=30), end_date_of_publication or now
     )
+
+    statistics = []
+    with (
+        (instrumentation or Instrumentation()).stage("extract") as metrics,
+        CollectionDailyTechnologyCounts() as collection_daily_counts,
+    ):
+        for category in categories if categories is not None else collection_daily_counts.fetch_categories():
+            technology_frequency = collection_daily_counts.fetch_technology_frequency(
+                category, to_day(from_datetime), to_day(to_datetime), limit=limit_results
+            )
+            if not technology_frequency:
+                continue
+            statistics.append(
+                Statistics(
+                    category=category,
+                    from_datetime=from_datetime,
+                    to_datetime=to_datetime,
+                    technology_frequency=technology_frequency,
+                    upsert_datetime=datetime.now(ZoneInfo("Europe/Kyiv")),
+                )
+            )
+        metrics.counts["statistics"] += len(statistics)
+    return statistics
+
+
+def add_wrangling_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments telling how vacancies are analyzed, shared by the wrangler and the daemon."""
     parser.add_argument(
         "--extra-text-filters",
         type=str,
@@ -164,15 +768,196 @@ def main() -> None:
         default=None,
         help="Extra text filters to remove from vacancy descriptions (space-separated list).",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Number of vacancy descriptions processed by spaCy at once.",
+    )
+    parser.add_argument(
+        "--tokenizer-only",
+        action="store_true",
+        help="Use a blank English tokenizer instead of the trained spaCy model (faster, same counts).",
+    )
+    parser.add_argument(
+        "--token-count-cache",
+        type=str,
+        choices=("sqlite", "mongodb"),
+        default=None,
+        help="Cache technology counts of each vacancy, so that only new or changed vacancies are analyzed.",
+    )
+    parser.add_argument(
+        "--token-count-cache-path",
+        type=Path,
+        default=Path("token_counts.sqlite3"),
+        help="Path to the SQLite file used with `--token-count-cache sqlite`.",
+    )
+    parser.add_argument(
+        "--token-count-cache-max-age",
+        type=int,
+        default=90,
+        help="Days after which vacancies no longer analyzed are pruned from the SQLite token count cache.",
+    )
+    parser.add_argument(
+        "--technology-dictionary",
+        type=Path,
+        nargs="?",
+        const=TECHNOLOGIES_PATH,
+        default=None,
+        help="Count only the technologies listed in a JSON file of names mapped to their aliases "
+        "(the bundled list if no path is given), instead of every capitalized word.",
+    )
+    parser.add_argument(
+        "--parquet-dataset",
+        type=Path,
+        default=None,
+        help="Read vacancies from a Parquet dataset directory written by `ParquetPipeline` instead of MongoDB.",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="Number of days before now the vacancies were published within.",
+    )
+
+
+def create_token_count_cache(args: argparse.Namespace) -> TokenCountCache | None:
+    if args.token_count_cache == "sqlite":
+        token_count_cache = SQLiteTokenCountCache(args.token_count_cache_path)
+        token_count_cache.prune(timedelta(days=args.token_count_cache_max_age))
+        return token_count_cache
+    if args.token_count_cache == "mongodb":
+        return MongoTokenCountCache()
+    return None
+
+
+def _wrangle(args: argparse.Namespace, instrumentation: Instrumentation) -> None:
+    end_date_of_publication = datetime.now(ZoneInfo("Europe/Kyiv"))
+    start_from_publication_date = end_date_of_publication - timedelta(days=args.days)
+    categories = [args.category] if args.category else args.categories
+    if args.from_daily_counts:
+        statistics = fetch_statistics_from_daily_counts(
+            categories, start_from_publication_date, end_date_of_publication, instrumentation=instrumentation
+        )
+        if statistics:
+            save_statistics(statistics, instrumentation=instrumentation)
+        return
 
-    wrangler = Wrangler(
-        args.category,
-        extra_text_filters=set(args.extra_text_filters) if args.extra_text_filters else None,
+    extra_text_filters = set(args.extra_text_filters) if args.extra_text_filters else None
+    token_count_cache = create_token_count_cache(args)
+
+    daily_counts: list[DailyTechnologyCounts] = []
+    if not args.category:
+        by_category_kwargs = {
+            "extra_text_filters": extra_text_filters,
+            "tokenizer_only": args.tokenizer_only,
+            "token_count_cache": token_count_cache,
+            "technology_dictionary": args.technology_dictionary,
+            "parquet_dataset": args.parquet_dataset,
+            "batch_size": args.batch_size,
+            "max_workers": args.max_workers,
+            "instrumentation": instrumentation,
+        }
+        if args.daily_counts:
+            statistics, daily_counts = calculate_statistics_and_daily_counts_by_category(
+                args.categories, start_from_publication_date, end_date_of_publication, **by_category_kwargs
+            )
+        else:
+            statistics = calculate_statistics_by_category(
+                args.categories, start_from_publication_date, end_date_of_publication, **by_category_kwargs
+            )
+        if statistics:
+            save_statistics(statistics, instrumentation=instrumentation)
+    else:
+        wrangler = Wrangler(
+            args.category,
+            start_from_publication_date,
+            end_date_of_publication,
+            extra_text_filters=extra_text_filters,
+            tokenizer_only=args.tokenizer_only,
+            token_count_cache=token_count_cache,
+            technology_dictionary=args.technology_dictionary,
+            instrumentation=instrumentation,
+        )
+        if args.daily_counts:
+            statistics, daily_counts = wrangler.calculate_statistics_and_daily_counts(
+                wrangler.iter_dated_vacancies(args.parquet_dataset, whole_days=True),
+                batch_size=args.batch_size,
+                n_process=args.n_process,
+            )
+        else:
+            statistics = wrangler.calculate_frequency_distribution(
+                vacancies=wrangler.iter_vacancies(args.parquet_dataset),
+                batch_size=args.batch_size,
+                n_process=args.n_process,
+            )
+        wrangler.save_statistics(statistics)
+
+    if args.daily_counts:
+        save_daily_counts(daily_counts, instrumentation=instrumentation)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Wrangle tech trend statistics.")
+    categories_group = parser.add_mutually_exclusive_group(required=True)
+    categories_group.add_argument(
+        "--category",
+        type=str,
+        help="Vacancy category to analyze (e.g., Python, JavaScript, etc.)",
+    )
+    categories_group.add_argument(
+        "--categories",
+        type=str,
+        nargs="+",
+        help="Vacancy categories to analyze within a single run (space-separated list).",
+    )
+    categories_group.add_argument(
+        "--all-categories",
+        action="store_true",
+        help="Analyze all the categories stored in the vacancies collection.",
+    )
+    add_wrangling_arguments(parser)
+    parser.add_argument(
+        "--n-process",
+        type=int,
+        default=1,
+        help="Number of processes used by spaCy (-1 to use all CPU cores).",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Number of processes analyzing categories in parallel (defaults to the number of CPU cores).",
     )
-    wrangler.extract_text_from_vacancies()
-    statistics = wrangler.calculate_frequency_distribution()
-    wrangler.save_statistics(statistics)
+    daily_counts_group = parser.add_mutually_exclusive_group()
+    daily_counts_group.add_argument(
+        "--daily-counts",
+        action="store_true",
+        help="Also store the technology counts of each publication day, to be summed up with `--from-daily-counts`.",
+    )
+    daily_counts_group.add_argument(
+        "--from-daily-counts",
+        action="store_true",
+        help="Sum up the stored daily technology counts instead of analyzing the vacancies.",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        help="Write the wall time, CPU time, counts and peak RSS of each stage to a JSON file after the run.",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        default=None,
+        help="Write the same metrics in the Prometheus text format, e.g. for the node exporter textfile collector.",
+    )
+    args = parser.parse_args()
+    instrumentation = Instrumentation()
+    try:
+        _wrangle(args, instrumentation)
+    finally:
+        instrumentation.write_reports(args.metrics_json, args.metrics_textfile, prefix="techtrend_wrangler")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,290 @@
+"""Long-running crawler and wrangler, started with `python -m techtrendscrape.daemon`.
+
+The reactor, the spaCy model, the technology matcher and the pooled MongoDB clients are set up once and kept
+alive between runs, instead of being paid for by every `scrapy crawl` and wrangler process. Each category is crawled
+on its own interval, and categories whose vacancies changed are wrangled right after their crawl.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+from zoneinfo import ZoneInfo
+
+from scrapy import Spider
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.defer import deferred_from_coro, maybe_deferred_to_future
+from scrapy.utils.log import configure_logging
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor
+from twisted.internet.defer import CancelledError
+
+from techtrendanalysis.cache import SQLiteTokenCountCache
+from techtrendanalysis.matcher import get_technology_matcher
+from techtrendanalysis.nlp import load_nlp
+from techtrendanalysis.wrangler import Wrangler, add_wrangling_arguments, create_token_count_cache, save_daily_counts
+from techtrendscrape.extensions import PIPELINE_STATS_PREFIX
+from techtrendscrape.spiders.djinni import DjinniSpider
+
+if TYPE_CHECKING:
+    from twisted.internet.defer import Deferred
+    from twisted.python.failure import Failure
+
+    from techtrendanalysis.cache import TokenCountCache
+
+logger = logging.getLogger(__name__)
+
+
+def count_changed_items(stats: Mapping[str, Any]) -> int:
+    """The number of items a crawl inserted or updated. Pipelines which don't tell changed items from unchanged
+    ones count all the items they have written.
+    """
+    changed_items = 0
+    for key, value in stats.items():
+        if not key.startswith(PIPELINE_STATS_PREFIX):
+            continue
+        pipeline, _, name = key.removeprefix(PIPELINE_STATS_PREFIX).partition("/")
+        tracks_changes = f"{PIPELINE_STATS_PREFIX}{pipeline}/items_skipped" in stats or any(
+            f"{PIPELINE_STATS_PREFIX}{pipeline}/items_{change}" in stats for change in ("inserted", "updated")
+        )
+        if name in {"items_inserted", "items_updated"} or (name == "items_written" and not tracks_changes):
+            changed_items += value
+    return changed_items
+
+
+class CategoryWrangler:
+    """Wrangle a category with the options added by `add_wrangling_arguments`, within the publication date range
+    of the last `days` days. It's always called from the same thread, which owns the token count cache.
+    """
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.extra_text_filters = set(args.extra_text_filters) if args.extra_text_filters else None
+        self.token_count_cache: "TokenCountCache | None" = None
+
+    def warm_up(self) -> None:
+        """Load the spaCy pipeline and the technology matcher, and open the token count cache."""
+        load_nlp(tokenizer_only=self.args.tokenizer_only)
+        if self.args.technology_dictionary:
+            get_technology_matcher(self.args.technology_dictionary)
+        self.token_count_cache = create_token_count_cache(self.args)
+
+    def __call__(self, category: str) -> None:
+        end_date_of_publication = datetime.now(ZoneInfo("Europe/Kyiv"))
+        wrangler = Wrangler(
+            category,
+            end_date_of_publication - timedelta(days=self.args.days),
+            end_date_of_publication,
+            self.extra_text_filters,
+            tokenizer_only=self.args.tokenizer_only,
+            token_count_cache=self.token_count_cache,
+            technology_dictionary=self.args.technology_dictionary,
+        )
+        if self.args.daily_counts:
+            statistics, daily_counts = wrangler.calculate_statistics_and_daily_counts(
+                wrangler.iter_dated_vacancies(self.args.parquet_dataset, whole_days=True),
+                batch_size=self.args.batch_size,
+            )
+            wrangler.save_statistics(statistics)
+            save_daily_counts(daily_counts, instrumentation=wrangler.instrumentation)
+        else:
+            statistics = wrangler.calculate_frequency_distribution(
+                vacancies=wrangler.iter_vacancies(self.args.parquet_dataset), batch_size=self.args.batch_size
+            )
+            wrangler.save_statistics(statistics)
+        if isinstance(self.token_count_cache, SQLiteTokenCountCache):
+            self.token_count_cache.prune(timedelta(days=self.args.token_count_cache_max_age))
+
+
+class Daemon:
+    """Crawl each of the `categories` every `interval` seconds (or as set in `intervals` by category),
+    and wrangle the categories whose crawl inserted or updated vacancies.
+
+    Intervals are randomized by up to `jitter` of their length, and so is the first crawl of each category,
+    so that the crawls neither start at once nor keep to a fixed schedule. At most `max_parallel_crawls` crawls
+    run at a time. Categories are wrangled one at a time in a single thread, so the reactor isn't blocked
+    and a category which changes again while it's queued is wrangled once.
+    """
+
+    def __init__(
+        self,
+        runner: CrawlerRunner,
+        categories: Sequence[str],
+        wrangle: Callable[[str], None],
+        *,
+        spidercls: type[Spider] = DjinniSpider,
+        interval: float,
+        intervals: Mapping[str, float] | None = None,
+        jitter: float = 0.0,
+        max_parallel_crawls: int = 1,
+        warm_up: Callable[[], None] | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError(f"{jitter=}")
+        if max_parallel_crawls < 1:
+            raise ValueError(f"{max_parallel_crawls=}")
+        self.runner = runner
+        self.categories = list(categories)
+        self.wrangle = wrangle
+        self.spidercls = spidercls
+        self.interval = interval
+        self.intervals = dict(intervals or {})
+        self.jitter = jitter
+        self.warm_up = warm_up
+        self.rng = rng or random.Random()  # noqa: S311
+        self._crawl_slots = asyncio.Semaphore(max_parallel_crawls)
+        self._wrangle_queue: asyncio.Queue[str] = asyncio.Queue()
+        # Queued categories, which aren't queued again until their wrangling starts.
+        self._pending_wrangles: set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wrangler")
+        self._tasks: list[asyncio.Task[None]] = []
+        self._stopping = False
+
+    def next_delay(self, category: str, *, first: bool = False) -> float:
+        """Seconds to wait before crawling the `category` again, or for the first time."""
+        interval = self.intervals.get(category, self.interval)
+        if first:
+            return self.rng.uniform(0, self.jitter * interval)
+        return interval * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def crawl(self, category: str) -> int:
+        """Crawl the `category` once a crawl slot is free, and return the number of changed items."""
+        async with self._crawl_slots:
+            crawler = self.runner.create_crawler(self.spidercls)
+            logger.info("Crawling %r", category)
+            await maybe_deferred_to_future(self.runner.crawl(crawler, categories=category))
+        return count_changed_items(crawler.stats.get_stats() if crawler.stats else {})
+
+    def request_wrangle(self, category: str) -> None:
+        if category in self._pending_wrangles:
+            return
+        self._pending_wrangles.add(category)
+        self._wrangle_queue.put_nowait(category)
+
+    async def _crawl_periodically(self, category: str) -> None:
+        await asyncio.sleep(self.next_delay(category, first=True))
+        while not self._stopping:
+            try:
+                changed_items = await self.crawl(category)
+            except Exception:
+                logger.exception("Failed to crawl %r", category)
+            else:
+                logger.info("Crawled %r, %d items changed", category, changed_items)
+                if changed_items:
+                    self.request_wrangle(category)
+            await asyncio.sleep(self.next_delay(category))
+
+    async def _wrangle_changed_categories(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            category = await self._wrangle_queue.get()
+            # Changes crawled from now on require wrangling the category again.
+            self._pending_wrangles.discard(category)
+            try:
+                await loop.run_in_executor(self._executor, self.wrangle, category)
+            except Exception:
+                logger.exception("Failed to wrangle %r", category)
+            else:
+                logger.info("Wrangled %r", category)
+            finally:
+                self._wrangle_queue.task_done()
+
+    async def run(self) -> None:
+        """Warm up the wrangler thread, then crawl and wrangle until stopped."""
+        if self.warm_up:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.warm_up)
+        self._tasks = [asyncio.create_task(self._crawl_periodically(category)) for category in self.categories]
+        self._tasks.append(asyncio.create_task(self._wrangle_changed_categories()))
+        await asyncio.gather(*self._tasks)
+
+    async def stop(self) -> None:
+        """Let the running crawls close gracefully, then cancel the schedule. A running wrangling is finished
+        before the process exits, queued ones are dropped.
+        """
+        self._stopping = True
+        await maybe_deferred_to_future(self.runner.stop())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Crawl categories periodically and wrangle the changed ones.")
+    parser.add_argument(
+        "--categories",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Vacancy categories to crawl and analyze (space-separated list).",
+    )
+    parser.add_argument(
+        "--crawl-interval",
+        type=float,
+        default=None,
+        help="Seconds between crawls of a category (DAEMON_CRAWL_INTERVAL by default).",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=None,
+        help="Share of the interval the crawls are randomly shifted by (DAEMON_JITTER by default).",
+    )
+    parser.add_argument(
+        "--max-parallel-crawls",
+        type=int,
+        default=None,
+        help="Number of categories crawled at once (DAEMON_MAX_PARALLEL_CRAWLS by default).",
+    )
+    add_wrangling_arguments(parser)
+    parser.add_argument(
+        "--daily-counts",
+        action="store_true",
+        help="Also store the technology counts of each publication day of the wrangled categories.",
+    )
+    args = parser.parse_args()
+
+    settings = get_project_settings()
+    configure_logging(settings)
+    install_reactor(settings["TWISTED_REACTOR"])
+    from twisted.internet import reactor  # noqa: PLC0415
+
+    intervals = settings.getdict("DAEMON_CRAWL_INTERVALS")
+    category_wrangler = CategoryWrangler(args)
+    daemon = Daemon(
+        CrawlerRunner(settings),
+        args.categories,
+        category_wrangler,
+        interval=args.crawl_interval or settings.getfloat("DAEMON_CRAWL_INTERVAL"),
+        intervals={category: float(interval) for category, interval in intervals.items()},
+        jitter=settings.getfloat("DAEMON_JITTER") if args.jitter is None else args.jitter,
+        max_parallel_crawls=args.max_parallel_crawls or settings.getint("DAEMON_MAX_PARALLEL_CRAWLS"),
+        warm_up=category_wrangler.warm_up,
+    )
+
+    def on_failure(failure: "Failure") -> None:
+        # The daemon is cancelled on shutdown, any other failure shuts it down.
+        if failure.check(asyncio.CancelledError, CancelledError):
+            return
+        logger.error("The daemon failed", exc_info=(failure.type, failure.value, failure.getTracebackObject()))
+        reactor.stop()  # type: ignore[reportAttributeAccessIssue]
+
+    def start() -> None:
+        deferred_from_coro(daemon.run()).addErrback(on_failure)
+
+    def stop() -> "Deferred[None]":
+        # The reactor waits for the Deferred, so that the crawls are closed before it stops.
+        return deferred_from_coro(daemon.stop())
+
+    reactor.callWhenRunning(start)  # type: ignore[reportAttributeAccessIssue]
+    reactor.addSystemEventTrigger("before", "shutdown", stop)  # type: ignore[reportAttributeAccessIssue]
+    reactor.run()  # type: ignore[reportAttributeAccessIssue]
+
+
+if __name__ == "__main__":
+    main()
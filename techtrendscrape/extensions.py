@@ -0,0 +1,128 @@
+"""Crawl metrics reported once the spider closes, for monitoring crawls in production."""
+
+from datetime import UTC, datetime
+from json import dumps
+from pathlib import Path
+from time import monotonic, process_time
+from typing import Any, Self
+
+from scrapy import Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+
+from techtrendanalysis.instrumentation import Metric, format_prometheus_metrics, peak_rss, write_atomically
+
+PIPELINE_STATS_PREFIX = "pipelines/"
+PIPELINE_REPORT_KEYS = ("items_invalid", "batches_written", "batches_failed", "flush_seconds", "flush_max_seconds")
+
+
+class CrawlMetrics:
+    """Write the throughput and latencies of a crawl as a JSON report to `METRICS_JSON_PATH`
+    and as a Prometheus textfile to `METRICS_TEXTFILE_PATH` once the spider closes.
+
+    Reported are the items scraped per second, responses and bytes downloaded, the page parse latency
+    recorded by `ParseLatencyMiddleware`, the invalid items and the flush latency of each pipeline,
+    along with all the crawl stats.
+    """
+
+    def __init__(self, crawler: Crawler, json_path: Path | None, textfile_path: Path | None) -> None:
+        self.crawler = crawler
+        self.json_path = json_path
+        self.textfile_path = textfile_path
+        self._started = (monotonic(), process_time())
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        json_path = crawler.settings.get("METRICS_JSON_PATH")
+        textfile_path = crawler.settings.get("METRICS_TEXTFILE_PATH")
+        if not json_path and not textfile_path:
+            raise NotConfigured("Neither METRICS_JSON_PATH nor METRICS_TEXTFILE_PATH is set")
+        extension = cls(crawler, Path(json_path) if json_path else None, Path(textfile_path) if textfile_path else None)
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    # Signal handlers receive their arguments by name, so the unused `spider` keeps its name.
+    def spider_opened(self, spider: Spider) -> None:  # noqa: ARG002
+        self._started = (monotonic(), process_time())
+
+    def report(self, spider: Spider, reason: str) -> dict[str, Any]:
+        stats = self.crawler.stats.get_stats() if self.crawler.stats else {}
+        wall_time = monotonic() - self._started[0]
+        pipelines = sorted(
+            {
+                key.removeprefix(PIPELINE_STATS_PREFIX).split("/")[0]
+                for key in stats
+                if key.startswith(PIPELINE_STATS_PREFIX)
+            }
+        )
+        return {
+            "spider": spider.name,
+            "reason": reason,
+            "finished_at": datetime.now(UTC).isoformat(),
+            "wall_time": wall_time,
+            "cpu_time": process_time() - self._started[1],
+            "peak_rss": peak_rss(),
+            "items": stats.get("item_scraped_count", 0),
+            "items_per_second": stats.get("item_scraped_count", 0) / wall_time if wall_time else 0.0,
+            "responses": stats.get("response_received_count", 0),
+            "response_bytes": stats.get("downloader/response_bytes", 0),
+            "parse": {
+                "pages": stats.get("parse/pages", 0),
+                "seconds": stats.get("parse/seconds", 0.0),
+                "max_seconds": stats.get("parse/max_seconds", 0.0),
+            },
+            "pipelines": {
+                pipeline: {
+                    key: stats.get(f"{PIPELINE_STATS_PREFIX}{pipeline}/{key}", 0) for key in PIPELINE_REPORT_KEYS
+                }
+                for pipeline in pipelines
+            },
+            "stats": stats,
+        }
+
+    @staticmethod
+    def prometheus_metrics(report: dict[str, Any]) -> list[Metric]:
+        labels = {"spider": report["spider"]}
+        pipelines = [({**labels, "pipeline": name}, values) for name, values in report["pipelines"].items()]
+        crawl_metrics = [
+            ("wall_seconds", "Wall time of the last crawl.", report["wall_time"]),
+            ("cpu_seconds", "CPU time of the last crawl.", report["cpu_time"]),
+            ("peak_rss_bytes", "Peak resident set size of the last crawl.", report["peak_rss"]),
+            (
+                "last_run_timestamp_seconds",
+                "When the last crawl finished.",
+                datetime.fromisoformat(report["finished_at"]).timestamp(),
+            ),
+            ("items", "Items scraped by the last crawl.", report["items"]),
+            ("items_per_second", "Items scraped per second by the last crawl.", report["items_per_second"]),
+            ("responses", "Responses received by the last crawl.", report["responses"]),
+            ("response_bytes", "Bytes of the responses received by the last crawl.", report["response_bytes"]),
+            ("parse_pages", "Pages parsed by the last crawl.", report["parse"]["pages"]),
+            ("parse_seconds", "Time spent parsing pages by the last crawl.", report["parse"]["seconds"]),
+            ("parse_max_seconds", "Longest time spent parsing a page.", report["parse"]["max_seconds"]),
+        ]
+        pipeline_metrics = [
+            ("pipeline_items_invalid", "Items dropped by the pipeline as invalid.", "items_invalid"),
+            ("pipeline_batches_written", "Batches written by the pipeline.", "batches_written"),
+            ("pipeline_batches_failed", "Batches the pipeline failed to write.", "batches_failed"),
+            ("pipeline_flush_seconds", "Time from the flushes until the batches were written.", "flush_seconds"),
+            ("pipeline_flush_max_seconds", "Longest time until a flushed batch was written.", "flush_max_seconds"),
+        ]
+        return [
+            (f"techtrend_crawl_{name}", help_text, [(labels, value)]) for name, help_text, value in crawl_metrics
+        ] + [
+            (
+                f"techtrend_crawl_{name}",
+                help_text,
+                [(pipeline_labels, values[key]) for pipeline_labels, values in pipelines],
+            )
+            for name, help_text, key in pipeline_metrics
+        ]
+
+    def spider_closed(self, spider: Spider, reason: str) -> None:
+        report = self.report(spider, reason)
+        if self.json_path:
+            write_atomically(self.json_path, dumps(report, indent=2, default=str))
+        if self.textfile_path:
+            write_atomically(self.textfile_path, format_prometheus_metrics(self.prometheus_metrics(report)))
@@ -0,0 +1,236 @@
+"""HTTP cache storage kept in a single SQLite file, and a cache policy and middleware revalidating expired responses."""
+
+import logging
+import sqlite3
+import zlib
+from hashlib import sha256
+from pathlib import Path
+from time import time
+from typing import TYPE_CHECKING
+
+from scrapy import Request, Spider
+from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware as BaseHttpCacheMiddleware
+from scrapy.extensions.httpcache import DummyPolicy
+from scrapy.http import Headers, Response
+from scrapy.responsetypes import responsetypes
+from scrapy.settings import BaseSettings
+from scrapy.utils.project import data_path
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+
+if TYPE_CHECKING:
+    from scrapy.statscollectors import StatsCollector
+
+logger = logging.getLogger(__name__)
+
+# Request meta key holding the UNIX time a cached response was stored at.
+STORED_AT_META_KEY = "httpcache_stored_at"
+# Once the cache outgrows its size limit, the least recently used responses are evicted down to this share of it.
+EVICTION_TARGET_RATIO = 0.9
+
+
+class RevalidationPolicy(DummyPolicy):
+    """Cached responses are fresh for `HTTPCACHE_EXPIRATION_SECS` seconds after they were stored.
+    Expired ones are revalidated with a conditional request, and reused if the server replies with 304 Not Modified.
+    Ban pages (`PROXY_BAN_HTTP_CODES`) are never cached, so that their retries are downloaded through another proxy.
+    """
+
+    def __init__(self, settings: BaseSettings) -> None:
+        super().__init__(settings)
+        self.ignore_http_codes = [
+            *self.ignore_http_codes,
+            *(int(code) for code in settings.getlist("PROXY_BAN_HTTP_CODES", [403, 429])),
+        ]
+        self.expiration_secs = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+
+    def is_cached_response_fresh(self, cachedresponse: Response, request: Request) -> bool:
+        stored_at = request.meta.get(STORED_AT_META_KEY)
+        if not self.expiration_secs or (stored_at and time() - stored_at < self.expiration_secs):
+            return True
+        if b"ETag" in cachedresponse.headers:
+            request.headers[b"If-None-Match"] = cachedresponse.headers[b"ETag"]
+        if b"Last-Modified" in cachedresponse.headers:
+            request.headers[b"If-Modified-Since"] = cachedresponse.headers[b"Last-Modified"]
+        return False
+
+    def is_cached_response_valid(self, _cachedresponse: Response, response: Response, _request: Request) -> bool:
+        return response.status == 304
+
+
+class HttpCacheMiddleware(BaseHttpCacheMiddleware):
+    """Responses revalidated with 304 Not Modified are fresh again for `HTTPCACHE_EXPIRATION_SECS` seconds,
+    instead of being revalidated on every later request.
+    """
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider | None = None
+    ) -> Request | Response:
+        cached_response = request.meta.get("cached_response")
+        # Scrapy versions requiring the spider argument pass it, later ones warn if it's passed.
+        result = super().process_response(request, response, *([spider] if spider else []))
+        if (
+            cached_response is not None
+            and result is cached_response
+            and response.status == 304
+            and isinstance(self.storage, SQLiteCacheStorage)
+        ):
+            self.storage.refresh_response(spider or self.crawler.spider, request)
+        return result
+
+
+class SQLiteCacheStorage:
+    """Responses of all spiders are stored in `<HTTPCACHE_DIR>/httpcache.sqlite3`. Bodies are zlib compressed and
+    stored once per SHA-256 of their content, however many requests they are the response to.
+
+    Expired responses are kept, the policy decides whether to revalidate them. Once compressed bodies and headers
+    take more than `HTTPCACHE_MAX_SIZE` bytes (0 means unlimited), the least recently used responses are evicted.
+    """
+
+    def __init__(self, settings: BaseSettings) -> None:
+        self.path = Path(data_path(settings["HTTPCACHE_DIR"], createdir=True)) / "httpcache.sqlite3"
+        self.max_size = settings.getint("HTTPCACHE_MAX_SIZE")
+        self.compression_level = settings.getint("HTTPCACHE_COMPRESSION_LEVEL", 6)
+        self.size = 0
+        self.stats: "StatsCollector | None" = None
+        self._connection: sqlite3.Connection | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self._connection:
+            raise RuntimeError("The cache storage isn't open")
+        return self._connection
+
+    def open_spider(self, spider: Spider) -> None:
+        self._fingerprinter = spider.crawler.request_fingerprinter
+        self.stats = spider.crawler.stats
+        self._connection = sqlite3.connect(self.path)
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS bodies (digest BLOB PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "spider TEXT NOT NULL, fingerprint BLOB NOT NULL, url TEXT NOT NULL, status INTEGER NOT NULL, "
+                "headers BLOB NOT NULL, digest BLOB NOT NULL REFERENCES bodies (digest), "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (spider, fingerprint))"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS responses_digest ON responses (digest)")
+        self.size = self._calculate_size()
+        self._set_size_stat()
+        logger.debug("Using SQLite cache storage in %s", self.path, extra={"spider": spider})
+
+    def close_spider(self, _: Spider) -> None:
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def _calculate_size(self) -> int:
+        (size,) = self.connection.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM bodies) "
+            "+ (SELECT COALESCE(SUM(LENGTH(headers)), 0) FROM responses)"
+        ).fetchone()
+        return size
+
+    def _inc_stats(self, key: str, count: int = 1) -> None:
+        if self.stats:
+            self.stats.inc_value(f"httpcache/sqlite/{key}", count)
+
+    def _set_size_stat(self) -> None:
+        if self.stats:
+            self.stats.set_value("httpcache/sqlite/size", self.size)
+
+    def retrieve_response(self, spider: Spider, request: Request) -> Response | None:
+        """Return the cached response, or None if there isn't one."""
+        fingerprint = self._fingerprinter.fingerprint(request)
+        row = self.connection.execute(
+            "SELECT responses.url, status, headers, body, stored_at FROM responses "
+            "JOIN bodies ON bodies.digest = responses.digest WHERE spider = ? AND fingerprint = ?",
+            (spider.name, fingerprint),
+        ).fetchone()
+        if not row:
+            return None
+        url, status, raw_headers, compressed_body, stored_at = row
+        with self.connection:
+            self.connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE spider = ? AND fingerprint = ?",
+                (time(), spider.name, fingerprint),
+            )
+        headers = Headers(headers_raw_to_dict(zlib.decompress(raw_headers)))
+        body = zlib.decompress(compressed_body)
+        request.meta[STORED_AT_META_KEY] = stored_at
+        response_class = responsetypes.from_args(headers=headers, url=url, body=body)
+        return response_class(url=url, headers=headers, status=status, body=body)
+
+    def refresh_response(self, spider: Spider, request: Request) -> None:
+        """Restart the freshness lifetime of the cached response, once the server confirmed it's unchanged."""
+        now = time()
+        with self.connection:
+            self.connection.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE spider = ? AND fingerprint = ?",
+                (now, now, spider.name, self._fingerprinter.fingerprint(request)),
+            )
+
+    def store_response(self, spider: Spider, request: Request, response: Response) -> None:
+        """Store the response, its body only if no identical one is stored yet."""
+        fingerprint = self._fingerprinter.fingerprint(request)
+        digest = sha256(response.body).digest()
+        raw_headers = zlib.compress(headers_dict_to_raw(response.headers) or b"", self.compression_level)
+        now = time()
+        with self.connection:
+            previous = self.connection.execute(
+                "SELECT digest, LENGTH(headers) FROM responses WHERE spider = ? AND fingerprint = ?",
+                (spider.name, fingerprint),
+            ).fetchone()
+            if self.connection.execute("SELECT 1 FROM bodies WHERE digest = ?", (digest,)).fetchone():
+                if not previous or previous[0] != digest:
+                    self._inc_stats("deduplicated")
+            else:
+                compressed_body = zlib.compress(response.body, self.compression_level)
+                self.connection.execute(
+                    "INSERT INTO bodies (digest, body, size) VALUES (?, ?, ?)",
+                    (digest, compressed_body, len(compressed_body)),
+                )
+                self.size += len(compressed_body)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(spider, fingerprint, url, status, headers, digest, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (spider.name, fingerprint, response.url, response.status, raw_headers, digest, now, now),
+            )
+            self.size += len(raw_headers)
+            if previous:
+                previous_digest, previous_headers_size = previous
+                self.size -= previous_headers_size
+                if previous_digest != digest:
+                    self.size -= self._delete_orphan_body(previous_digest)
+        if self.max_size and self.size > self.max_size:
+            self.evict()
+        self._set_size_stat()
+
+    def _delete_orphan_body(self, digest: bytes) -> int:
+        """Delete the body if no response refers to it anymore. Return the number of freed bytes."""
+        if self.connection.execute("SELECT 1 FROM responses WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+            return 0
+        row = self.connection.execute("DELETE FROM bodies WHERE digest = ? RETURNING size", (digest,)).fetchone()
+        return row[0] if row else 0
+
+    def evict(self) -> None:
+        """Delete the least recently used responses until the cache fits into `EVICTION_TARGET_RATIO` of its limit."""
+        target_size = self.max_size * EVICTION_TARGET_RATIO
+        evicted = 0
+        with self.connection:
+            rows = self.connection.execute(
+                "SELECT spider, fingerprint, digest, LENGTH(headers) FROM responses ORDER BY accessed_at"
+            ).fetchall()
+            for spider_name, fingerprint, digest, headers_size in rows:
+                if self.size <= target_size:
+                    break
+                self.connection.execute(
+                    "DELETE FROM responses WHERE spider = ? AND fingerprint = ?", (spider_name, fingerprint)
+                )
+                # The body is freed only if no other response shares it.
+                self.size -= headers_size + self._delete_orphan_body(digest)
+                evicted += 1
+        self._inc_stats("evicted", evicted)
+        logger.debug("Evicted %d responses from the HTTP cache, %d bytes left", evicted, self.size)
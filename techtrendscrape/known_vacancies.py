@@ -0,0 +1,54 @@
+"""Vacancies stored by previous crawls, used by the incremental mode of the spider."""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from hashlib import blake2b
+from typing import Self
+
+from database import CollectionVacancies
+
+
+def _hash(text: str) -> int:
+    return int.from_bytes(blake2b(text.encode(), digest_size=8).digest())
+
+
+def _contains(hashes: array, value: int) -> bool:
+    index = bisect_left(hashes, value)
+    return index < len(hashes) and hashes[index] == value
+
+
+class KnownVacancies:
+    """64-bit hashes of the known vacancy URLs, and of their URLs along with the views and applications,
+    kept in sorted arrays. That takes 16 bytes per vacancy, and lookups are binary searches.
+    """
+
+    def __init__(self, interaction_stats: Iterable[tuple[str, int, int]]) -> None:
+        urls, fingerprints = array("Q"), array("Q")
+        for url, views, applications in interaction_stats:
+            urls.append(_hash(url))
+            fingerprints.append(self.fingerprint(url, views, applications))
+        self._urls = array("Q", sorted(urls))
+        self._fingerprints = array("Q", sorted(fingerprints))
+
+    @classmethod
+    def from_collection(cls, categories: Sequence[str]) -> Self:
+        with CollectionVacancies() as collection_vacancies:
+            return cls(
+                (vacancy["url"], vacancy["views"], vacancy["applications"])
+                for vacancy in collection_vacancies.iter_interaction_stats(categories)
+            )
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    @staticmethod
+    def fingerprint(url: str, views: int, applications: int) -> int:
+        return _hash(f"{url} {views} {applications}")
+
+    def is_known(self, url: str) -> bool:
+        return _contains(self._urls, _hash(url))
+
+    def is_unchanged(self, url: str, views: int, applications: int) -> bool:
+        """Whether the vacancy is stored with the same number of views and applications."""
+        return _contains(self._fingerprints, self.fingerprint(url, views, applications))
@@ -4,7 +4,19 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 # useful for handling different item types with a single interface
-from scrapy import signals
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import suppress
+from time import monotonic, perf_counter
+from typing import Any, Self
+
+from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.downloadermiddlewares.retry import get_retry_request
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+
+from techtrendscrape.proxies import Outcome, ProxyHealth, ProxyPool
 
 # ruff: noqa: ANN001, ANN206, ARG002, ANN201, UP028, G002, UP031
 
@@ -101,3 +113,146 @@ class TechtrendscrapeDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class ParseLatencyMiddleware:
+    """Time how long the spider callbacks take to produce their output, per page, excluding the time the output
+    spends in the rest of the crawl. The number of pages, the total and the maximum latency are kept in the crawl
+    stats under `parse/`. It should be the closest middleware to the spider, so that only the callback is timed.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        self.stats = crawler.stats
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        return cls(crawler)
+
+    def _record(self, latency: float) -> None:
+        if self.stats:
+            self.stats.inc_value("parse/pages")
+            self.stats.inc_value("parse/seconds", latency)
+            self.stats.max_value("parse/max_seconds", latency)
+
+    def process_spider_output(
+        self, response: Response, result: Iterable[Any], spider: Spider | None = None
+    ) -> Iterator[Any]:
+        latency, iterator = 0.0, iter(result)
+        try:
+            while True:
+                started = perf_counter()
+                try:
+                    output = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    latency += perf_counter() - started
+                yield output
+        finally:
+            self._record(latency)
+
+    async def process_spider_output_async(
+        self, response: Response, result: AsyncIterator[Any], spider: Spider | None = None
+    ) -> AsyncIterator[Any]:
+        latency = 0.0
+        try:
+            while True:
+                started = perf_counter()
+                try:
+                    output = await anext(result)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    latency += perf_counter() - started
+                yield output
+        finally:
+            self._record(latency)
+
+
+class ProxyRotationMiddleware:
+    """Route every request through one of the `PROXY_LIST` proxies picked by their health.
+
+    It runs after HttpCacheMiddleware, so that responses served from the cache don't take a proxy.
+    Responses with `PROXY_BAN_HTTP_CODES` are retried through another proxy. If every proxy is busy or quarantined,
+    requests wait until a proxy is released or a quarantine is over. Requests with a `proxy` set by someone else
+    are left as they are.
+    Per-proxy counters, latency and failure rate are kept in the crawl stats under `proxies/<host:port>/`.
+    """
+
+    def __init__(self, crawler: Crawler, proxies: list[str]) -> None:
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.pool = ProxyPool(
+            proxies,
+            max_concurrency=settings.getint("PROXY_MAX_CONCURRENCY", 2),
+            max_consecutive_errors=settings.getint("PROXY_MAX_CONSECUTIVE_ERRORS", 3),
+            quarantine_base=settings.getfloat("PROXY_QUARANTINE_BASE", 30),
+            quarantine_max=settings.getfloat("PROXY_QUARANTINE_MAX", 600),
+        )
+        self.ban_http_codes = set(settings.getlist("PROXY_BAN_HTTP_CODES", [403, 429]))
+        self._proxies_by_url = {proxy.url: proxy for proxy in self.pool.proxies}
+        # Set whenever a proxy is released, to wake up the requests waiting for one.
+        self._proxy_released = asyncio.Event()
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        proxies = crawler.settings.getlist("PROXY_LIST")
+        if not proxies:
+            raise NotConfigured("PROXY_LIST is empty")
+        return cls(crawler, proxies)
+
+    def _set_stats(self, proxy: ProxyHealth) -> None:
+        if not self.stats:
+            return
+        prefix = f"proxies/{proxy.name}"
+        for key in ("requests", "errors", "bans"):
+            self.stats.set_value(f"{prefix}/{key}", getattr(proxy, key))
+        if proxy.latency is not None:
+            self.stats.set_value(f"{prefix}/latency", round(proxy.latency, 3))
+        self.stats.set_value(f"{prefix}/failure_rate", round(proxy.failure_rate, 3))
+
+    def _release(self, request: Request, outcome: Outcome | None, latency: float | None = None) -> ProxyHealth | None:
+        # The key is kept, so that retries of the request are rotated too. HttpProxyMiddleware strips the credentials
+        # from the `proxy` value, so it can't tell whether the proxy was set by this middleware.
+        proxy = self._proxies_by_url.get(request.meta.get("proxy_rotation"))
+        request.meta["proxy_rotation"] = None
+        if proxy:
+            self._proxy_released.set()
+            quarantined_until = proxy.quarantined_until
+            self.pool.release(proxy, monotonic(), outcome, latency)
+            self._set_stats(proxy)
+            if proxy.quarantined_until != quarantined_until and self.stats:
+                self.stats.inc_value(f"proxies/{proxy.name}/quarantines")
+        return proxy
+
+    async def process_request(self, request: Request, spider: Spider | None = None) -> None:
+        if request.meta.get("proxy") and "proxy_rotation" not in request.meta:
+            return
+        while not (proxy := self.pool.acquire(monotonic())):
+            self._proxy_released.clear()
+            # If proxies are only busy, there is no quarantine to time out on.
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._proxy_released.wait(), self.pool.next_available_in(monotonic()) or None)
+        request.meta["proxy"] = request.meta["proxy_rotation"] = proxy.url
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider | None = None
+    ) -> Request | Response:
+        if "cached" in response.flags:
+            self._release(request, None)
+            return response
+        if response.status in self.ban_http_codes:
+            proxy = self._release(request, Outcome.BAN)
+            if proxy:
+                retry_request = get_retry_request(
+                    request, spider=spider or self.crawler.spider, reason=f"proxy_ban_{response.status}"
+                )
+                if retry_request:
+                    return retry_request
+            return response
+        self._release(request, Outcome.SUCCESS, request.meta.get("download_latency"))
+        return response
+
+    def process_exception(self, request: Request, exception: Exception, spider: Spider | None = None) -> None:
+        self._release(request, Outcome.ERROR)
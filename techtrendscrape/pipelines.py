@@ -7,35 +7,289 @@
 # useful for handling different item types with a single interface
 
 import csv
+import gzip
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Sequence
 from pathlib import Path
-from typing import TYPE_CHECKING
+from time import monotonic
+from typing import TYPE_CHECKING, BinaryIO, Self
 
-from database import CollectionVacancies, VacancyItem
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet.defer import Deferred, DeferredLock, succeed
+from twisted.internet.task import LoopingCall
+from twisted.internet.threads import deferToThread
+
+from database import CollectionVacancies, ScrapedVacancy, VacancyItem, validate_vacancies
 from techtrendscrape.spiders.djinni import DjinniSpider
 
 if TYPE_CHECKING:
-    from pydantic import BaseModel
+    from scrapy.crawler import Crawler
+    from twisted.python.failure import Failure
+
+logger = logging.getLogger(__name__)
+
+
+class Pipeline(ABC):
+    """Buffer items and write them in batches of `PIPELINE_BATCH_SIZE` items, or every `PIPELINE_FLUSH_INTERVAL`
+    seconds, whichever comes first. Batches are validated and written one at a time in a thread, so downloads
+    aren't stalled. Invalid items are logged along with their errors, counted as `items_invalid` and dropped.
+    The time from a flush until its batch is written, including the wait for the previous batches, is kept
+    in the crawl stats as the total and the maximum flush latency.
+    """
+
+    def __init__(self, crawler: "Crawler") -> None:
+        self.crawler = crawler
+        self.batch_size = crawler.settings.getint("PIPELINE_BATCH_SIZE", 500)
+        self.flush_interval = crawler.settings.getfloat("PIPELINE_FLUSH_INTERVAL", 30)
+        self.items: list[ScrapedVacancy | VacancyItem] = []
+        self.failed_items_count = 0
+        self._write_lock = DeferredLock()
+        self._last_write: Deferred[None] = succeed(None)
+        self._flush_loop: LoopingCall | None = None
 
+    @classmethod
+    def from_crawler(cls, crawler: "Crawler") -> Self:
+        return cls(crawler)
 
-class Pipeline:
-    def __init__(self) -> None:
-        self.items: list[BaseModel] = []
+    @property
+    def stats_prefix(self) -> str:
+        return f"pipelines/{type(self).__name__}"
 
-    def process_item(self, item: VacancyItem, _: DjinniSpider) -> VacancyItem:
+    @abstractmethod
+    def write_items(self, items: Sequence[VacancyItem]) -> dict[str, int] | None:
+        """Write a batch of items. Called in a thread. Counters returned are added to the crawl stats."""
+
+    def _write_batch(self, items: Sequence[ScrapedVacancy | VacancyItem]) -> dict[str, int]:
+        """Validate the `items` and write the valid ones. Called in a thread."""
+        vacancies, invalid_items = validate_vacancies(items)
+        for item, errors in invalid_items:
+            logger.error("%s dropped the invalid item %s: %s", type(self).__name__, item.url, errors)
+        counters = {"items_written": len(vacancies), "items_invalid": len(invalid_items)}
+        if vacancies:
+            counters |= self.write_items(vacancies) or {}
+        return counters
+
+    def open_spider(self, _: DjinniSpider | None = None) -> None:
+        if self.flush_interval > 0:
+            self._flush_loop = LoopingCall(self.flush)
+            self._flush_loop.start(self.flush_interval, now=False)
+
+    async def process_item(
+        self, item: ScrapedVacancy | VacancyItem, _: DjinniSpider | None = None
+    ) -> ScrapedVacancy | VacancyItem:
         self.items.append(item)
+        if len(self.items) >= self.batch_size:
+            # Wait for the batch to be written, so items don't pile up faster than they're written.
+            await maybe_deferred_to_future(self.flush())
         return item
 
+    def flush(self) -> Deferred[None]:
+        """Hand the buffered items over to `_write_batch` in a thread. The returned deferred never fails,
+        errors are logged and counted in the crawl stats instead.
+        """
+        if not self.items:
+            return self._last_write
+        items, self.items, flushed_at = self.items, [], monotonic()
+        self._last_write = self._write_lock.run(deferToThread, self._write_batch, items)
+        self._last_write.addCallbacks(
+            self._on_written,
+            self._on_write_failed,
+            callbackArgs=(flushed_at,),
+            errbackArgs=(len(items), flushed_at),
+        )
+        return self._last_write
+
+    def _record_flush_latency(self, flushed_at: float) -> None:
+        if self.crawler.stats:
+            latency = monotonic() - flushed_at
+            self.crawler.stats.inc_value(f"{self.stats_prefix}/flush_seconds", latency)
+            self.crawler.stats.max_value(f"{self.stats_prefix}/flush_max_seconds", latency)
+
+    def _on_written(self, counters: dict[str, int], flushed_at: float) -> None:
+        self._record_flush_latency(flushed_at)
+        if self.crawler.stats:
+            self.crawler.stats.inc_value(f"{self.stats_prefix}/batches_written")
+            for key, count in counters.items():
+                self.crawler.stats.inc_value(f"{self.stats_prefix}/{key}", count)
+
+    def _on_write_failed(self, failure: "Failure", items_count: int, flushed_at: float) -> None:
+        self._record_flush_latency(flushed_at)
+        self.failed_items_count += items_count
+        if self.crawler.stats:
+            self.crawler.stats.inc_value(f"{self.stats_prefix}/items_failed", items_count)
+            self.crawler.stats.inc_value(f"{self.stats_prefix}/batches_failed")
+        logger.error(
+            "%s failed to write a batch of %d items",
+            type(self).__name__,
+            items_count,
+            exc_info=(failure.type, failure.value, failure.getTracebackObject()),
+        )
+
+    async def close_spider(self, _: DjinniSpider | None = None) -> None:
+        if self._flush_loop and self._flush_loop.running:
+            self._flush_loop.stop()
+        await maybe_deferred_to_future(self.flush())
+        if self.failed_items_count:
+            logger.error("%s failed to write %d items in total", type(self).__name__, self.failed_items_count)
+
 
 class MongoPipeline(Pipeline):
-    def close_spider(self, _: DjinniSpider) -> None:
-        with CollectionVacancies() as vacancies:
-            vacancies.bulk_upsert(("url",), items=self.items)
+    """Upsert new and changed vacancies only, unchanged ones are counted as `items_skipped`."""
+
+    def open_spider(self, spider: DjinniSpider | None = None) -> None:
+        self.vacancies = CollectionVacancies().open()
+        super().open_spider(spider)
+
+    def write_items(self, items: Sequence[VacancyItem]) -> dict[str, int]:
+        summary = self.vacancies.bulk_upsert_changes(("url",), items=items)
+        return {"items_inserted": summary.inserted, "items_updated": summary.updated, "items_skipped": summary.skipped}
+
+    async def close_spider(self, spider: DjinniSpider | None = None) -> None:
+        try:
+            await super().close_spider(spider)
+        finally:
+            self.vacancies.close()
+
+
+class CSVOutput:
+    """A CSV file, optionally gzip compressed. The CSV bytes written are counted as the rows are encoded,
+    so the size of the file is known without flushing the buffers.
+    """
+
+    def __init__(self, path: Path, *, fieldnames: Sequence[str], compress: bool) -> None:
+        self.path = path
+        self.file = path.open("wb")
+        self.stream: BinaryIO = gzip.GzipFile(fileobj=self.file, mode="wb") if compress else self.file
+        # The number of CSV bytes written so far, before compression.
+        self.size = 0
+        self.writer = csv.DictWriter(self, fieldnames=fieldnames)
+        self.writer.writeheader()
+
+    def write(self, text: str) -> int:
+        """Encode a row formatted by the CSV writer into the buffered stream."""
+        data = text.encode()
+        self.size += len(data)
+        return self.stream.write(data)
+
+    def flush(self) -> None:
+        """Hand the buffered rows over to the OS, so that they aren't lost if the crawl process dies."""
+        self.stream.flush()
+        self.file.flush()
+
+    def sync(self) -> None:
+        """Push the written rows to the disk, so that they aren't lost if the machine goes down."""
+        self.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        self.stream.close()
+        self.file.close()
 
 
 class CSVPipeline(Pipeline):
-    def close_spider(self, _: DjinniSpider) -> None:
-        fieldnames = VacancyItem.model_fields.keys()
-        with Path(f"{CollectionVacancies.collection_name}.csv").open("w") as fp:
-            writer = csv.DictWriter(fp, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows([item.model_dump() for item in self.items])
+    """Stream items into `vacancies.csv` as they arrive, instead of buffering them into batches: each row is validated
+    and handed over to the OS by `process_item`, so a crash of the crawl loses no rows. The file can be split
+    by category (`CSV_SPLIT_BY_CATEGORY`), rotated once it exceeds `CSV_MAX_FILE_SIZE` uncompressed bytes
+    and gzip compressed (`CSV_GZIP`). Files are fsynced every `CSV_FSYNC_INTERVAL` seconds.
+    """
+
+    fieldnames = tuple(VacancyItem.model_fields.keys())
+
+    def __init__(self, crawler: "Crawler") -> None:
+        super().__init__(crawler)
+        self.split_by_category = crawler.settings.getbool("CSV_SPLIT_BY_CATEGORY")
+        self.max_file_size = crawler.settings.getint("CSV_MAX_FILE_SIZE")
+        self.compress = crawler.settings.getbool("CSV_GZIP")
+        self.fsync_interval = crawler.settings.getfloat("CSV_FSYNC_INTERVAL", 30)
+        self.outputs: dict[str | None, CSVOutput] = {}
+        self.paths: list[Path] = []
+        self._part_numbers: Counter[str | None] = Counter()
+        self._last_sync = monotonic()
+
+    def open_spider(self, _: DjinniSpider | None = None) -> None:
+        # Nothing is buffered, so there is nothing to flush periodically.
+        if not self.split_by_category:
+            self._get_output(None)
+
+    async def process_item(
+        self, item: ScrapedVacancy | VacancyItem, _: DjinniSpider | None = None
+    ) -> ScrapedVacancy | VacancyItem:
+        counters = self._write_batch([item])
+        if self.crawler.stats:
+            for key, count in counters.items():
+                self.crawler.stats.inc_value(f"{self.stats_prefix}/{key}", count)
+        return item
+
+    def _output_path(self, category: str | None) -> Path:
+        name = CollectionVacancies.collection_name
+        if category is not None:
+            name += "-" + (re.sub(r"\W+", "-", category.lower()).strip("-") or "other")
+        if part_number := self._part_numbers[category]:
+            name += f".{part_number}"
+        return Path(f"{name}.csv.gz" if self.compress else f"{name}.csv")
+
+    def _get_output(self, category: str | None) -> CSVOutput:
+        key = category if self.split_by_category else None
+        output = self.outputs.get(key)
+        if output and self.max_file_size and output.size >= self.max_file_size:
+            output.close()
+            self._part_numbers[key] += 1
+            output = None
+        if not output:
+            path = self._output_path(key)
+            output = self.outputs[key] = CSVOutput(path, fieldnames=self.fieldnames, compress=self.compress)
+            self.paths.append(path)
+        return output
+
+    def write_items(self, items: Sequence[VacancyItem]) -> None:
+        """Write the rows and flush them, called in the reactor thread. Writes only reach the OS buffers,
+        apart from the fsync once in `CSV_FSYNC_INTERVAL` seconds.
+        """
+        for item in items:
+            output = self._get_output(item.category)
+            output.writer.writerow(item.model_dump())
+            output.flush()
+        if monotonic() - self._last_sync >= self.fsync_interval:
+            for output in self.outputs.values():
+                output.sync()
+            self._last_sync = monotonic()
+
+    async def close_spider(self, spider: DjinniSpider | None = None) -> None:
+        try:
+            await super().close_spider(spider)
+        finally:
+            for output in self.outputs.values():
+                output.sync()
+                output.close()
+
+
+class ParquetPipeline(Pipeline):
+    """Append items to the `vacancies` Parquet dataset, partitioned by category and publication month.
+    Each crawl writes its own files of `PARQUET_ROW_GROUP_SIZE` rows per row group, readable once the crawl is over.
+    """
+
+    def __init__(self, crawler: "Crawler") -> None:
+        super().__init__(crawler)
+        self.row_group_size = crawler.settings.getint("PARQUET_ROW_GROUP_SIZE", 10_000)
+        self.compression = crawler.settings.get("PARQUET_COMPRESSION", "zstd")
+
+    def open_spider(self, spider: DjinniSpider | None = None) -> None:
+        from database import ParquetVacancies  # noqa: PLC0415
+
+        self.vacancies: ParquetVacancies = ParquetVacancies(
+            Path(CollectionVacancies.collection_name), row_group_size=self.row_group_size, compression=self.compression
+        )
+        super().open_spider(spider)
+
+    def write_items(self, items: Sequence[VacancyItem]) -> None:
+        self.vacancies.write(items)
+
+    async def close_spider(self, spider: DjinniSpider | None = None) -> None:
+        try:
+            await super().close_spider(spider)
+        finally:
+            self.vacancies.close()
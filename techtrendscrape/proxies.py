@@ -0,0 +1,114 @@
+"""Health tracking of the proxies from the `PROXY_LIST` setting, used by `ProxyRotationMiddleware`."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import StrEnum
+from random import Random
+from urllib.parse import urlsplit
+
+# Weight of the latest observation in the exponentially weighted moving averages.
+EWMA_ALPHA = 0.3
+# Seconds of latency a proxy failing every request is penalized with when proxies are compared.
+FAILURE_PENALTY = 10.0
+
+
+class Outcome(StrEnum):
+    SUCCESS = "success"
+    ERROR = "error"
+    BAN = "ban"
+
+
+@dataclass(slots=True)
+class ProxyHealth:
+    url: str
+    # Moving averages of the download latency in seconds and of the share of failed (errors or bans) downloads.
+    latency: float | None = None
+    failure_rate: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    bans: int = 0
+    in_flight: int = 0
+    consecutive_failures: int = 0
+    quarantined_until: float = 0.0
+
+    @property
+    def name(self) -> str:
+        """Proxy address without credentials, safe to be logged and used in stats keys."""
+        return urlsplit(self.url).netloc.rpartition("@")[2]
+
+    @property
+    def score(self) -> float:
+        """The lower, the better. Proxies that haven't been used yet are preferred, so that each one gets measured."""
+        return (self.latency or 0.0) + FAILURE_PENALTY * self.failure_rate
+
+
+class ProxyPool:
+    """Pick a proxy with the "power of two choices": the better scored of two random available proxies.
+    That prefers fast and healthy proxies without sending every request to the same one.
+
+    A proxy is unavailable while `max_concurrency` requests are in flight through it, or while it's quarantined.
+    A ban quarantines a proxy at once, errors only after `max_consecutive_errors` in a row. The quarantine doubles
+    with each consecutive failure, from `quarantine_base` up to `quarantine_max` seconds.
+    """
+
+    def __init__(
+        self,
+        proxies: Sequence[str],
+        *,
+        max_concurrency: int = 2,
+        max_consecutive_errors: int = 3,
+        quarantine_base: float = 30.0,
+        quarantine_max: float = 600.0,
+        random: Random | None = None,
+    ) -> None:
+        self.proxies = [ProxyHealth(proxy if "://" in proxy else f"http://{proxy}") for proxy in dict.fromkeys(proxies)]
+        self.max_concurrency = max_concurrency
+        self.max_consecutive_errors = max_consecutive_errors
+        self.quarantine_base = quarantine_base
+        self.quarantine_max = quarantine_max
+        self._random = random or Random()  # noqa: S311
+
+    def acquire(self, now: float) -> ProxyHealth | None:
+        """Reserve a proxy for a request, or return None if none is available."""
+        available = [
+            proxy for proxy in self.proxies if proxy.quarantined_until <= now and proxy.in_flight < self.max_concurrency
+        ]
+        if not available:
+            return None
+        proxy = min(self._random.sample(available, min(len(available), 2)), key=lambda proxy: proxy.score)
+        proxy.in_flight += 1
+        proxy.requests += 1
+        return proxy
+
+    def release(self, proxy: ProxyHealth, now: float, outcome: Outcome | None, latency: float | None = None) -> None:
+        """Free the reserved proxy and record the `outcome` of its request, if any."""
+        proxy.in_flight = max(proxy.in_flight - 1, 0)
+        if outcome is None:
+            return
+        if latency is not None:
+            proxy.latency = latency if proxy.latency is None else _ewma(proxy.latency, latency)
+        proxy.failure_rate = _ewma(proxy.failure_rate, 0.0 if outcome is Outcome.SUCCESS else 1.0)
+
+        if outcome is Outcome.SUCCESS:
+            proxy.consecutive_failures = 0
+            return
+        proxy.consecutive_failures += 1
+        if outcome is Outcome.BAN:
+            proxy.bans += 1
+        else:
+            proxy.errors += 1
+            if proxy.consecutive_failures < self.max_consecutive_errors:
+                return
+        quarantine = min(self.quarantine_base * 2 ** (proxy.consecutive_failures - 1), self.quarantine_max)
+        proxy.quarantined_until = now + quarantine
+
+    def next_available_in(self, now: float) -> float:
+        """Seconds until the earliest quarantine is over. Zero if proxies are only busy."""
+        quarantined_until = [
+            proxy.quarantined_until for proxy in self.proxies if proxy.in_flight < self.max_concurrency
+        ]
+        return max(min(quarantined_until, default=now) - now, 0.0)
+
+
+def _ewma(average: float, value: float) -> float:
+    return (1 - EWMA_ALPHA) * average + EWMA_ALPHA * value
@@ -8,7 +8,7 @@
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from datetime import timedelta
-from os import environ, getenv
+from os import getenv
 from pathlib import Path
 
 BOT_NAME = "techtrendscrape"
@@ -16,7 +16,7 @@ BOT_NAME = "techtrendscrape"
 SPIDER_MODULES = ["techtrendscrape.spiders"]
 NEWSPIDER_MODULE = "techtrendscrape.spiders"
 
-IS_TEST = environ["IS_TEST"].lower() in {"1", "true", "yes", "on"}
+IS_TEST = getenv("IS_TEST", "").lower() in {"1", "true", "yes", "on"}
 
 # Crawl responsibly by identifying yourself (and your website) on the user-agent
 # USER_AGENT = "techtrendscrape (+http://www.yourdomain.com)"
@@ -49,21 +49,34 @@ ROBOTSTXT_OBEY = False
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-# SPIDER_MIDDLEWARES = {
-#    "techtrendscrape.middlewares.TechtrendscrapeSpiderMiddleware": 543,
-# }
+# The parse latency is measured closest to the spider, after the built-in middlewares.
+SPIDER_MIDDLEWARES = {
+    "techtrendscrape.middlewares.ParseLatencyMiddleware": 950,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "techtrendscrape.middlewares.TechtrendscrapeDownloaderMiddleware": 543,
-# }
+# The proxy rotation runs after the HTTP cache (900), so that cached responses don't wait for a proxy,
+# and before HttpProxyMiddleware, moved after it, which handles credentials of the proxy URL.
+# It's disabled if PROXY_LIST is empty. Scrapy's HTTP cache middleware is replaced with one
+# refreshing the responses revalidated with 304 Not Modified.
+DOWNLOADER_MIDDLEWARES = {
+    "scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware": None,
+    "techtrendscrape.httpcache.HttpCacheMiddleware": 900,
+    "techtrendscrape.middlewares.ProxyRotationMiddleware": 910,
+    "scrapy.downloadermiddlewares.httpproxy.HttpProxyMiddleware": 920,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-# EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-# }
+EXTENSIONS = {
+    "techtrendscrape.extensions.CrawlMetrics": 500,
+}
+
+# CrawlMetrics writes a JSON report and a Prometheus textfile (e.g. into the directory of the
+# node exporter textfile collector) once the crawl is over. It's disabled if neither is set.
+METRICS_JSON_PATH = getenv("METRICS_JSON_PATH", "")
+METRICS_TEXTFILE_PATH = getenv("METRICS_TEXTFILE_PATH", "")
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -71,6 +84,24 @@ ITEM_PIPELINES = {
     "techtrendscrape.pipelines.MongoPipeline": 1,
 }
 
+# Items are written in batches of this size, or every PIPELINE_FLUSH_INTERVAL seconds
+# (0 disables the timer), whichever comes first. CSVPipeline writes each item as it arrives.
+PIPELINE_BATCH_SIZE = 500
+PIPELINE_FLUSH_INTERVAL = 30
+
+# CSVPipeline output: one file per category, a new part once a file exceeds
+# CSV_MAX_FILE_SIZE uncompressed bytes (0 disables rotation), gzip compression and how often
+# (in seconds) the written rows are fsynced.
+CSV_SPLIT_BY_CATEGORY = False
+CSV_MAX_FILE_SIZE = 0
+CSV_GZIP = False
+CSV_FSYNC_INTERVAL = 30
+
+# ParquetPipeline output: the `vacancies` dataset directory gets a file per category and
+# publication month on each crawl, made of row groups of PARQUET_ROW_GROUP_SIZE rows.
+PARQUET_ROW_GROUP_SIZE = 10_000
+PARQUET_COMPRESSION = "zstd"
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 AUTOTHROTTLE_ENABLED = True
@@ -80,17 +111,21 @@ AUTOTHROTTLE_START_DELAY = 2
 AUTOTHROTTLE_MAX_DELAY = 5
 # The average number of requests Scrapy should be sending in parallel to
 # each remote server
-AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+AUTOTHROTTLE_TARGET_CONCURRENCY = 2.0
 # Enable showing throttling stats for every response received:
 # AUTOTHROTTLE_DEBUG = False
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
 HTTPCACHE_ENABLED = True
+# Responses are fresh for this long, then they are revalidated with conditional requests.
 HTTPCACHE_EXPIRATION_SECS = timedelta(hours=3).seconds
 HTTPCACHE_DIR = "httpcache"
 HTTPCACHE_IGNORE_HTTP_CODES = []
-HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+HTTPCACHE_POLICY = "techtrendscrape.httpcache.RevalidationPolicy"
+HTTPCACHE_STORAGE = "techtrendscrape.httpcache.SQLiteCacheStorage"
+# Least recently used responses are evicted once the compressed cache exceeds this size in bytes.
+HTTPCACHE_MAX_SIZE = 512 * 1024 * 1024
 
 # Set settings whose default value is deprecated to a future-proof value
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
@@ -105,5 +140,28 @@ MONGODB_CLUSTER_HOST = getenv("MONGODB_CLUSTER_HOST") or None
 if not MONGODB_HOST and not MONGODB_PORT and not MONGODB_USERNAME and not MONGODB_PASSWORD and not MONGODB_CLUSTER_HOST:
     ITEM_PIPELINES = {"techtrendscrape.pipelines.CSVPipeline": 1}
 
+# Skip vacancies stored with the same views and applications, and stop paginating a
+# category after INCREMENTAL_KNOWN_PAGES_LIMIT consecutive pages of known vacancies.
+# Requires MongoDB.
+INCREMENTAL_CRAWL = False
+INCREMENTAL_KNOWN_PAGES_LIMIT = 2
+
+# `python -m techtrendscrape.daemon` crawls each category every DAEMON_CRAWL_INTERVAL seconds,
+# or as set in DAEMON_CRAWL_INTERVALS by category (e.g. {"Python": 3600}). Intervals are randomly
+# shifted by up to DAEMON_JITTER of their length, and at most DAEMON_MAX_PARALLEL_CRAWLS categories
+# are crawled at once.
+DAEMON_CRAWL_INTERVAL = timedelta(hours=6).total_seconds()
+DAEMON_CRAWL_INTERVALS = {}
+DAEMON_JITTER = 0.1
+DAEMON_MAX_PARALLEL_CRAWLS = 1
+
 PATH_TO_FILE_WITH_PROXIES = getenv("PATH_TO_FILE_WITH_PROXIES")
 PROXY_LIST = Path(PATH_TO_FILE_WITH_PROXIES).read_text().split() if PATH_TO_FILE_WITH_PROXIES else None
+# Requests in flight through a single proxy.
+PROXY_MAX_CONCURRENCY = 2
+# A proxy is quarantined at once on a ban, and after several consecutive download errors.
+# The quarantine doubles with each consecutive failure, from the base up to the max seconds.
+PROXY_BAN_HTTP_CODES = [403, 429]
+PROXY_MAX_CONSECUTIVE_ERRORS = 3
+PROXY_QUARANTINE_BASE = 30
+PROXY_QUARANTINE_MAX = 600
@@ -1,18 +1,22 @@
 import json
 import logging
+import re
 from collections.abc import AsyncIterator, Generator
 from datetime import datetime
-from secrets import choice
 from typing import Any, ClassVar
-from urllib.parse import quote_plus
+from urllib.parse import parse_qs, quote_plus, urlparse
 from zoneinfo import ZoneInfo
 
 import scrapy
 from fake_useragent import UserAgent
-from parsel.selector import Selector, SelectorList
+from lxml import etree
+from parsel.selector import SelectorList
 from scrapy.http import Request, Response
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet.threads import deferToThread
 
-from database import InteractionStats, VacancyItem
+from database import ScrapedVacancy
+from techtrendscrape.known_vacancies import KnownVacancies
 
 ua = UserAgent()
 default_request_headers = {
@@ -35,6 +39,14 @@ default_request_headers = {
     "sec-ch-ua-platform": '"Linux"',
 }
 
+# Listing pages are walked with precompiled XPath expressions over the lxml tree parsed by the response.
+JSON_LD_XPATH = etree.XPath('//script[@type="application/ld+json"]/text()', smart_strings=False)
+JOB_ITEMS_XPATH = etree.XPath(
+    "//ul[contains(concat(' ', normalize-space(@class), ' '), ' list-jobs ')]//li[contains(@id, 'job-item')]"
+)
+TEXT_NOWRAP_XPATH = etree.XPath(".//span[contains(concat(' ', normalize-space(@class), ' '), ' text-nowrap ')]")
+NUMBER_PATTERN = re.compile(r"\d+")
+
 
 class NotFoundError(Exception): ...
 
@@ -51,14 +63,17 @@ class DjinniSpider(scrapy.Spider):
     categories = "Python"
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
-        self.category: str
-        self.job_offers: dict[int, dict[str, Any]] = {}
+        self.known_vacancies: KnownVacancies | None = None
         super().__init__(*args, **kwargs)
 
     async def start(self) -> AsyncIterator[Request]:
+        if self.settings.getbool("INCREMENTAL_CRAWL"):
+            self.known_vacancies = await maybe_deferred_to_future(
+                deferToThread(KnownVacancies.from_collection, self.categories.split(" | "))
+            )
+            self.log(f"Incremental crawl, {len(self.known_vacancies)} known vacancies loaded", level=logging.INFO)
         for url in self.start_urls:
             for primary_keyword in self.categories.split(" | "):
-                self.category = primary_keyword
                 yield Request(
                     f"{url}?primary_keyword={quote_plus(primary_keyword)}",
                     headers={
@@ -66,16 +81,17 @@ class DjinniSpider(scrapy.Spider):
                         "User-Agent": ua.random,
                     }
                     | default_request_headers,
-                    meta={"proxy": f"http://{choice(self.settings['PROXY_LIST'])}"}
-                    if self.settings["PROXY_LIST"]
-                    else None,
+                    cb_kwargs={"category": primary_keyword},
                 )
 
-    def _extract_job_offers(self, selector: SelectorList) -> None:
-        json_text = selector.xpath('//script[@type="application/ld+json"]/text()').get()
+    def _extract_job_offers(self, root: etree._Element) -> dict[int, dict[str, Any]]:
+        """Return the JSON-LD job offers of a page by their identifiers."""
+        json_texts = JSON_LD_XPATH(root)
+        json_text = json_texts[0] if json_texts else None
 
         if not json_text:
             raise ValueError(f"{json_text=}")
+        job_offers = {}
         for offer in json.loads(json_text):
             application_location = offer.get("applicantLocationRequirements")
             if isinstance(application_location, list):
@@ -86,7 +102,7 @@ class DjinniSpider(scrapy.Spider):
                 address = {}
 
             try:
-                self.job_offers[offer["identifier"]] = {
+                job_offers[offer["identifier"]] = {
                     "address": address.get("addressCountry")
                     or address.get("addressLocality")
                     or address.get("addressRegion")
@@ -105,27 +121,74 @@ class DjinniSpider(scrapy.Spider):
             except (KeyError, TypeError):
                 self.log(f"{offer=}", level=logging.ERROR)
                 raise
+        return job_offers
+
+    def _parse_interaction_stats(self, job_item: etree._Element) -> tuple[int, int]:
+        """Find the views and applications within a single pass over the `span.text-nowrap` elements of a job item.
+        The whole text of each element is searched, as the counters might be wrapped in child elements.
+        """
+        views_text = applications_text = None
+        for span in TEXT_NOWRAP_XPATH(job_item):
+            text = "".join(span.itertext())
+            if "перегляд" in text:
+                views_text = views_text or NUMBER_PATTERN.search(text)
+            elif "відгук" in text:
+                applications_text = applications_text or NUMBER_PATTERN.search(text)
 
-    def _parse_interaction_stats(self, selector: Selector) -> InteractionStats:
-        views_text = selector.css("span.text-nowrap:contains('перегляд')::text").re_first(r"(\d+)")
         if not views_text:
-            raise ValueError(f"{views_text=}, {selector=!s}")
-
-        applications_text = selector.css("span.text-nowrap:contains('відгук')::text").re_first(r"(\d+)")
+            raise ValueError(f"{views_text=}, job_item={etree.tostring(job_item, encoding=str)}")
         if not applications_text:
-            raise ValueError(f"{applications_text=}, {selector=!s}")
-
-        return InteractionStats(views=int(views_text), applications=int(applications_text))
-
-    def parse(self, response: Response) -> Generator[Request | VacancyItem, Any]:
-        self._extract_job_offers(response.css("head"))
-        for job_item in response.css("ul.list-jobs li[id*='job-item']"):
-            interaction_stats = self._parse_interaction_stats(job_item)
-            identifier = int(job_item.attrib["id"].split("-")[-1])
-            offer = self.job_offers[identifier]
-            yield VacancyItem(
+            raise ValueError(f"{applications_text=}, job_item={etree.tostring(job_item, encoding=str)}")
+
+        return int(views_text[0]), int(applications_text[0])
+
+    def _inc_stats(self, key: str, count: int = 1) -> None:
+        if self.crawler.stats:
+            self.crawler.stats.inc_value(key, count)
+
+    @staticmethod
+    def _count_remaining_pages(response: Response, pagination: SelectorList) -> int:
+        """Number of pages after the current one, according to the page numbers in the pagination links."""
+        page_numbers = [int(number) for number in pagination.css("a::attr(href)").re(r"page=(\d+)")]
+        current_page_number = int(parse_qs(urlparse(response.url).query).get("page", ["1"])[0])
+        return max(max(page_numbers, default=0) - current_page_number, 1)
+
+    def _stop_paginating(self, response: Response, pagination: SelectorList, known_pages: int) -> bool:
+        if self.known_vacancies is None or known_pages < self.settings.getint("INCREMENTAL_KNOWN_PAGES_LIMIT", 2):
+            return False
+        remaining_pages = self._count_remaining_pages(response, pagination)
+        self._inc_stats("incremental/requests_skipped", remaining_pages)
+        self.log(
+            f"Stopped after {known_pages} pages of known vacancies, {remaining_pages} pages skipped. "
+            f"URL of the last page: {response.url}",
+            level=logging.INFO,
+        )
+        return True
+
+    def parse(
+        self, response: Response, category: str, known_pages: int = 0
+    ) -> Generator[Request | ScrapedVacancy, Any]:
+        """`category` travels with each request, so pages of several categories can be parsed concurrently.
+
+        In the incremental mode (`INCREMENTAL_CRAWL`), vacancies stored with the same views and applications
+        are skipped, and pagination stops after `INCREMENTAL_KNOWN_PAGES_LIMIT` consecutive pages of known vacancies.
+        `known_pages` is the number of such pages preceding the current one.
+
+        Items are yielded unvalidated, the pipelines validate them in batches.
+        """
+        root = response.selector.root
+        job_offers = self._extract_job_offers(root)
+        job_items = JOB_ITEMS_XPATH(root)
+        all_known = bool(job_items)
+        for job_item in job_items:
+            views, applications = self._parse_interaction_stats(job_item)
+            identifier = int(job_item.get("id").split("-")[-1])
+            offer = job_offers[identifier]
+            item = ScrapedVacancy(
+                views=views,
+                applications=applications,
                 source=self.name,
-                category=self.category,
+                category=category,
                 company_name=offer["company_name"],
                 address=offer["address"],
                 title=offer["title"],
@@ -135,14 +198,21 @@ class DjinniSpider(scrapy.Spider):
                     tzinfo=ZoneInfo("Europe/Kyiv")
                 ),
                 url=offer["url"],
-                views=interaction_stats.views,
-                applications=interaction_stats.applications,
             )
+            if self.known_vacancies is not None:
+                all_known = all_known and self.known_vacancies.is_known(item.url)
+                if self.known_vacancies.is_unchanged(item.url, views, applications):
+                    self._inc_stats("incremental/items_skipped")
+                    continue
+            yield item
+        known_pages = known_pages + 1 if all_known else 0
         pagination = response.css("ul.pagination li.page-item")
         if pagination:
             last_li = pagination[-1]
             link = last_li.css("a::attr(href)").get()
-            if link:
-                yield response.follow(link, callback=self.parse)
+            if link and not self._stop_paginating(response, pagination, known_pages):
+                yield response.follow(
+                    link, callback=self.parse, cb_kwargs={"category": category, "known_pages": known_pages}
+                )
         else:
             self.log(f"No more pages found. URL of the last page: {response.url}", level=logging.INFO)
@@ -0,0 +1,145 @@
+import csv
+import json
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from random import Random
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from database import ParquetVacancies, VacancyItem
+
+TECHNOLOGIES = ("Python", "Django", "FastAPI", "PostgreSQL", "Docker", "Kubernetes", "AWS", "RESTful API", "C# / .NET")
+SNIPPETS = (
+    "• Від 3 років досвіду з <b>{technology}</b>;<br>",
+    "- Strong knowledge of {technology} and SQL (MySQL, PostgreSQL);\n",
+    "Experience with {technology}, CI/CD pipelines & cloud infrastructure. ",
+    "Будемо раді, якщо маєте досвід роботи з {technology}! ",
+)
+# Kept apart from the category of the other tests, which count the vacancies stored in the test database.
+SYNTHETIC_CATEGORY = "Synthetic"
+CRAWLING_DATETIME = datetime(2025, 6, 13, tzinfo=ZoneInfo("Europe/Kyiv"))
+
+PeakMemory = Callable[..., Any]
+
+
+def generate_descriptions(count: int, seed: int = 0) -> list[str]:
+    """Generate vacancy-like descriptions mixing English, Ukrainian, HTML tags and punctuation."""
+    random = Random(seed)  # noqa: S311
+    return [
+        "".join(
+            random.choice(SNIPPETS).format(technology=random.choice(TECHNOLOGIES))
+            for _ in range(random.randint(10, 30))
+        )
+        for _ in range(count)
+    ]
+
+
+def generate_vacancy_items(count: int, seed: int = 0) -> list[VacancyItem]:
+    """Generate vacancies of `SYNTHETIC_CATEGORY` published within the 30 days before `CRAWLING_DATETIME`."""
+    random = Random(seed)  # noqa: S311
+    return [
+        VacancyItem(
+            views=random.randint(0, 500),
+            applications=random.randint(0, 50),
+            source="djinni",
+            category=SYNTHETIC_CATEGORY,
+            company_name=f"Company {random.randint(1, 1000)}",
+            address="UA",
+            title=f"{random.choice(TECHNOLOGIES)} Developer",
+            description=description,
+            years_of_experience=random.randint(0, 10),
+            publication_date=CRAWLING_DATETIME - timedelta(seconds=random.randint(1, 30 * 24 * 60 * 60)),
+            url=f"https://djinni.co/jobs/{index}-synthetic-vacancy/",  # type: ignore[reportArgumentType]
+        )
+        for index, description in enumerate(generate_descriptions(count, seed))
+    ]
+
+
+def rounds(corpus_size: int) -> int:
+    """Fewer rounds for larger corpora, so that a benchmark takes seconds rather than minutes."""
+    return min(5, max(1, 10_000 // corpus_size))
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "corpus_size" in metafunc.fixturenames:
+        corpus_sizes = [int(size) for size in metafunc.config.getoption("corpus_sizes").split(",")]
+        metafunc.parametrize(
+            "corpus_size", corpus_sizes, ids=[f"{size}-vacancies" for size in corpus_sizes], scope="session"
+        )
+
+
+@pytest.fixture(scope="session")
+def synthetic_descriptions() -> list[str]:
+    return generate_descriptions(10_000)
+
+
+@pytest.fixture(scope="session")
+def synthetic_vacancy_items(corpus_size: int) -> list[VacancyItem]:
+    return generate_vacancy_items(corpus_size)
+
+
+@pytest.fixture(scope="session")
+def synthetic_vacancies_csv(
+    synthetic_vacancy_items: list[VacancyItem], tmp_path_factory: pytest.TempPathFactory
+) -> Path:
+    path = tmp_path_factory.mktemp("csv") / "vacancies.csv"
+    with path.open("w", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=VacancyItem.model_fields.keys())
+        writer.writeheader()
+        writer.writerows(item.model_dump() for item in synthetic_vacancy_items)
+    return path
+
+
+@pytest.fixture(scope="session")
+def synthetic_vacancies_parquet(
+    synthetic_vacancy_items: list[VacancyItem], tmp_path_factory: pytest.TempPathFactory
+) -> Path:
+    path = tmp_path_factory.mktemp("parquet")
+    with ParquetVacancies(path) as parquet_vacancies:
+        parquet_vacancies.write(synthetic_vacancy_items)
+    return path
+
+
+@pytest.fixture(scope="session")
+def memory_baseline(pytestconfig: pytest.Config) -> dict[str, int]:
+    """Peak memory of each benchmark of the `--memory-baseline` run, by the benchmark full name."""
+    path: Path | None = pytestconfig.getoption("memory_baseline")
+    if not path:
+        return {}
+    return {
+        saved_benchmark["fullname"]: saved_benchmark["extra_info"]["peak_memory"]
+        for saved_benchmark in json.loads(path.read_text())["benchmarks"]
+        if "peak_memory" in saved_benchmark["extra_info"]
+    }
+
+
+@pytest.fixture
+def peak_memory(
+    benchmark: BenchmarkFixture, memory_baseline: dict[str, int], request: pytest.FixtureRequest
+) -> PeakMemory:
+    """Call a function once, outside of the timed rounds, and record the peak of the memory it allocated
+    in the `peak_memory` extra info of the benchmark. Fail if it exceeds the baseline by more than the tolerance.
+    """
+    tolerance: float = request.config.getoption("memory_tolerance")
+
+    def measure(function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        tracemalloc.start()
+        try:
+            result = function(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory"] = peak
+        baseline = memory_baseline.get(request.node.nodeid)
+        if baseline and peak > baseline * (1 + tolerance):
+            pytest.fail(
+                f"Peak memory of {peak:,} bytes exceeds the baseline of {baseline:,} bytes by {peak / baseline - 1:.0%}"
+            )
+        return result
+
+    return measure
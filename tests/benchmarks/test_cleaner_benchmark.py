@@ -0,0 +1,42 @@
+"""Compare the fused `TextCleaner` with the former four-pass cleaning of a large synthetic corpus."""
+
+import re
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from techtrendanalysis.cleaner import TextCleaner
+
+EXTRA_FILTERS = {"(remote)", "full-time"}
+
+
+def clean_in_four_passes(text: str, extra_filters: set[str]) -> str:
+    text = re.sub(r"[\u0400-\u04FF]+", "", text)
+    escaped_extra_filters = {re.escape(text_filter) for text_filter in extra_filters}
+    to_filter = {"<br>", "<b>", "</b>", "• ", "- ", "\n"}.union(escaped_extra_filters)
+    pattern = re.compile(rf"{'|'.join(to_filter)}", flags=re.IGNORECASE)
+    text = re.sub(pattern, " ", text)
+    punctuation_pattern = re.compile(f"[{re.escape('!"#$%&\'()*+,.:;<=>?@[\\]^_`{|}~')}]")
+    text = punctuation_pattern.sub(" ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+@pytest.fixture(scope="module")
+def corpus(synthetic_descriptions: list[str]) -> str:
+    return " ".join(synthetic_descriptions)
+
+
+def test_clean_in_four_passes(benchmark: BenchmarkFixture, corpus: str) -> None:
+    benchmark.pedantic(clean_in_four_passes, args=(corpus, EXTRA_FILTERS), rounds=5)
+
+
+def test_clean(benchmark: BenchmarkFixture, corpus: str) -> None:
+    cleaner = TextCleaner(EXTRA_FILTERS)
+    cleaned_text = benchmark.pedantic(cleaner.clean, args=(corpus,), rounds=5)
+    assert cleaned_text == clean_in_four_passes(corpus, EXTRA_FILTERS)
+
+
+def test_clean_many(benchmark: BenchmarkFixture, synthetic_descriptions: list[str]) -> None:
+    cleaner = TextCleaner(EXTRA_FILTERS)
+    cleaned_texts = benchmark.pedantic(lambda: list(cleaner.clean_many(synthetic_descriptions)), rounds=5)
+    assert cleaned_texts == [clean_in_four_passes(text, EXTRA_FILTERS) for text in synthetic_descriptions]
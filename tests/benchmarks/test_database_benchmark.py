@@ -0,0 +1,57 @@
+"""Measure the bulk upserts of synthetic corpora of `--corpus-sizes` vacancies into the test database."""
+
+from collections.abc import Iterator
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from database import CollectionVacancies, VacancyItem
+from tests.benchmarks.conftest import SYNTHETIC_CATEGORY, PeakMemory, rounds
+
+
+@pytest.fixture
+def collection_vacancies() -> Iterator[CollectionVacancies]:
+    with CollectionVacancies() as collection_vacancies:
+        yield collection_vacancies
+        collection_vacancies.collection.delete_many({"category": SYNTHETIC_CATEGORY})
+
+
+def test_bulk_upsert(
+    benchmark: BenchmarkFixture,
+    peak_memory: PeakMemory,
+    collection_vacancies: CollectionVacancies,
+    synthetic_vacancy_items: list[VacancyItem],
+    corpus_size: int,
+) -> None:
+    def delete_vacancies() -> None:
+        collection_vacancies.collection.delete_many({"category": SYNTHETIC_CATEGORY})
+
+    delete_vacancies()
+    peak_memory(collection_vacancies.bulk_upsert, ("url",), items=synthetic_vacancy_items)
+    benchmark.pedantic(
+        collection_vacancies.bulk_upsert,
+        args=(("url",),),
+        kwargs={"items": synthetic_vacancy_items},
+        setup=delete_vacancies,
+        rounds=rounds(corpus_size),
+    )
+    assert collection_vacancies.collection.count_documents({"category": SYNTHETIC_CATEGORY}) == corpus_size
+
+
+def test_bulk_upsert_changes_of_unchanged_vacancies(
+    benchmark: BenchmarkFixture,
+    peak_memory: PeakMemory,
+    collection_vacancies: CollectionVacancies,
+    synthetic_vacancy_items: list[VacancyItem],
+    corpus_size: int,
+) -> None:
+    collection_vacancies.bulk_upsert_changes(("url",), items=synthetic_vacancy_items)
+
+    peak_memory(collection_vacancies.bulk_upsert_changes, ("url",), items=synthetic_vacancy_items)
+    summary = benchmark.pedantic(
+        collection_vacancies.bulk_upsert_changes,
+        args=(("url",),),
+        kwargs={"items": synthetic_vacancy_items},
+        rounds=rounds(corpus_size),
+    )
+    assert summary.skipped == corpus_size
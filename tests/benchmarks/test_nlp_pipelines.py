@@ -0,0 +1,73 @@
+"""Compare the full spaCy pipeline with the trimmed and tokenizer-only pipelines used by the wrangler."""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+import spacy
+from pytest_benchmark.fixture import BenchmarkFixture
+from spacy.language import Language
+
+from database import VacancyItem
+from techtrendanalysis.nlp import DEFAULT_MODEL, load_nlp
+from techtrendanalysis.wrangler import Wrangler
+from tests.conftest import CATEGORY
+
+PIPELINES = {
+    "full": lambda: spacy.load(DEFAULT_MODEL),
+    "trimmed": load_nlp,
+    "tokenizer-only": lambda: load_nlp(tokenizer_only=True),
+}
+
+
+@pytest.fixture
+def wrangler() -> Wrangler:
+    crawling_datetime = datetime(2025, 6, 13, tzinfo=ZoneInfo("Europe/Kyiv"))
+    return Wrangler(
+        CATEGORY,
+        start_from_publication_date=crawling_datetime - timedelta(days=30),
+        end_date_of_publication=crawling_datetime,
+    )
+
+
+@pytest.fixture(scope="module")
+def full_pipeline() -> Language:
+    return spacy.load(DEFAULT_MODEL)
+
+
+@pytest.fixture
+def full_pipeline_frequency(
+    wrangler: Wrangler, full_pipeline: Language, vacancy_items: list[VacancyItem]
+) -> dict[str, int]:
+    proper_nouns: Counter[str] = Counter()
+    lower_to_upper: dict[str, str] = {}
+    docs = list(full_pipeline.pipe(wrangler._cleaner.clean(vacancy.description) for vacancy in vacancy_items))
+    wrangler._count_proper_nouns(docs, proper_nouns, lower_to_upper)
+    return {lower_to_upper[noun]: frequency for noun, frequency in proper_nouns.most_common()}
+
+
+@pytest.mark.parametrize("pipeline", PIPELINES)
+def test_load_pipeline(benchmark: BenchmarkFixture, pipeline: str) -> None:
+    benchmark.pedantic(PIPELINES[pipeline], setup=load_nlp.cache_clear, rounds=3)
+
+
+@pytest.mark.parametrize("pipeline", PIPELINES)
+def test_calculate_frequency_distribution(
+    benchmark: BenchmarkFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    wrangler: Wrangler,
+    vacancy_items: list[VacancyItem],
+    full_pipeline_frequency: dict[str, int],
+    pipeline: str,
+) -> None:
+    nlp = PIPELINES[pipeline]()
+    monkeypatch.setattr(wrangler, "_load_nlp", lambda: nlp)
+    descriptions = [vacancy.description for vacancy in vacancy_items]
+
+    statistics = benchmark.pedantic(
+        wrangler.calculate_frequency_distribution,
+        kwargs={"limit_results": len(full_pipeline_frequency), "descriptions": descriptions},
+        rounds=5,
+    )
+    assert statistics.technology_frequency == full_pipeline_frequency
@@ -0,0 +1,28 @@
+"""Measure the throughput of the listing page parser on the saved listing pages."""
+
+from pytest_benchmark.fixture import BenchmarkFixture
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from techtrendscrape.spiders.djinni import DjinniSpider
+from tests.benchmarks.conftest import PeakMemory
+
+
+def test_parse_listing_pages(
+    benchmark: BenchmarkFixture, peak_memory: PeakMemory, listing_responses: dict[str, HtmlResponse]
+) -> None:
+    spider = DjinniSpider.from_crawler(get_crawler(DjinniSpider))
+
+    def parse_pages() -> int:
+        # Responses are copied, so that the HTML is parsed by a fresh selector every time.
+        return sum(
+            1
+            for page_name, response in listing_responses.items()
+            for _ in spider.parse(response.replace(), category=page_name.split("-")[0].title())
+        )
+
+    peak_memory(parse_pages)
+    assert benchmark(parse_pages)
+    # Stats are missing if benchmarks are disabled.
+    if benchmark.stats:
+        benchmark.extra_info["pages_per_second"] = len(listing_responses) / benchmark.stats["mean"]
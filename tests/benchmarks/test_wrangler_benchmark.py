@@ -0,0 +1,84 @@
+"""Measure the wrangler stages on synthetic corpora of `--corpus-sizes` vacancies."""
+
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from database import VacancyItem
+from techtrendanalysis.matcher import TECHNOLOGIES_PATH
+from techtrendanalysis.wrangler import Wrangler
+from tests.benchmarks.conftest import CRAWLING_DATETIME, SYNTHETIC_CATEGORY, PeakMemory, rounds
+
+
+@pytest.fixture
+def wrangler() -> Wrangler:
+    return Wrangler(
+        SYNTHETIC_CATEGORY,
+        start_from_publication_date=CRAWLING_DATETIME - timedelta(days=30),
+        end_date_of_publication=CRAWLING_DATETIME,
+        tokenizer_only=True,
+    )
+
+
+def test_clean_text(
+    benchmark: BenchmarkFixture,
+    peak_memory: PeakMemory,
+    wrangler: Wrangler,
+    synthetic_vacancy_items: list[VacancyItem],
+    corpus_size: int,
+) -> None:
+    text = " ".join(item.description for item in synthetic_vacancy_items)
+
+    def set_text() -> None:
+        wrangler._text = text
+
+    set_text()
+    peak_memory(wrangler._clean_text)
+    benchmark.pedantic(wrangler._clean_text, setup=set_text, rounds=rounds(corpus_size))
+    assert wrangler._text
+
+
+@pytest.mark.parametrize("counting", ["proper-nouns", "technology-dictionary"])
+def test_calculate_frequency_distribution(
+    benchmark: BenchmarkFixture,
+    peak_memory: PeakMemory,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    synthetic_vacancy_items: list[VacancyItem],
+    corpus_size: int,
+    counting: str,
+) -> None:
+    monkeypatch.setattr("techtrendanalysis.matcher.CACHE_DIR", tmp_path)
+    wrangler = Wrangler(
+        SYNTHETIC_CATEGORY,
+        tokenizer_only=True,
+        technology_dictionary=TECHNOLOGIES_PATH if counting == "technology-dictionary" else None,
+    )
+    descriptions = [item.description for item in synthetic_vacancy_items]
+
+    peak_memory(wrangler.calculate_frequency_distribution, descriptions=descriptions)
+    statistics = benchmark.pedantic(
+        wrangler.calculate_frequency_distribution, kwargs={"descriptions": descriptions}, rounds=rounds(corpus_size)
+    )
+    assert "PostgreSQL" in statistics.technology_frequency
+    if benchmark.stats:
+        benchmark.extra_info["vacancies_per_second"] = corpus_size / benchmark.stats["mean"]
+
+
+@pytest.mark.parametrize("source", ["csv", "parquet"])
+def test_extract_text_from_vacancies(
+    benchmark: BenchmarkFixture,
+    peak_memory: PeakMemory,
+    wrangler: Wrangler,
+    synthetic_vacancies_csv: Path,
+    synthetic_vacancies_parquet: Path,
+    corpus_size: int,
+    source: str,
+) -> None:
+    path = synthetic_vacancies_csv if source == "csv" else synthetic_vacancies_parquet
+
+    peak_memory(wrangler.extract_text_from_vacancies, path)
+    benchmark.pedantic(wrangler.extract_text_from_vacancies, args=(path,), rounds=rounds(corpus_size))
+    assert sum(1 for _ in wrangler.iter_vacancies(path)) == corpus_size
@@ -2,10 +2,35 @@ import csv
 from pathlib import Path
 
 import pytest
+from scrapy.http import HtmlResponse, Request
 
 from database import TEST_DATABASE_NAME, CollectionVacancies, MongoClient, VacancyItem
 
 CATEGORY = "Python"
+# Djinni listing pages, named `<category>-<page number>.html`, with the items expected to be parsed from them.
+# The pages are synthetic so far, real ones saved with `scrapy fetch --nolog <URL> > <name>.html` belong here too.
+LISTING_PAGES_DIR = Path(__file__).parent / "techtrendscrape" / "pages"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--corpus-sizes",
+        default="1000",
+        help="Comma-separated numbers of synthetic vacancies the corpus benchmarks run with, e.g. 1000,10000,100000.",
+    )
+    group.addoption(
+        "--memory-baseline",
+        type=Path,
+        default=None,
+        help="A run saved with --benchmark-save or --benchmark-autosave to compare the peak memory with.",
+    )
+    group.addoption(
+        "--memory-tolerance",
+        type=float,
+        default=0.1,
+        help="Fail benchmarks whose peak memory exceeds the baseline by more than this fraction.",
+    )
 
 
 @pytest.fixture(autouse=True, scope="session")
@@ -29,3 +54,15 @@ def vacancy_items(test_vacancies: Path) -> list[VacancyItem]:
 def _upsert_vacancies_to_collection(vacancy_items: list[VacancyItem]) -> None:
     with CollectionVacancies() as collection_vacancies:
         collection_vacancies.bulk_upsert(("url",), items=vacancy_items)
+
+
+@pytest.fixture(scope="session")
+def listing_responses() -> dict[str, HtmlResponse]:
+    responses = {}
+    for path in sorted(LISTING_PAGES_DIR.glob("*.html")):
+        category, page_number = path.stem.split("-")
+        url = f"https://djinni.co/jobs/?primary_keyword={category.title()}"
+        if page_number != "1":
+            url += f"&page={page_number}"
+        responses[path.name] = HtmlResponse(url, body=path.read_bytes(), request=Request(url))
+    return responses
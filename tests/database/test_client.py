@@ -1,7 +1,19 @@
+from datetime import datetime
+from typing import Any
+
+import pytest
 from faker import Faker
 from pymongo import ASCENDING
 
-from database import MongoClient, VacancyItem
+from database import (
+    CONTENT_HASH_FIELD,
+    CollectionStatistics,
+    CollectionVacancies,
+    MongoClient,
+    UpsertSummary,
+    VacancyItem,
+    close_clients,
+)
 
 
 class TestMongoClient:
@@ -22,3 +34,52 @@ class TestMongoClient:
                 update_one_kwargs={"sort": {"url": ASCENDING}},
             )
             assert client.collection.count_documents({}) > 1
+            stored_vacancy = client.collection.find_one()
+            assert stored_vacancy
+            assert isinstance(stored_vacancy["publication_date"], datetime)
+
+    def test_bulk_upsert_changes(
+        self, vacancy_items: list[VacancyItem], faker: Faker, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(MongoClient, "collection_name", faker.pystr())
+        monkeypatch.setattr(MongoClient, "indexes", [("url", ASCENDING)])
+        with MongoClient() as client:
+            # A document stored by `bulk_upsert`, without a content hash.
+            client.bulk_upsert(("url",), items=vacancy_items[:1])
+
+            summary = client.bulk_upsert_changes(("url",), items=vacancy_items, chunk_size=2)
+            assert summary == UpsertSummary(inserted=len(vacancy_items) - 1, updated=1, skipped=0)
+            assert client.collection.count_documents({CONTENT_HASH_FIELD: {"$exists": True}}) == len(vacancy_items)
+
+            changed_item = vacancy_items[-1].model_copy(update={"views": vacancy_items[-1].views + 1})
+            summary = client.bulk_upsert_changes(("url",), items=[*vacancy_items[:-1], changed_item])
+            assert summary == UpsertSummary(inserted=0, updated=1, skipped=len(vacancy_items) - 1)
+            stored_vacancy = client.collection.find_one({"url": str(changed_item.url)})
+            assert stored_vacancy
+            assert stored_vacancy["views"] == changed_item.views
+            assert isinstance(stored_vacancy["publication_date"], datetime)
+
+            # Of the duplicates within a chunk, the last one is upserted and the others are skipped.
+            duplicate_items = [changed_item.model_copy(update={"views": views}) for views in (1, 2, 3)]
+            summary = client.bulk_upsert_changes(("url",), items=duplicate_items)
+            assert summary == UpsertSummary(inserted=0, updated=1, skipped=2)
+            stored_vacancy = client.collection.find_one({"url": str(changed_item.url)})
+            assert stored_vacancy
+            assert stored_vacancy["views"] == 3
+
+    def test_shared_client(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        with CollectionVacancies() as collection_vacancies, CollectionStatistics() as collection_statistics:
+            assert collection_vacancies.client is collection_statistics.client
+
+        def create_index(*_: Any, **__: Any) -> None:
+            pytest.fail("Indexes are created once per process")
+
+        monkeypatch.setattr(type(collection_vacancies.collection), "create_index", create_index)
+        with CollectionVacancies() as collection_vacancies_again:
+            assert collection_vacancies_again.client is collection_vacancies.client
+            assert collection_vacancies_again.collection.estimated_document_count() >= 0
+        monkeypatch.undo()
+
+        close_clients()
+        with CollectionVacancies() as reopened_collection_vacancies:
+            assert reopened_collection_vacancies.client is not collection_vacancies.client
@@ -1,9 +1,16 @@
+from collections.abc import Iterator
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 import pytest
+from faker import Faker
 
-from database import CollectionVacancies
+from database import (
+    CollectionDailyTechnologyCounts,
+    CollectionVacancies,
+    DailyTechnologyCounts,
+    sum_daily_counts,
+)
 from tests.conftest import CATEGORY
 
 
@@ -18,3 +25,43 @@ class TestCollectionVacancies:
                 start_from_publication_date=end_date_of_publication - timedelta(days=30),
                 end_date_of_publication=end_date_of_publication,
             )
+
+    @pytest.mark.usefixtures("_upsert_vacancies_to_collection")
+    def test_iter_vacancies(self) -> None:
+        tzinfo = ZoneInfo("Europe/Kyiv")
+        end_date_of_publication = datetime(2025, 6, 13, tzinfo=tzinfo)
+        with CollectionVacancies() as collection_vacancies:
+            vacancies = collection_vacancies.iter_vacancies(
+                CATEGORY,
+                start_from_publication_date=end_date_of_publication - timedelta(days=30),
+                end_date_of_publication=end_date_of_publication,
+                batch_size=2,
+            )
+            assert isinstance(vacancies, Iterator)
+            descriptions = [vacancy.keys() for vacancy in vacancies]
+            assert descriptions
+            assert all(keys == {"description"} for keys in descriptions)
+
+
+class TestCollectionDailyTechnologyCounts:
+    def test_fetch_technology_frequency(self, faker: Faker) -> None:
+        category = faker.pystr()
+        first_day = datetime(2025, 6, 1)
+        daily_counts = [
+            DailyTechnologyCounts(
+                category=category,
+                day=first_day + timedelta(days=day),
+                vacancies=2,
+                counts=[("python", 3 + day, "Python"), ("aws", 2, "aws" if day else "AWS"), (f"tool{day}", 1, "Tool")],
+            )
+            for day in range(3)
+        ]
+        with CollectionDailyTechnologyCounts() as collection_daily_counts:
+            collection_daily_counts.bulk_upsert(("category", "day"), items=daily_counts)
+            last_day = first_day + timedelta(days=1)
+            technology_frequency = collection_daily_counts.fetch_technology_frequency(
+                category, first_day, last_day, limit=2
+            )
+            assert technology_frequency == {"Python": 7, "aws": 4}
+            assert technology_frequency == sum_daily_counts(daily_counts[:2], limit=2)
+            assert list(collection_daily_counts.iter_daily_counts(category, first_day, last_day)) == daily_counts[:2]
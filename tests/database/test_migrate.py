@@ -0,0 +1,21 @@
+from datetime import UTC, datetime
+
+import pytest
+from faker import Faker
+
+from database import CollectionVacancies
+
+
+def test_migrate_datetime_fields(faker: Faker, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(CollectionVacancies, "collection_name", faker.pystr())
+    publication_date = datetime(2025, 6, 12, 10, 30, tzinfo=UTC)
+    with CollectionVacancies() as collection_vacancies:
+        collection_vacancies.collection.insert_one(
+            {"url": faker.url(), "publication_date": publication_date.isoformat()}
+        )
+
+        assert collection_vacancies.migrate_datetime_fields() == {"publication_date": 1}
+        stored_vacancy = collection_vacancies.collection.find_one()
+        assert stored_vacancy
+        assert stored_vacancy["publication_date"] == publication_date.replace(tzinfo=None)
+        assert collection_vacancies.migrate_datetime_fields() == {"publication_date": 0}
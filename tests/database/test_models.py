@@ -0,0 +1,31 @@
+from dataclasses import replace
+
+from database import ScrapedVacancy, VacancyItem, validate_vacancies
+
+
+def scraped_vacancy(item: VacancyItem) -> ScrapedVacancy:
+    return ScrapedVacancy(**item.model_dump(exclude={"url"}), url=str(item.url))
+
+
+def test_validate_vacancies(vacancy_items: list[VacancyItem]) -> None:
+    vacancies, invalid_items = validate_vacancies([scraped_vacancy(item) for item in vacancy_items])
+
+    assert vacancies == vacancy_items
+    assert not invalid_items
+
+
+def test_validate_vacancies_reports_invalid_items(vacancy_items: list[VacancyItem]) -> None:
+    invalid_item = replace(scraped_vacancy(vacancy_items[0]), url="not a URL", views=-1)
+    items = [vacancy_items[1], invalid_item, scraped_vacancy(vacancy_items[2])]
+
+    vacancies, invalid_items = validate_vacancies(items)
+
+    assert vacancies == [vacancy_items[1], vacancy_items[2]]
+    # Validated items are kept as they are.
+    assert vacancies[0] is vacancy_items[1]
+    [(item, errors)] = invalid_items
+    assert item is invalid_item
+    assert sorted((error["loc"], error["type"]) for error in errors) == [
+        (("url",), "url_parsing"),
+        (("views",), "greater_than_equal"),
+    ]
@@ -0,0 +1,82 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from database import ParquetVacancies, VacancyItem
+from tests.conftest import CATEGORY
+
+CRAWLING_DATETIME = datetime(2025, 6, 13, tzinfo=UTC)
+
+
+def test_write_partitions_by_category_and_month(vacancy_items: list[VacancyItem], tmp_path: Path) -> None:
+    with ParquetVacancies(tmp_path, row_group_size=2) as parquet_vacancies:
+        parquet_vacancies.write(vacancy_items)
+        parquet_vacancies.write([vacancy_items[0].model_copy(update={"category": "C++ / C#"})])
+
+    assert {path.parent.relative_to(tmp_path).as_posix() for path in parquet_vacancies.paths} == {
+        f"category={CATEGORY}/month=2025-06",
+        "category=C%2B%2B%20%2F%20C%23/month=2025-06",
+    }
+    assert parquet_vacancies.fetch_categories() == ["C++ / C#", CATEGORY]
+
+
+def test_iter_vacancies(vacancy_items: list[VacancyItem], tmp_path: Path) -> None:
+    with ParquetVacancies(tmp_path) as parquet_vacancies:
+        parquet_vacancies.write(vacancy_items)
+    start = CRAWLING_DATETIME - timedelta(days=30)
+
+    vacancies = list(parquet_vacancies.iter_vacancies(CATEGORY, start, CRAWLING_DATETIME))
+    assert vacancies == [{"url": str(item.url), "description": item.description} for item in vacancy_items]
+    assert not list(parquet_vacancies.iter_vacancies("Java", start, CRAWLING_DATETIME))
+    assert not list(parquet_vacancies.iter_vacancies(CATEGORY, start - timedelta(days=365), start))
+    assert not list(ParquetVacancies(tmp_path / "missing").iter_vacancies(CATEGORY, start, CRAWLING_DATETIME))
+
+
+def test_iter_vacancies_of_the_latest_run(vacancy_items: list[VacancyItem], tmp_path: Path) -> None:
+    with ParquetVacancies(tmp_path) as parquet_vacancies:
+        parquet_vacancies.write(vacancy_items)
+    updated_item = vacancy_items[0].model_copy(update={"description": "Updated"})
+    with ParquetVacancies(tmp_path) as latest_parquet_vacancies:
+        latest_parquet_vacancies.write([updated_item])
+    assert latest_parquet_vacancies.run_name > parquet_vacancies.run_name
+
+    vacancies = list(
+        ParquetVacancies(tmp_path).iter_vacancies(
+            [CATEGORY], CRAWLING_DATETIME - timedelta(days=30), CRAWLING_DATETIME, columns=("url", "description")
+        )
+    )
+    assert len(vacancies) == len(vacancy_items)
+    assert {"url": str(updated_item.url), "description": "Updated"} in vacancies
+
+
+def test_iter_vacancies_of_the_latest_row(vacancy_items: list[VacancyItem], tmp_path: Path) -> None:
+    updated_item = vacancy_items[0].model_copy(update={"description": "Updated"})
+    with ParquetVacancies(tmp_path, row_group_size=2) as parquet_vacancies:
+        parquet_vacancies.write([*vacancy_items, updated_item])
+
+    vacancies = list(
+        parquet_vacancies.iter_vacancies(CATEGORY, CRAWLING_DATETIME - timedelta(days=30), CRAWLING_DATETIME)
+    )
+    assert len(vacancies) == len(vacancy_items)
+    assert {"url": str(updated_item.url), "description": "Updated"} in vacancies
+
+
+def test_iter_vacancies_moved_out_of_the_range(vacancy_items: list[VacancyItem], tmp_path: Path) -> None:
+    with ParquetVacancies(tmp_path) as parquet_vacancies:
+        parquet_vacancies.write(vacancy_items)
+    moved_item = vacancy_items[0].model_copy(update={"publication_date": CRAWLING_DATETIME + timedelta(days=30)})
+    with ParquetVacancies(tmp_path) as latest_parquet_vacancies:
+        latest_parquet_vacancies.write([moved_item])
+
+    start = CRAWLING_DATETIME - timedelta(days=30)
+    vacancies = list(ParquetVacancies(tmp_path).iter_vacancies(CATEGORY, start, CRAWLING_DATETIME, columns=("url",)))
+    assert vacancies == [{"url": str(item.url)} for item in vacancy_items[1:]]
+    vacancies = list(
+        ParquetVacancies(tmp_path).iter_vacancies(
+            CATEGORY, start, moved_item.publication_date, columns=("category", "url", "publication_date")
+        )
+    )
+    assert vacancies[-1] == {
+        "category": CATEGORY,
+        "url": str(moved_item.url),
+        "publication_date": moved_item.publication_date,
+    }
@@ -0,0 +1,39 @@
+import pickle
+from datetime import timedelta
+from pathlib import Path
+
+from faker import Faker
+
+from techtrendanalysis.cache import SQLiteTokenCountCache
+
+
+class TestSQLiteTokenCountCache:
+    def test_get_many_and_set_many(self, tmp_path: Path, faker: Faker) -> None:
+        cache = SQLiteTokenCountCache(tmp_path / "token_counts.sqlite3")
+        url, digest = faker.url(), faker.sha256()
+        assert cache.get_many([url]) == {}
+
+        cache.set_many([(url, digest, {"python": (2, "Python"), "api": (1, "API")})])
+        assert cache.get_many([url, faker.url()]) == {url: (digest, {"python": (2, "Python"), "api": (1, "API")})}
+
+        cache.set_many([(url, digest, {})])
+        assert cache.get_many([url]) == {url: (digest, {})}
+
+    def test_pickle(self, tmp_path: Path, faker: Faker) -> None:
+        cache = SQLiteTokenCountCache(tmp_path / "token_counts.sqlite3")
+        url, digest = faker.url(), faker.sha256()
+        cache.set_many([(url, digest, {"python": (1, "Python")})])
+
+        unpickled_cache = pickle.loads(pickle.dumps(cache))  # noqa: S301
+        assert unpickled_cache.get_many([url]) == {url: (digest, {"python": (1, "Python")})}
+
+    def test_prune(self, tmp_path: Path, faker: Faker) -> None:
+        cache = SQLiteTokenCountCache(tmp_path / "token_counts.sqlite3")
+        used_url, unused_url, digest = faker.url(), faker.url(), faker.sha256()
+        cache.set_many([(used_url, digest, {}), (unused_url, digest, {})])
+        with cache.connection:
+            cache.connection.execute("UPDATE token_counts SET accessed_at = accessed_at - 3600")
+        cache.get_many([used_url])
+
+        assert cache.prune(timedelta(minutes=30)) == 1
+        assert cache.get_many([used_url, unused_url]) == {used_url: (digest, {})}
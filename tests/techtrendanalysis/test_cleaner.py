@@ -0,0 +1,16 @@
+from techtrendanalysis.cleaner import TextCleaner, get_text_cleaner
+
+
+class TestTextCleaner:
+    def test_clean(self) -> None:
+        cleaner = TextCleaner()
+        assert cleaner.clean("• Досвід з <b>Python</b>;<br>- Django, FastAPI\n ") == "Python Django FastAPI"
+
+    def test_clean_with_extra_filters(self) -> None:
+        cleaner = TextCleaner({"(remote)", "C++ developer", ""})
+        assert cleaner.clean("C++ DEVELOPER (Remote) with C++ and Go") == "with C and Go"
+
+    def test_clean_many(self) -> None:
+        cleaner = get_text_cleaner()
+        assert cleaner is get_text_cleaner()
+        assert list(cleaner.clean_many(["<b>Python</b>", "Rust!"])) == ["Python", "Rust"]
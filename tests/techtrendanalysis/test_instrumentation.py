@@ -0,0 +1,58 @@
+import json
+import pickle
+from pathlib import Path
+from time import sleep
+
+from techtrendanalysis.instrumentation import Instrumentation
+
+
+def test_nested_stages_are_timed_exclusively() -> None:
+    instrumentation = Instrumentation()
+    with instrumentation.stage("outer"):
+        sleep(0.01)
+        with instrumentation.stage("inner") as metrics:
+            sleep(0.05)
+            metrics.counts["items"] += 2
+
+    outer, inner = instrumentation.stages["outer"], instrumentation.stages["inner"]
+    assert 0.01 <= outer.wall_time < inner.wall_time
+    assert (outer.calls, inner.calls) == (1, 1)
+    assert inner.counts == {"items": 2}
+    assert inner.peak_rss > 0
+
+
+def test_iter_stage_splits_a_stream_between_its_stages() -> None:
+    instrumentation = Instrumentation()
+
+    def read() -> list[int]:
+        sleep(0.01)
+        return [1]
+
+    numbers = instrumentation.iter_stage("read", (number for _ in range(3) for number in read()), unit="numbers")
+    squares = instrumentation.iter_stage("square", (number**2 for number in numbers), unit="squares")
+    assert list(squares) == [1, 1, 1]
+
+    read_metrics, square_metrics = instrumentation.stages["read"], instrumentation.stages["square"]
+    assert read_metrics.counts == {"numbers": 3}
+    assert square_metrics.counts == {"squares": 3}
+    assert read_metrics.wall_time >= 0.03 > square_metrics.wall_time
+
+
+def test_merge_and_write_reports(tmp_path: Path) -> None:
+    instrumentation = Instrumentation()
+    worker_instrumentation = pickle.loads(pickle.dumps(instrumentation))
+    for stage_instrumentation in (instrumentation, worker_instrumentation):
+        with stage_instrumentation.stage("count") as metrics:
+            metrics.counts["tokens"] += 10
+    instrumentation.merge(worker_instrumentation)
+
+    instrumentation.write_reports(tmp_path / "report.json", tmp_path / "metrics.prom", prefix="test", job="unit")
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["job"] == "unit"
+    assert report["stages"]["count"]["calls"] == 2
+    assert report["stages"]["count"]["counts"] == {"tokens": 20}
+    textfile = (tmp_path / "metrics.prom").read_text()
+    assert '# TYPE test_stage_wall_seconds gauge\ntest_stage_wall_seconds{job="unit",stage="count"} ' in textfile
+    assert 'test_stage_processed{job="unit",stage="count",unit="tokens"} 20\n' in textfile
+    # The textfile collector runs as another user.
+    assert (tmp_path / "metrics.prom").stat().st_mode & 0o777 == 0o644
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+from spacy.attrs import LOWER, ORTH
+
+from techtrendanalysis.cleaner import get_text_cleaner
+from techtrendanalysis.matcher import TECHNOLOGIES_PATH, TechnologyMatcher
+from techtrendanalysis.nlp import load_nlp
+
+
+class TestTechnologyMatcher:
+    @pytest.fixture
+    def matcher(self, tmp_path: Path) -> TechnologyMatcher:
+        return TechnologyMatcher.load(cache_dir=tmp_path)
+
+    def find(self, matcher: TechnologyMatcher, text: str) -> list[str]:
+        doc = load_nlp(tokenizer_only=True)(get_text_cleaner().clean(text))
+        tokens = doc.to_array([LOWER, ORTH])
+        return [matcher.technologies[index] for index, _ in matcher.find(tokens[:, 0], tokens[:, 1], doc.vocab.strings)]
+
+    def test_find(self, matcher: TechnologyMatcher) -> None:
+        assert self.find(
+            matcher, "Amazon Neptune or Neptune, RESTful API, GitHub Actions, C# / .NET, docker-compose and Node.js"
+        ) == [
+            "Amazon Neptune",
+            "Amazon Neptune",
+            "RESTful API",
+            "GitHub Actions",
+            "C#/.NET",
+            "Docker Compose",
+            "Node.js",
+        ]
+
+    def test_find_common_words(self, matcher: TechnologyMatcher) -> None:
+        assert self.find(matcher, "Solid knowledge of Go, go to React, react and REST APIs, rest") == [
+            "Go",
+            "React",
+            "REST API",
+        ]
+        assert self.find(matcher, "SOLID principles, k8s and pandas") == ["SOLID", "Kubernetes", "pandas"]
+
+    def test_load(self, matcher: TechnologyMatcher, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        assert len(list(tmp_path.glob("*.pickle"))) == 1
+
+        def build(*_: object) -> None:
+            pytest.fail("The cached matcher must be loaded")
+
+        monkeypatch.setattr(TechnologyMatcher, "build", build)
+        cached_matcher = TechnologyMatcher.load(TECHNOLOGIES_PATH, cache_dir=tmp_path)
+        assert cached_matcher.technologies == matcher.technologies
+        assert cached_matcher.digest == matcher.digest
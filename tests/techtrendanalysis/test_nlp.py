@@ -0,0 +1,31 @@
+import pickle
+
+import spacy
+
+from techtrendanalysis.nlp import UNUSED_COMPONENTS, get_proper_noun_flag, load_nlp
+
+
+def test_load_nlp() -> None:
+    nlp = load_nlp()
+    assert nlp is load_nlp(), "The model must be loaded once per process."
+    assert not set(nlp.pipe_names).intersection(UNUSED_COMPONENTS)
+
+    tokenizer = load_nlp(tokenizer_only=True)
+    assert tokenizer is load_nlp(tokenizer_only=True)
+    assert not tokenizer.pipe_names
+    assert [token.text for token in tokenizer("RESTful API on C# / .NET")] == [
+        token.text for token in nlp("RESTful API on C# / .NET")
+    ]
+
+
+def test_get_proper_noun_flag() -> None:
+    vocab = spacy.blank("en").vocab
+    stopwords = frozenset(("the",))
+    flag = get_proper_noun_flag(vocab, stopwords)
+    assert get_proper_noun_flag(vocab, frozenset(("the",))) == flag
+    assert get_proper_noun_flag(vocab, frozenset()) != flag
+
+    # The flag getter is pickled along with the vocab for the worker processes.
+    unpickled_vocab = pickle.loads(pickle.dumps(vocab))  # noqa: S301
+    assert get_proper_noun_flag(unpickled_vocab, stopwords) == flag
+    assert [unpickled_vocab[word].check_flag(flag) for word in ("Python", "The", "python")] == [True, False, False]
@@ -1,3 +1,4 @@
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
@@ -5,8 +6,17 @@ from zoneinfo import ZoneInfo
 import pytest
 from faker import Faker
 
-from database import CollectionStatistics, Statistics, VacancyItem
-from techtrendanalysis.wrangler import Wrangler
+from database import CollectionStatistics, ParquetVacancies, Statistics, VacancyItem, sum_daily_counts
+from techtrendanalysis.cache import SQLiteTokenCountCache
+from techtrendanalysis.matcher import TECHNOLOGIES_PATH
+from techtrendanalysis.nlp import load_nlp
+from techtrendanalysis.wrangler import (
+    Wrangler,
+    calculate_statistics_and_daily_counts_by_category,
+    calculate_statistics_by_category,
+    fetch_statistics_from_daily_counts,
+    save_daily_counts,
+)
 from tests.conftest import CATEGORY
 
 
@@ -24,7 +34,7 @@ class TestWrangler:
     def test__clean_text(self, wrangler: Wrangler) -> None:
         wrangler._text = (
             "• Від 5 років досвіду <b>бекенд-розробки на Python</b>; "
-            "<br>• Професійний досвід у розробці та реалізації RESTful API; "  # noqa: RUF001
+            "<br>• Професійний досвід у розробці та реалізації RESTful API; "
             "- Знання реляційних баз даних (MySQL, PostgreSQL);\n "
             "Solid knowledge of relational databases (MySQL, PostgreSQL, SP-API); "
             "Proficiency in graph databases (especially Amazon Neptune); "
@@ -39,10 +49,21 @@ class TestWrangler:
         )
         assert wrangler._text == cleaned_text, f"{wrangler._text=}"
 
+    def test__count_proper_nouns(self, wrangler: Wrangler) -> None:
+        nlp = load_nlp(tokenizer_only=True)
+        docs = list(nlp.pipe(["Zoom and Python with django", "zoom Django API python Python Python"]))
+        proper_nouns: Counter[str] = Counter()
+        lower_to_upper: dict[str, str] = {}
+        wrangler._count_proper_nouns(docs, proper_nouns, lower_to_upper)
+        assert proper_nouns == {"zoom": 1, "python": 3, "django": 1, "api": 1}
+        assert list(proper_nouns) == ["zoom", "python", "django", "api"], "Words must keep the order of occurrence."
+        assert lower_to_upper == {"zoom": "Zoom", "python": "Python", "django": "Django", "api": "API"}
+
     @pytest.mark.usefixtures("_upsert_vacancies_to_collection")
     def test_extract_text_from_vacancies(self, wrangler: Wrangler, test_vacancies: Path) -> None:
         wrangler.extract_text_from_vacancies(path_to_csv=test_vacancies)
         assert wrangler._text
+        assert list(wrangler.iter_descriptions(path_to_csv=test_vacancies))
 
         wrangler._text = ""
         wrangler.extract_text_from_vacancies()
@@ -65,6 +86,146 @@ class TestWrangler:
         }
         assert statistics.technology_frequency == expected_technology_frequency
 
+    def test_calculate_frequency_distribution_from_descriptions(
+        self, wrangler: Wrangler, vacancy_items: list[VacancyItem]
+    ) -> None:
+        descriptions = [vacancy.description for vacancy in vacancy_items]
+        wrangler._text = " ".join(descriptions)
+        expected_statistics = wrangler.calculate_frequency_distribution(limit_results=10)
+
+        statistics = wrangler.calculate_frequency_distribution(
+            limit_results=10, descriptions=iter(descriptions), batch_size=2
+        )
+        assert statistics.technology_frequency == expected_statistics.technology_frequency
+
+    def test_calculate_frequency_distribution_with_token_count_cache(
+        self,
+        wrangler: Wrangler,
+        vacancy_items: list[VacancyItem],
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        vacancies = [(str(vacancy.url), vacancy.description) for vacancy in vacancy_items]
+        expected_statistics = wrangler.calculate_frequency_distribution(limit_results=10, vacancies=vacancies)
+
+        wrangler._token_count_cache = SQLiteTokenCountCache(tmp_path / "token_counts.sqlite3")
+        statistics = wrangler.calculate_frequency_distribution(limit_results=10, vacancies=vacancies)
+        assert statistics.technology_frequency == expected_statistics.technology_frequency
+
+        # All the vacancies are cached now and mustn't be processed by spaCy again.
+        monkeypatch.setattr(wrangler, "_count_proper_nouns", None)
+        statistics = wrangler.calculate_frequency_distribution(limit_results=10, vacancies=vacancies)
+        assert statistics.technology_frequency == expected_statistics.technology_frequency
+
+    def test_config_digest_depends_on_the_model(self, wrangler: Wrangler, monkeypatch: pytest.MonkeyPatch) -> None:
+        config_digest = wrangler._config_digest
+        monkeypatch.setitem(wrangler._load_nlp().meta, "version", "0.0.0-upgraded")
+        del wrangler._config_digest
+
+        assert wrangler._config_digest != config_digest
+
+    def test_calculate_frequency_distribution_with_technology_dictionary(
+        self, vacancy_items: list[VacancyItem], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("techtrendanalysis.matcher.CACHE_DIR", tmp_path)
+        wrangler = Wrangler(CATEGORY, technology_dictionary=TECHNOLOGIES_PATH)
+        statistics = wrangler.calculate_frequency_distribution(
+            limit_results=5, descriptions=[vacancy.description for vacancy in vacancy_items]
+        )
+        assert statistics.technology_frequency == {
+            "Python": 8,
+            "Amazon Neptune": 4,
+            "PostgreSQL": 4,
+            "DevOps": 4,
+            "RESTful API": 3,
+        }
+
+    @pytest.mark.usefixtures("_upsert_vacancies_to_collection")
+    def test_calculate_statistics_by_category(self, wrangler: Wrangler) -> None:
+        statistics = calculate_statistics_by_category(
+            [CATEGORY, "Unknown category"],
+            wrangler.start_from_publication_date,
+            wrangler.end_date_of_publication,
+            max_workers=2,
+        )
+        assert [category_statistics.category for category_statistics in statistics] == [CATEGORY]
+        assert statistics[0].technology_frequency
+
+    def test_iter_vacancies_from_parquet_dataset(
+        self, wrangler: Wrangler, test_vacancies: Path, vacancy_items: list[VacancyItem], tmp_path: Path
+    ) -> None:
+        with ParquetVacancies(tmp_path) as parquet_vacancies:
+            parquet_vacancies.write(vacancy_items)
+        assert list(wrangler.iter_vacancies(tmp_path)) == list(wrangler.iter_vacancies(test_vacancies))
+
+        statistics = calculate_statistics_by_category(
+            None, wrangler.start_from_publication_date, wrangler.end_date_of_publication, parquet_dataset=tmp_path
+        )
+        assert [category_statistics.category for category_statistics in statistics] == [CATEGORY]
+
+        statistics_with_daily_counts, daily_counts = calculate_statistics_and_daily_counts_by_category(
+            None, wrangler.start_from_publication_date, wrangler.end_date_of_publication, parquet_dataset=tmp_path
+        )
+        assert statistics_with_daily_counts[0].technology_frequency == statistics[0].technology_frequency
+        assert [(day_counts.category, day_counts.vacancies) for day_counts in daily_counts] == [
+            (CATEGORY, len(vacancy_items))
+        ]
+
+    def test_instrumentation(self, wrangler: Wrangler, test_vacancies: Path, vacancy_items: list[VacancyItem]) -> None:
+        wrangler.calculate_frequency_distribution(vacancies=wrangler.iter_vacancies(test_vacancies))
+        stages = wrangler.instrumentation.stages
+        assert stages.keys() >= {"load", "extract", "clean", "nlp", "count"}
+        assert stages["extract"].counts == {"vacancies": len(vacancy_items)}
+        assert stages["nlp"].counts == {"docs": len(vacancy_items)}
+        assert stages["count"].counts["tokens"] > 0
+
+    def test_calculate_daily_counts(self, wrangler: Wrangler, test_vacancies: Path) -> None:
+        vacancies = list(wrangler.iter_dated_vacancies(test_vacancies, whole_days=True))
+        daily_counts = wrangler.calculate_daily_counts(vacancies, batch_size=2)
+        assert [(day_counts.day, day_counts.vacancies) for day_counts in daily_counts] == [
+            (datetime(2025, 6, 12), len(vacancies))
+        ]
+
+        statistics = wrangler.calculate_frequency_distribution(
+            limit_results=1000, vacancies=[(url, description) for url, _, description in vacancies]
+        )
+        assert sum_daily_counts(daily_counts, limit=1000) == statistics.technology_frequency
+
+        save_daily_counts(daily_counts)
+        (statistics_from_daily_counts,) = fetch_statistics_from_daily_counts(
+            [CATEGORY], wrangler.start_from_publication_date, wrangler.end_date_of_publication, limit_results=10
+        )
+        assert statistics_from_daily_counts.technology_frequency == sum_daily_counts(daily_counts, limit=10)
+        tzinfo = ZoneInfo("Europe/Kyiv")
+        assert statistics_from_daily_counts.from_datetime == datetime(2025, 5, 14, tzinfo=tzinfo)
+        assert statistics_from_daily_counts.to_datetime == datetime(2025, 6, 14, tzinfo=tzinfo) - timedelta(
+            microseconds=1
+        )
+
+    def test_calculate_statistics_and_daily_counts(
+        self, test_vacancies: Path, vacancy_items: list[VacancyItem]
+    ) -> None:
+        end_date_of_publication = datetime(2025, 6, 12, 17, tzinfo=ZoneInfo("Europe/Kyiv"))
+        wrangler = Wrangler(CATEGORY, end_date_of_publication - timedelta(days=1), end_date_of_publication)
+        statistics, daily_counts = wrangler.calculate_statistics_and_daily_counts(
+            wrangler.iter_dated_vacancies(test_vacancies, whole_days=True), limit_results=1000
+        )
+        assert wrangler.instrumentation.stages["nlp"].counts == {"docs": len(vacancy_items)}, (
+            "Vacancies are analyzed once."
+        )
+        assert [(day_counts.day, day_counts.vacancies) for day_counts in daily_counts] == [
+            (datetime(2025, 6, 12), len(vacancy_items))
+        ]
+
+        # The last vacancy is published later than the end of the statistics, yet on the same day.
+        vacancies_within_range = list(wrangler.iter_vacancies(test_vacancies))
+        assert len(vacancies_within_range) == len(vacancy_items) - 1
+        expected_statistics = Wrangler(
+            CATEGORY, wrangler.start_from_publication_date, end_date_of_publication
+        ).calculate_frequency_distribution(limit_results=1000, vacancies=vacancies_within_range)
+        assert statistics.technology_frequency == expected_statistics.technology_frequency
+        assert statistics.technology_frequency != sum_daily_counts(daily_counts, limit=1000)
+
     def test_save_statistics(self, wrangler: Wrangler, faker: Faker, tmp_path: Path) -> None:
         statistics = Statistics(
             category=faker.pystr(),
@@ -0,0 +1,119 @@
+import asyncio
+import random
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from twisted.internet import defer
+
+from techtrendscrape.daemon import Daemon, count_changed_items
+
+CHANGED_ITEMS = {"Python": 2, "Java": 0}
+
+
+class FakeRunner:
+    """Crawls a category by setting the pipeline stats of its crawler."""
+
+    def __init__(self) -> None:
+        self.crawled: list[str] = []
+        self.stopped = False
+
+    def create_crawler(self, _: Any) -> SimpleNamespace:
+        stats: dict[str, int] = {}
+        return SimpleNamespace(stats=SimpleNamespace(get_stats=lambda: stats, stats=stats))
+
+    def crawl(self, crawler: SimpleNamespace, *, categories: str) -> defer.Deferred[None]:
+        self.crawled.append(categories)
+        crawler.stats.stats["pipelines/MongoPipeline/items_inserted"] = CHANGED_ITEMS[categories]
+        return defer.succeed(None)
+
+    def stop(self) -> defer.Deferred[None]:
+        self.stopped = True
+        return defer.succeed(None)
+
+
+def test_count_changed_items() -> None:
+    stats = {
+        "pipelines/MongoPipeline/items_written": 8,
+        "pipelines/MongoPipeline/items_inserted": 2,
+        "pipelines/MongoPipeline/items_updated": 1,
+        "pipelines/MongoPipeline/items_skipped": 5,
+        "pipelines/CSVPipeline/items_written": 3,
+        "item_scraped_count": 8,
+    }
+    assert count_changed_items(stats) == 6
+    unchanged_stats = {"pipelines/MongoPipeline/items_written": 4, "pipelines/MongoPipeline/items_skipped": 4}
+    assert count_changed_items(unchanged_stats) == 0
+    assert count_changed_items({}) == 0
+
+
+def test_next_delay() -> None:
+    daemon = Daemon(
+        FakeRunner(),  # type: ignore[reportArgumentType]
+        ["Python", "Java"],
+        lambda _: None,
+        interval=100,
+        intervals={"Java": 1000},
+        jitter=0.1,
+        rng=random.Random(0),
+    )
+    for _ in range(100):
+        assert 0 <= daemon.next_delay("Python", first=True) <= 10
+        assert 90 <= daemon.next_delay("Python") <= 110
+        assert 900 <= daemon.next_delay("Java") <= 1100
+
+
+@pytest.mark.parametrize("kwargs", [{"jitter": 1.0}, {"max_parallel_crawls": 0}])
+def test_invalid_options(kwargs: dict[str, Any]) -> None:
+    with pytest.raises(ValueError, match=next(iter(kwargs))):
+        Daemon(FakeRunner(), ["Python"], lambda _: None, interval=100, **kwargs)  # type: ignore[reportArgumentType]
+
+
+def test_wrangle_changed_categories() -> None:
+    runner = FakeRunner()
+    wrangled: list[str] = []
+    warmed_up: list[bool] = []
+    daemon = Daemon(
+        runner,  # type: ignore[reportArgumentType]
+        ["Python", "Java"],
+        wrangled.append,
+        interval=3600,
+        warm_up=lambda: warmed_up.append(True),
+    )
+
+    async def run() -> None:
+        running = asyncio.create_task(daemon.run())
+        async with asyncio.timeout(5):
+            while len(runner.crawled) < 2 or not wrangled:
+                await asyncio.sleep(0.01)
+        await daemon.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+
+    asyncio.run(run())
+
+    assert warmed_up == [True]
+    assert sorted(runner.crawled) == ["Java", "Python"]
+    assert wrangled == ["Python"]
+    assert runner.stopped
+
+
+def test_request_wrangle_once() -> None:
+    wrangled: list[str] = []
+    # Nothing changes on the crawl of Java.
+    daemon = Daemon(FakeRunner(), ["Java"], wrangled.append, interval=3600)  # type: ignore[reportArgumentType]
+
+    async def run() -> None:
+        daemon.request_wrangle("Python")
+        daemon.request_wrangle("Python")
+        daemon.request_wrangle("Java")
+        async with asyncio.timeout(5):
+            running = asyncio.create_task(daemon.run())
+            while len(wrangled) < 2:
+                await asyncio.sleep(0.01)
+        await daemon.stop()
+        await asyncio.gather(running, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert wrangled == ["Python", "Java"]
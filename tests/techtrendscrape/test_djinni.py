@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import lxml.html
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.test import get_crawler
+
+from database import ScrapedVacancy, validate_vacancies
+from techtrendscrape.spiders.djinni import DjinniSpider
+from tests.conftest import LISTING_PAGES_DIR
+
+EXPECTED_ITEMS = json.loads((LISTING_PAGES_DIR / "expected_items.json").read_text())
+
+
+def test_start_passes_category_to_each_request() -> None:
+    crawler = get_crawler(DjinniSpider, {"PROXY_LIST": None})
+    spider = DjinniSpider.from_crawler(crawler, categories="C# / .NET | Python")
+
+    async def collect_requests() -> list[Request]:
+        return [request async for request in spider.start()]
+
+    requests = asyncio.run(collect_requests())
+
+    assert [request.cb_kwargs["category"] for request in requests] == ["C# / .NET", "Python"]
+    assert "primary_keyword=C%23+%2F+.NET" in requests[0].url
+
+
+@pytest.mark.parametrize("page_name", sorted(EXPECTED_ITEMS))
+def test_parse(page_name: str, listing_responses: dict[str, HtmlResponse]) -> None:
+    spider = DjinniSpider.from_crawler(get_crawler(DjinniSpider))
+    category = page_name.partition("-")[0].title()
+
+    results = list(spider.parse(listing_responses[page_name], category=category))
+
+    vacancies, invalid_items = validate_vacancies([result for result in results if isinstance(result, ScrapedVacancy)])
+    assert not invalid_items
+    assert [vacancy.model_dump(mode="json") for vacancy in vacancies] == EXPECTED_ITEMS[page_name]["items"]
+    next_pages = [result.url for result in results if isinstance(result, Request)]
+    assert next_pages == ([EXPECTED_ITEMS[page_name]["next_page"]] if EXPECTED_ITEMS[page_name]["next_page"] else [])
+
+
+@pytest.mark.parametrize(
+    "counters",
+    [
+        '<span class="text-nowrap"><span class="bi bi-eye"></span> 52 перегляди</span>'
+        '<span class="text-nowrap"><span class="bi bi-people"></span> 3 відгуки</span>',
+        '<span class="text-nowrap"><strong>52</strong> перегляди</span>'
+        '<span class="text-nowrap"><span>3</span> <span>відгуки</span></span>',
+    ],
+)
+def test_parse_interaction_stats(counters: str) -> None:
+    spider = DjinniSpider.from_crawler(get_crawler(DjinniSpider))
+    job_item = lxml.html.fragment_fromstring(
+        f'<li id="job-item-1"><span class="text-nowrap">Тільки віддалено</span>{counters}</li>'
+    )
+
+    assert spider._parse_interaction_stats(job_item) == (52, 3)
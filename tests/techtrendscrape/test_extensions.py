@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+import pytest
+from scrapy.exceptions import NotConfigured
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from techtrendscrape.extensions import CrawlMetrics
+from techtrendscrape.middlewares import ParseLatencyMiddleware
+from techtrendscrape.spiders.djinni import DjinniSpider
+
+
+def test_not_configured_without_paths() -> None:
+    with pytest.raises(NotConfigured):
+        CrawlMetrics.from_crawler(get_crawler(DjinniSpider, {"METRICS_JSON_PATH": "", "METRICS_TEXTFILE_PATH": ""}))
+
+
+def test_crawl_metrics(listing_responses: dict[str, HtmlResponse], tmp_path: Path) -> None:
+    crawler = get_crawler(
+        DjinniSpider,
+        {"METRICS_JSON_PATH": str(tmp_path / "crawl.json"), "METRICS_TEXTFILE_PATH": str(tmp_path / "crawl.prom")},
+    )
+    spider = DjinniSpider.from_crawler(crawler)
+    extension = CrawlMetrics.from_crawler(crawler)
+    middleware = ParseLatencyMiddleware.from_crawler(crawler)
+    response = listing_responses["python-1.html"]
+    outputs = list(middleware.process_spider_output(response, spider.parse(response, category="Python")))
+    crawler.stats.inc_value("pipelines/MongoPipeline/batches_written")  # type: ignore[reportOptionalMemberAccess]
+
+    extension.spider_closed(spider, "finished")
+
+    report = json.loads((tmp_path / "crawl.json").read_text())
+    assert report["parse"]["pages"] == 1
+    assert 0 < report["parse"]["max_seconds"] == report["parse"]["seconds"]
+    assert report["pipelines"]["MongoPipeline"]["batches_written"] == 1
+    assert report["stats"]["parse/pages"] == 1
+    assert outputs
+    textfile = (tmp_path / "crawl.prom").read_text()
+    assert 'techtrend_crawl_parse_pages{spider="djinni"} 1\n' in textfile
+    assert 'techtrend_crawl_pipeline_batches_written{spider="djinni",pipeline="MongoPipeline"} 1\n' in textfile
@@ -0,0 +1,124 @@
+from pathlib import Path
+from time import time
+
+import pytest
+from scrapy.http import HtmlResponse, Request, Response
+from scrapy.utils.test import get_crawler
+
+from techtrendscrape.httpcache import (
+    STORED_AT_META_KEY,
+    HttpCacheMiddleware,
+    RevalidationPolicy,
+    SQLiteCacheStorage,
+)
+from techtrendscrape.spiders.djinni import DjinniSpider
+
+BODY = b"<html><body>" + b"<p>Python</p>" * 1000 + b"</body></html>"
+
+
+@pytest.fixture
+def spider(tmp_path: Path) -> DjinniSpider:
+    crawler = get_crawler(
+        DjinniSpider,
+        {
+            "HTTPCACHE_ENABLED": True,
+            "HTTPCACHE_DIR": str(tmp_path),
+            "HTTPCACHE_EXPIRATION_SECS": 60,
+            "HTTPCACHE_POLICY": "techtrendscrape.httpcache.RevalidationPolicy",
+            "HTTPCACHE_STORAGE": "techtrendscrape.httpcache.SQLiteCacheStorage",
+        },
+    )
+    crawler.spider = DjinniSpider.from_crawler(crawler)
+    return crawler.spider
+
+
+@pytest.fixture
+def storage(spider: DjinniSpider) -> SQLiteCacheStorage:
+    storage = SQLiteCacheStorage(spider.settings)
+    storage.open_spider(spider)
+    return storage
+
+
+def store(storage: SQLiteCacheStorage, spider: DjinniSpider, url: str, body: bytes = BODY) -> None:
+    response = HtmlResponse(url, body=body, headers={"ETag": '"v1"'})
+    storage.store_response(spider, Request(url), response)
+
+
+def test_store_and_retrieve_response(storage: SQLiteCacheStorage, spider: DjinniSpider) -> None:
+    request = Request("https://djinni.co/jobs/")
+    assert storage.retrieve_response(spider, request) is None
+
+    store(storage, spider, request.url)
+    response = storage.retrieve_response(spider, request)
+
+    assert isinstance(response, HtmlResponse)
+    assert response.body == BODY
+    assert response.headers[b"ETag"] == b'"v1"'
+    assert request.meta[STORED_AT_META_KEY] == pytest.approx(time(), abs=5)
+    assert storage.path.is_file()
+    assert storage.size < len(BODY) / 10
+
+
+def test_identical_bodies_are_stored_once(storage: SQLiteCacheStorage, spider: DjinniSpider) -> None:
+    store(storage, spider, "https://djinni.co/jobs/")
+    size = storage.size
+    store(storage, spider, "https://djinni.co/jobs/?page=1")
+
+    assert storage.connection.execute("SELECT COUNT(*) FROM bodies").fetchone() == (1,)
+    assert storage.size < size * 2
+    assert spider.crawler.stats
+    assert spider.crawler.stats.get_value("httpcache/sqlite/deduplicated") == 1
+
+
+def test_least_recently_used_responses_are_evicted(storage: SQLiteCacheStorage, spider: DjinniSpider) -> None:
+    for page_number in range(10):
+        store(storage, spider, f"https://djinni.co/jobs/?page={page_number}", body=BODY + bytes(page_number))
+    storage.retrieve_response(spider, Request("https://djinni.co/jobs/?page=0"))
+    storage.max_size = storage.size // 2
+
+    store(storage, spider, "https://djinni.co/jobs/?page=10", body=BODY + bytes(10))
+
+    assert storage.size <= storage.max_size
+    assert storage.size == storage._calculate_size()
+    assert storage.retrieve_response(spider, Request("https://djinni.co/jobs/?page=0"))
+    assert storage.retrieve_response(spider, Request("https://djinni.co/jobs/?page=10"))
+    assert not storage.retrieve_response(spider, Request("https://djinni.co/jobs/?page=1"))
+
+
+def test_expired_responses_are_revalidated(spider: DjinniSpider) -> None:
+    policy = RevalidationPolicy(spider.settings)
+    cached_response = Response(
+        "https://djinni.co/jobs/", headers={"ETag": '"v1"', "Last-Modified": "Wed, 11 Jun 2025 10:00:00 GMT"}
+    )
+    request = Request(cached_response.url, meta={STORED_AT_META_KEY: time()})
+    assert policy.is_cached_response_fresh(cached_response, request)
+    assert b"If-None-Match" not in request.headers
+
+    request.meta[STORED_AT_META_KEY] = time() - 120
+    assert not policy.is_cached_response_fresh(cached_response, request)
+    assert request.headers[b"If-None-Match"] == b'"v1"'
+    assert request.headers[b"If-Modified-Since"] == b"Wed, 11 Jun 2025 10:00:00 GMT"
+    assert policy.is_cached_response_valid(cached_response, Response(request.url, status=304), request)
+    assert not policy.is_cached_response_valid(cached_response, Response(request.url, status=200), request)
+
+
+def test_not_modified_responses_are_fresh_again(spider: DjinniSpider) -> None:
+    middleware = HttpCacheMiddleware.from_crawler(spider.crawler)
+    middleware.spider_opened(spider)
+    storage = middleware.storage
+    assert isinstance(storage, SQLiteCacheStorage)
+    store(storage, spider, "https://djinni.co/jobs/")
+    storage.connection.execute("UPDATE responses SET stored_at = ?", (time() - 120,))
+
+    request = Request("https://djinni.co/jobs/")
+    assert middleware.process_request(request) is None
+    assert request.headers[b"If-None-Match"] == b'"v1"'
+    response = middleware.process_response(request, Response(request.url, status=304, request=request))
+    assert isinstance(response, HtmlResponse)
+    assert response.body == BODY
+
+    request = Request("https://djinni.co/jobs/")
+    response = middleware.process_request(request)
+    assert isinstance(response, HtmlResponse)
+    assert "cached" in response.flags
+    assert b"If-None-Match" not in request.headers
@@ -0,0 +1,28 @@
+import pytest
+
+from database import VacancyItem
+from techtrendscrape.known_vacancies import KnownVacancies
+from tests.conftest import CATEGORY
+
+URL = "https://djinni.co/jobs/1-python-developer/"
+
+
+def test_known_vacancies() -> None:
+    known_vacancies = KnownVacancies([(URL, 10, 2), ("https://djinni.co/jobs/2-java-developer/", 5, 0)])
+
+    assert len(known_vacancies) == 2
+    assert known_vacancies.is_known(URL)
+    assert not known_vacancies.is_known("https://djinni.co/jobs/3-go-developer/")
+    assert known_vacancies.is_unchanged(URL, 10, 2)
+    assert not known_vacancies.is_unchanged(URL, 11, 2)
+
+
+@pytest.mark.usefixtures("_upsert_vacancies_to_collection")
+def test_known_vacancies_from_collection(vacancy_items: list[VacancyItem]) -> None:
+    known_vacancies = KnownVacancies.from_collection([CATEGORY])
+
+    assert all(
+        known_vacancies.is_unchanged(str(item.url), item.views, item.applications)
+        for item in vacancy_items
+        if item.category == CATEGORY
+    )
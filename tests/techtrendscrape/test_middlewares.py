@@ -0,0 +1,116 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Request, Response
+from scrapy.utils.test import get_crawler
+
+from techtrendscrape.httpcache import HttpCacheMiddleware
+from techtrendscrape.middlewares import ProxyRotationMiddleware
+from techtrendscrape.spiders.djinni import DjinniSpider
+
+PROXIES = ["10.0.0.1:8080", "10.0.0.2:8080"]
+
+
+@pytest.fixture
+def middleware() -> ProxyRotationMiddleware:
+    crawler = get_crawler(DjinniSpider, {"PROXY_LIST": PROXIES, "PROXY_MAX_CONCURRENCY": 1})
+    crawler.spider = DjinniSpider.from_crawler(crawler)
+    return ProxyRotationMiddleware.from_crawler(crawler)
+
+
+def send(middleware: ProxyRotationMiddleware, request: Request) -> Request:
+    asyncio.run(middleware.process_request(request))
+    return request
+
+
+def test_not_configured_without_proxies() -> None:
+    with pytest.raises(NotConfigured):
+        ProxyRotationMiddleware.from_crawler(get_crawler(DjinniSpider, {"PROXY_LIST": None}))
+
+
+def test_every_request_gets_a_proxy(middleware: ProxyRotationMiddleware) -> None:
+    first_request = send(middleware, Request("https://djinni.co/jobs/"))
+    second_request = send(middleware, Request("https://djinni.co/jobs/?page=2"))
+
+    assert {first_request.meta["proxy"], second_request.meta["proxy"]} == {f"http://{proxy}" for proxy in PROXIES}
+    foreign_request = send(middleware, Request("https://djinni.co/jobs/?page=3", meta={"proxy": "http://10.0.0.9:80"}))
+    assert foreign_request.meta["proxy"] == "http://10.0.0.9:80"
+
+
+def test_banned_response_is_retried_through_another_proxy(middleware: ProxyRotationMiddleware) -> None:
+    request = send(middleware, Request("https://djinni.co/jobs/"))
+    banned_proxy = request.meta["proxy"]
+
+    retry_request = middleware.process_response(request, Response(request.url, status=429, request=request))
+
+    assert isinstance(retry_request, Request)
+    assert send(middleware, retry_request).meta["proxy"] != banned_proxy
+    assert middleware.stats
+    name = banned_proxy.removeprefix("http://")
+    assert middleware.stats.get_value(f"proxies/{name}/bans") == 1
+    assert middleware.stats.get_value(f"proxies/{name}/quarantines") == 1
+
+    retry_request.meta["download_latency"] = 0.25
+    response = Response(retry_request.url, request=retry_request)
+    assert middleware.process_response(retry_request, response) is response
+    assert middleware.stats.get_value(f"proxies/{retry_request.meta['proxy'].removeprefix('http://')}/latency") == 0.25
+
+
+def test_requests_wait_for_a_released_proxy(middleware: ProxyRotationMiddleware) -> None:
+    async def crawl() -> None:
+        requests = [Request(f"https://djinni.co/jobs/?page={page_number}") for page_number in range(3)]
+        await middleware.process_request(requests[0])
+        await middleware.process_request(requests[1])
+        waiting = asyncio.create_task(middleware.process_request(requests[2]))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+
+        middleware.process_response(requests[0], Response(requests[0].url, request=requests[0]))
+        async with asyncio.timeout(1):
+            await waiting
+        assert requests[2].meta["proxy"] == requests[0].meta["proxy"]
+
+    asyncio.run(crawl())
+
+
+def test_cached_and_retried_responses(tmp_path: Path) -> None:
+    crawler = get_crawler(
+        DjinniSpider,
+        {
+            "PROXY_LIST": PROXIES,
+            "PROXY_MAX_CONCURRENCY": 1,
+            "HTTPCACHE_ENABLED": True,
+            "HTTPCACHE_DIR": str(tmp_path),
+            "HTTPCACHE_POLICY": "techtrendscrape.httpcache.RevalidationPolicy",
+            "HTTPCACHE_STORAGE": "techtrendscrape.httpcache.SQLiteCacheStorage",
+        },
+    )
+    crawler.spider = DjinniSpider.from_crawler(crawler)
+    middleware = ProxyRotationMiddleware.from_crawler(crawler)
+    cache = HttpCacheMiddleware.from_crawler(crawler)
+    cache.spider_opened(crawler.spider)
+
+    def download(request: Request, status: int) -> Request | Response:
+        # Requests go through the cache before the proxy rotation, responses through the proxy rotation first.
+        if cached_response := cache.process_request(request):
+            return cached_response
+        send(middleware, request)
+        response = middleware.process_response(request, Response(request.url, status=status, request=request))
+        return cache.process_response(request, response) if isinstance(response, Response) else response
+
+    request = Request("https://djinni.co/jobs/")
+    retry_request = download(request, 429)
+    assert isinstance(retry_request, Request)
+    assert cache.storage.retrieve_response(crawler.spider, retry_request) is None
+    assert download(retry_request, 200).status == 200
+    assert retry_request.meta["proxy"] != request.meta["proxy"]
+
+    # The response of the retry is cached, and served without waiting for a proxy.
+    for proxy in middleware.pool.proxies:
+        proxy.quarantined_until = float("inf")
+    cached_response = download(Request("https://djinni.co/jobs/"), 429)
+    assert isinstance(cached_response, Response)
+    assert cached_response.status == 200
+    assert "cached" in cached_response.flags
@@ -0,0 +1,172 @@
+import asyncio
+import csv
+import gzip
+import io
+import zlib
+from collections.abc import Callable
+from dataclasses import replace
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pyarrow.parquet as pq
+import pytest
+from scrapy.utils.test import get_crawler
+from twisted.internet.defer import maybeDeferred
+
+from database import CollectionVacancies, ScrapedVacancy, VacancyItem
+from techtrendscrape import pipelines
+from techtrendscrape.pipelines import CSVOutput, CSVPipeline, MongoPipeline, ParquetPipeline, Pipeline
+from techtrendscrape.spiders.djinni import DjinniSpider
+
+PipelineFactory = Callable[..., Pipeline]
+
+
+@pytest.fixture
+def pipeline_factory(monkeypatch: pytest.MonkeyPatch) -> PipelineFactory:
+    # Write batches in place, since there is no running reactor to hand the results back from a thread.
+    monkeypatch.setattr(pipelines, "deferToThread", maybeDeferred)
+
+    def create_pipeline(pipeline_class: type[Pipeline], **settings: Any) -> Pipeline:
+        crawler = get_crawler(DjinniSpider, {"PIPELINE_BATCH_SIZE": 2, "PIPELINE_FLUSH_INTERVAL": 0} | settings)
+        return pipeline_class.from_crawler(crawler)
+
+    return create_pipeline
+
+
+def run_pipeline(pipeline: Pipeline, items: list[ScrapedVacancy] | list[VacancyItem]) -> None:
+    async def crawl() -> None:
+        pipeline.open_spider()
+        for item in items:
+            await pipeline.process_item(item)
+            assert len(pipeline.items) < pipeline.batch_size
+        await pipeline.close_spider()
+
+    asyncio.run(crawl())
+
+
+def test_mongo_pipeline_flushes_in_batches(pipeline_factory: PipelineFactory, vacancy_items: list[VacancyItem]) -> None:
+    mongo_pipeline = pipeline_factory(MongoPipeline)
+    run_pipeline(mongo_pipeline, vacancy_items)
+
+    assert not mongo_pipeline.items
+    assert not mongo_pipeline.failed_items_count
+    assert mongo_pipeline.crawler.stats
+    assert mongo_pipeline.crawler.stats.get_value("pipelines/MongoPipeline/items_written") == len(vacancy_items)
+    assert mongo_pipeline.crawler.stats.get_value("pipelines/MongoPipeline/flush_max_seconds") >= 0
+    upserted_count = sum(
+        mongo_pipeline.crawler.stats.get_value(f"pipelines/MongoPipeline/items_{key}", 0)
+        for key in ("inserted", "updated", "skipped")
+    )
+    assert upserted_count == len(vacancy_items)
+    with CollectionVacancies() as collection_vacancies:
+        assert collection_vacancies.collection.count_documents(
+            {"url": {"$in": [str(item.url) for item in vacancy_items]}}
+        ) == len({str(item.url) for item in vacancy_items})
+
+
+def test_csv_pipeline(
+    pipeline_factory: PipelineFactory,
+    vacancy_items: list[VacancyItem],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    csv_pipeline = pipeline_factory(CSVPipeline)
+    run_pipeline(csv_pipeline, vacancy_items)
+
+    with csv_pipeline.paths[0].open(newline="") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    assert [row["url"] for row in rows] == [str(item.url) for item in vacancy_items]
+
+
+def test_pipeline_drops_invalid_items(
+    pipeline_factory: PipelineFactory,
+    vacancy_items: list[VacancyItem],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    scraped_vacancies = [
+        ScrapedVacancy(**item.model_dump(exclude={"url"}), url=str(item.url)) for item in vacancy_items
+    ]
+    scraped_vacancies[1] = replace(scraped_vacancies[1], url="not a URL", views=-1)
+    csv_pipeline = pipeline_factory(CSVPipeline)
+    run_pipeline(csv_pipeline, scraped_vacancies)
+
+    with csv_pipeline.paths[0].open(newline="") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    assert [row["url"] for row in rows] == [item.url for item in scraped_vacancies if item.url != "not a URL"]
+    assert csv_pipeline.crawler.stats
+    assert csv_pipeline.crawler.stats.get_value("pipelines/CSVPipeline/items_invalid") == 1
+    assert csv_pipeline.crawler.stats.get_value("pipelines/CSVPipeline/items_written") == len(vacancy_items) - 1
+    assert not csv_pipeline.failed_items_count
+
+
+def test_csv_pipeline_writes_rows_as_items_arrive(
+    pipeline_factory: PipelineFactory,
+    vacancy_items: list[VacancyItem],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    csv_pipeline = pipeline_factory(CSVPipeline, PIPELINE_BATCH_SIZE=500, CSV_GZIP=True)
+    csv_pipeline.open_spider()
+    asyncio.run(csv_pipeline.process_item(vacancy_items[0]))
+
+    assert not csv_pipeline.items
+    # The file is readable up to the last item while the crawl is running, the gzip stream isn't finished yet.
+    content = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16).decompress(csv_pipeline.paths[0].read_bytes())
+    rows = list(csv.DictReader(io.StringIO(content.decode(), newline="")))
+    assert [row["url"] for row in rows] == [str(vacancy_items[0].url)]
+    assert csv_pipeline.crawler.stats
+    assert csv_pipeline.crawler.stats.get_value("pipelines/CSVPipeline/items_written") == 1
+    asyncio.run(csv_pipeline.close_spider())
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_csv_output_counts_uncompressed_bytes(compress: bool, tmp_path: Path) -> None:
+    output = CSVOutput(tmp_path / "vacancies.csv", fieldnames=("title", "description"), compress=compress)
+    output.writer.writerow({"title": "Python розробник", "description": 'Django, "FastAPI"\nCelery'})
+    size = output.size
+    output.close()
+
+    content = gzip.decompress(output.path.read_bytes()) if compress else output.path.read_bytes()
+    assert size == len(content)
+
+
+def test_csv_pipeline_rotates_gzip_files_by_category_and_size(
+    pipeline_factory: PipelineFactory,
+    vacancy_items: list[VacancyItem],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    csv_pipeline = pipeline_factory(CSVPipeline, CSV_SPLIT_BY_CATEGORY=True, CSV_MAX_FILE_SIZE=1, CSV_GZIP=True)
+    run_pipeline(csv_pipeline, vacancy_items)
+
+    assert len(csv_pipeline.paths) > 1
+    assert all(path.name.startswith("vacancies-python") and path.suffix == ".gz" for path in csv_pipeline.paths)
+    urls = []
+    for path in csv_pipeline.paths:
+        with gzip.open(path, "rt", newline="") as csv_file:
+            urls.extend(row["url"] for row in csv.DictReader(csv_file))
+    assert urls == [str(item.url) for item in vacancy_items]
+
+
+def test_parquet_pipeline(
+    pipeline_factory: PipelineFactory,
+    vacancy_items: list[VacancyItem],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    parquet_pipeline = pipeline_factory(ParquetPipeline, PARQUET_ROW_GROUP_SIZE=2)
+    run_pipeline(parquet_pipeline, vacancy_items)
+
+    assert len(parquet_pipeline.vacancies.paths) == 1
+    assert pq.ParquetFile(parquet_pipeline.vacancies.paths[0]).num_row_groups == 2
+    vacancies = parquet_pipeline.vacancies.iter_vacancies(
+        None, datetime(2025, 5, 1, tzinfo=UTC), datetime(2025, 7, 1, tzinfo=UTC), columns=("url",)
+    )
+    assert [vacancy["url"] for vacancy in vacancies] == [str(item.url) for item in vacancy_items]
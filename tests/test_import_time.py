@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Microseconds the wrangler import may take, which is several times more than it takes without heavy dependencies.
+IMPORT_TIME_BUDGET = 1_000_000
+HEAVY_MODULES = ("numpy", "pymongo", "scrapy", "spacy", "twisted")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Return the cumulative import time of each module imported by `module`, measured by `-X importtime`."""
+    env = {name: value for name, value in os.environ.items() if name != "IS_TEST"}
+    completed_process = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    times = {}
+    for line in completed_process.stderr.splitlines():
+        _, separator, timings = line.partition("import time:")
+        if not separator or "cumulative" in timings:
+            continue
+        _, cumulative, name = timings.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["techtrendanalysis.wrangler", "database"])
+def test_import_time(module: str) -> None:
+    times = import_times(module)
+    imported_heavy_modules = {name for name in times if name.split(".")[0] in HEAVY_MODULES}
+    assert not imported_heavy_modules, f"Heavy modules must be imported on use, not by `{module}`."
+    assert times[module] < IMPORT_TIME_BUDGET